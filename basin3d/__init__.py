@@ -52,6 +52,7 @@ observed property variables.
     - *id:* Unique observed property variable identifier
     - *full_name:* Descriptive name for the observed property variable
     - *categories:* Categories of which the variable is a member, listed in hierarchical order
+    - *units:* Canonical unit of measurement of the variable
     - *datasources:* List of the data sources that define the current observed property variable
 
 **URLs**
@@ -83,6 +84,7 @@ hierarchies are described via the related_sampling_feature complex
 | `/synthesis/monitoringfeatures --` Returns a list of monitoring features types
 | `/synthesis/monitoringfeatures/:featuretype --` Returns a list of monitoring features of the specified feature type
 | `/synthesis/monitoringfeatures/:featuretype/:id --` Get a single monitoring feature
+| `/synthesis/monitoringfeatures/catalog --` Returns the age and refresh duration of the monitoring feature catalog snapshots
 
 **Attributes:**
     - *id:* Unique feature identifier
@@ -196,7 +198,8 @@ def get_url(url, params=None, headers=None, verify=False):
     :return: Response
     """
     import requests
-    response = requests.get(url, params=params, verify=verify, headers=headers)
+    from basin3d.metrics import observe_http
+    response = observe_http("get_url", requests.get, url, params=params, verify=verify, headers=headers)
     logger.debug("url:{}".format(response.url))
     return response
 
@@ -212,7 +215,8 @@ def post_url(url, params=None, headers=None, verify=False):
     :return: Response
     """
     import requests
-    response = requests.post(url, params=params, verify=verify, headers=headers)
+    from basin3d.metrics import observe_http
+    response = observe_http("post_url", requests.post, url, params=params, verify=verify, headers=headers)
     logger.debug("url:{}".format(response.url))
     return response
 
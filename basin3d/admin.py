@@ -14,7 +14,7 @@ class DataSourceAdmin(ModelAdmin):
 
 @admin.register(ObservedPropertyVariable)
 class ObservedPropertyVariableAdmin(ModelAdmin):
-    list_display = ('id', 'full_name', 'categories')
+    list_display = ('id', 'full_name', 'categories', 'units')
 
     actions = None
 
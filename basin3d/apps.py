@@ -131,6 +131,7 @@ def load_observed_property_variables(plugin):
                     p.id = row['broker_id']
                     p.full_name = row['description']
                     p.categories = row['categories']
+                    p.units = row.get('units') or None
                     p.save()
 
                 except IntegrityError:
@@ -206,3 +207,6 @@ class Basin3DConfig(AppConfig):
     def ready(self):
         # Execute the post migration scripts
         post_migrate.connect(load_data_sources, sender=self)
+
+        from basin3d.conditional import connect_catalog_signals
+        connect_catalog_signals()
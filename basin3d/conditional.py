@@ -0,0 +1,149 @@
+"""
+`basin3d.conditional`
+*********************
+
+.. currentmodule:: basin3d.conditional
+
+:platform: Unix, Mac
+:synopsis: BASIN-3D conditional (ETag / Last-Modified) responses
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+.. contents:: Contents
+    :local:
+    :backlinks: top
+
+Strong ETags are computed from catalog versions or cached content *before* the response is
+synthesized and serialized.  Requests with a matching ``If-None-Match`` (or an
+``If-Modified-Since`` that is not older than ``Last-Modified``) get a `304 Not Modified`
+without any serialization.
+
+The catalog version is cached. Saving or deleting a catalog record in this process resets it,
+and it is recomputed after :data:`CATALOG_VERSION_MAX_AGE` seconds to pick up the changes made
+by other processes.
+
+"""
+import hashlib
+import threading
+import time
+
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django_extensions.db.fields.encrypted import EncryptedTextField
+
+from basin3d.models import DataSource, DataSourceObservedPropertyVariable, ObservedProperty, \
+    ObservedPropertyVariable, SamplingMedium
+
+#: The models that make up the BASIN-3D catalog
+CATALOG_MODELS = [DataSource, DataSourceObservedPropertyVariable, ObservedProperty,
+                  ObservedPropertyVariable, SamplingMedium]
+
+#: Seconds to reuse the computed catalog version
+CATALOG_VERSION_MAX_AGE = 60
+
+_catalog_version = None
+_catalog_version_lock = threading.Lock()
+
+
+def make_etag(*parts):
+    """
+    Make a strong ETag from the parts
+
+    :param parts: values that identify the representation
+    :return: the quoted ETag
+    :rtype: str
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return quote_etag(digest.hexdigest())
+
+
+def request_variant(request):
+    """
+    The parts of a request that change the representation of the same resource. The
+    hyperlinks in the responses depend on the host, and the output depends on the
+    query string and the negotiated media type.
+
+    :param request: The request object
+    :type request: :class:`rest_framework.request.Request`
+    :rtype: tuple
+    """
+    return (request.build_absolute_uri(),
+            getattr(request, "accepted_media_type", None),
+            getattr(request, "version", None))
+
+
+def catalog_version():
+    """
+    A version for the BASIN-3D catalog (data sources, observed properties and variables).
+    It changes whenever a catalog record changes. Credentials are not read. The catalog is
+    only read when the cached version was reset or is older than :data:`CATALOG_VERSION_MAX_AGE`.
+
+    :return: the version
+    :rtype: str
+    """
+    global _catalog_version
+    with _catalog_version_lock:
+        if _catalog_version is not None and time.time() - _catalog_version[1] < CATALOG_VERSION_MAX_AGE:
+            return _catalog_version[0]
+
+    digest = hashlib.sha1()
+    for model in CATALOG_MODELS:
+        fields = [f.attname for f in model._meta.concrete_fields if not isinstance(f, EncryptedTextField)]
+        digest.update(model._meta.label.encode("utf-8"))
+        for row in model.objects.order_by("pk").values_list(*fields):
+            digest.update(repr(row).encode("utf-8"))
+    version = digest.hexdigest()
+    with _catalog_version_lock:
+        _catalog_version = (version, time.time())
+    return version
+
+
+def reset_catalog_version(sender=None, **kwargs):
+    """
+    Reset the cached catalog version. It is connected to the `post_save` and `post_delete`
+    signals of the :data:`CATALOG_MODELS`.
+    """
+    global _catalog_version
+    with _catalog_version_lock:
+        _catalog_version = None
+
+
+def connect_catalog_signals():
+    """
+    Reset the cached catalog version when a catalog record is saved or deleted
+    """
+    for model in CATALOG_MODELS:
+        post_save.connect(reset_catalog_version, sender=model,
+                          dispatch_uid="basin3d_catalog_version_save_{}".format(model._meta.label))
+        post_delete.connect(reset_catalog_version, sender=model,
+                            dispatch_uid="basin3d_catalog_version_delete_{}".format(model._meta.label))
+
+
+def conditional_response(request, build_response, etag=None, last_modified=None):
+    """
+    Return `304 Not Modified` if the client has the current representation, otherwise build
+    the response.  The ETag and Last-Modified headers are added to both.
+
+    :param request: The request object
+    :type request: :class:`rest_framework.request.Request`
+    :param build_response: Callable that builds the full response
+    :param etag: the (quoted) ETag of the current representation
+    :param last_modified: the time the representation was last modified (epoch seconds)
+    :return: The HTTP Response
+    """
+    last_modified = int(last_modified) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build_response()
+        if not 200 <= response.status_code < 300:
+            return response
+
+    if etag:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
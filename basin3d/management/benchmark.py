@@ -0,0 +1,206 @@
+"""
+`basin3d.management.benchmark`
+******************************
+
+.. currentmodule:: basin3d.management.benchmark
+
+:synopsis: Measure BASIN-3D REST API requests end to end
+
+A scenario is a list of request paths that are sent through the whole Django and
+Django REST Framework stack (middleware, URL routing, synthesis, serialization and rendering)
+with the Django test :class:`~django.test.Client`.  For each scenario the report has:
+
+    - *requests, errors, objects:* the counts of the requests, of the responses that are not
+      `200 OK` and of the synthesized objects in the responses
+    - *seconds, requests_per_second, objects_per_second:* the throughput
+    - *latency_ms:* the minimum, mean, median, 90th, 99th percentile and maximum latencies
+    - *peak_memory_bytes:* the peak memory allocated by Python while the requests of the
+      scenario are sent once more (See :mod:`tracemalloc`)
+
+The reports are JSON, so that the results of two runs can be compared.
+
+"""
+import json
+import math
+import platform
+import time
+import tracemalloc
+from collections import OrderedDict, namedtuple
+from itertools import cycle, islice
+
+#: A benchmark scenario, the requests to send
+Scenario = namedtuple('Scenario', ['name', 'paths'])
+
+#: The latency percentiles of the reports
+PERCENTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+
+
+def get_client():
+    """
+    A client that sends the requests to this process, with a host that is allowed by
+    the ``ALLOWED_HOSTS`` setting
+
+    :rtype: :class:`django.test.Client`
+    """
+    from django.conf import settings
+    from django.test import Client
+    hosts = [host.lstrip(".") for host in settings.ALLOWED_HOSTS if host.strip(".*")]
+    return Client(SERVER_NAME=hosts[0] if hosts else "localhost")
+
+
+def percentile(values, fraction):
+    """
+    The percentile of the values (nearest rank)
+
+    :param values: the sorted values
+    :param fraction: the percentile as a fraction (e.g. 0.9)
+    :return: the percentile or `None` if there are no values
+    """
+    if not values:
+        return None
+    rank = math.ceil(fraction * len(values))
+    return values[max(0, min(len(values), rank) - 1)]
+
+
+def latency_summary(latencies):
+    """
+    The minimum, mean, percentiles and maximum of the latencies
+
+    :param latencies: the latencies in seconds
+    :return: the summary in milliseconds (`None` values if there are no latencies)
+    :rtype: :class:`collections.OrderedDict`
+    """
+    latencies = sorted(latencies)
+    summary = OrderedDict([("min", latencies[0] * 1000 if latencies else None),
+                           ("mean", sum(latencies) * 1000 / len(latencies) if latencies else None)])
+    for name, fraction in PERCENTILES:
+        value = percentile(latencies, fraction)
+        summary[name] = None if value is None else value * 1000
+    summary["max"] = latencies[-1] * 1000 if latencies else None
+    return summary
+
+
+def count_objects(data):
+    """
+    The number of synthesized objects in a response body
+
+    :param data: the JSON response body
+    :rtype: int
+    """
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict):
+        if isinstance(data.get("results"), list):
+            return len(data["results"])
+        if isinstance(data.get("series"), list):
+            return len(data["series"])
+        return 1
+    return 0
+
+
+def run_scenario(client, scenario, requests=None, warmup=0, memory=True):
+    """
+    Send the requests of a scenario and measure them
+
+    :param client: the client to send the requests with
+    :type client: :class:`django.test.Client`
+    :param scenario: the scenario
+    :type scenario: :class:`Scenario`
+    :param requests: the number of requests to send, cycling through the paths
+        (default: each path once)
+    :param warmup: the number of requests to send before measuring
+    :param memory: measure the peak memory? Tracing the memory allocations slows the
+        requests down, so the paths are sent once more with tracing for this.
+    :return: the scenario report
+    :rtype: :class:`collections.OrderedDict`
+    """
+    count = len(scenario.paths) if requests is None else requests
+    for path in islice(cycle(scenario.paths), warmup):
+        client.get(path)
+
+    latencies = []
+    errors = 0
+    objects = 0
+    start = time.perf_counter()
+    for path in islice(cycle(scenario.paths), count):
+        request_start = time.perf_counter()
+        response = client.get(path)
+        content = response.content
+        latencies.append(time.perf_counter() - request_start)
+        if response.status_code != 200:
+            errors += 1
+        elif response.get("Content-Type", "").startswith("application/json"):
+            objects += count_objects(json.loads(content.decode(response.charset)))
+    seconds = time.perf_counter() - start
+
+    return OrderedDict([
+        ("name", scenario.name),
+        ("requests", len(latencies)),
+        ("errors", errors),
+        ("objects", objects),
+        ("seconds", seconds),
+        ("requests_per_second", len(latencies) / seconds if seconds else None),
+        ("objects_per_second", objects / seconds if seconds else None),
+        ("latency_ms", latency_summary(latencies)),
+        ("peak_memory_bytes", peak_memory(client, scenario.paths) if memory else None),
+    ])
+
+
+def peak_memory(client, paths):
+    """
+    The peak memory allocated by Python while sending the requests
+
+    :param client: the client to send the requests with
+    :type client: :class:`django.test.Client`
+    :param paths: the request paths
+    :return: the peak memory in bytes, above the memory allocated before the requests
+    :rtype: int
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    elif hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        for path in paths:
+            client.get(path).content
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return max(0, peak - baseline)
+
+
+def environment():
+    """
+    The environment of a benchmark run, to tell reports apart
+
+    :rtype: :class:`collections.OrderedDict`
+    """
+    import django
+    import rest_framework
+    try:
+        from basin3d.version import __release__
+    except ImportError:
+        __release__ = None
+    return OrderedDict([
+        ("basin3d", __release__),
+        ("python", platform.python_version()),
+        ("django", django.get_version()),
+        ("djangorestframework", rest_framework.VERSION),
+        ("platform", platform.platform()),
+        ("time", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())),
+    ])
+
+
+def write_report(report, path):
+    """
+    Write a benchmark report as JSON
+
+    :param report: the report
+    :param path: the report file path
+    """
+    with open(path, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+        report_file.write("\n")
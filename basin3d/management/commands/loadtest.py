@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import Resolver404, resolve
+
+from basin3d.management.benchmark import environment, latency_summary, write_report
+from basin3d.management.requestlog import read_access_log, read_query_file
+
+#: The status of the requests that did not get a response
+NO_RESPONSE = "no response"
+
+
+def get_endpoint(path):
+    """
+    The endpoint of a request path, the path with the values of the URL parameters
+    (e.g. the primary key) replaced by their names
+
+    :param path: the request path
+    :return: the endpoint (e.g. ``/synthesis/monitoringfeatures/points/{pk}/``)
+    """
+    endpoint = path.split("?", 1)[0]
+    try:
+        match = resolve(endpoint)
+    except Resolver404:
+        return endpoint
+    for name, value in match.kwargs.items():
+        endpoint = endpoint.replace("/{}/".format(value), "/{{{}}}/".format(name), 1)
+    return endpoint
+
+
+class Command(BaseCommand):
+    help = """Replay the requests of a query file or an access log against a running broker
+at a controlled concurrency and rate."""
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument('--file', help="File with one query (URL or path) per line")
+        source.add_argument('--access-log', help="Access log to replay the successful GET requests of")
+        parser.add_argument('--recent', type=int, default=None,
+                            help="Only read this many of the most recent access log lines")
+        parser.add_argument('--prefix', default="/",
+                            help="Only replay the access log requests with paths starting with the prefix "
+                                 "(default: /)")
+        parser.add_argument('--url', default="http://127.0.0.1:8000/",
+                            help="Base URL of the broker (default: http://127.0.0.1:8000/)")
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help="Maximum number of requests to send at once (default: 4)")
+        parser.add_argument('--rate', type=float, default=None,
+                            help="Requests to start a second (default: as fast as the concurrency allows)")
+        parser.add_argument('--repeat', type=int, default=1,
+                            help="Number of times to replay the requests (default: 1)")
+        parser.add_argument('--timeout', type=float, default=60,
+                            help="Seconds to wait for each response (default: 60)")
+        parser.add_argument('--output', help="File to write the JSON report to")
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['repeat'] < 1:
+            raise CommandError("--concurrency and --repeat must be at least 1")
+        if options['rate'] is not None and options['rate'] <= 0:
+            raise CommandError("--rate must be positive")
+
+        try:
+            if options['file']:
+                logged_requests = read_query_file(options['file'])
+            else:
+                logged_requests = read_access_log(options['access_log'], recent=options['recent'],
+                                                  prefix=options['prefix'])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        # Only the GET requests can be replayed, the logs do not have the request bodies
+        paths = [logged_request.path for logged_request in logged_requests if logged_request.method == "GET"]
+        skipped = len(logged_requests) - len(paths)
+        if skipped:
+            self.stderr.write("Skipping {} requests that are not GET requests".format(skipped))
+        if not paths:
+            raise CommandError("There are no requests to replay")
+
+        base_url = options['url'] if options['url'].endswith("/") else options['url'] + "/"
+        endpoints = {path: get_endpoint(path) for path in paths}
+        tasks = list(enumerate(paths * options['repeat']))
+        sessions = threading.local()
+        rate = options['rate']
+        start = time.perf_counter()
+
+        def replay(task):
+            index, path = task
+            if rate:
+                # Keep the schedule of the rate, the requests that are late start at once
+                delay = start + index / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            session = getattr(sessions, "session", None)
+            if session is None:
+                session = sessions.session = requests.Session()
+            request_start = time.perf_counter()
+            try:
+                response = session.get(urljoin(base_url, path.lstrip("/")), timeout=options['timeout'])
+                response.content
+                status = response.status_code
+            except requests.RequestException:
+                status = NO_RESPONSE
+            return path, time.perf_counter() - request_start, status
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(replay, tasks))
+        seconds = time.perf_counter() - start
+
+        by_endpoint = OrderedDict()
+        for path, latency, status in results:
+            endpoint = by_endpoint.setdefault(endpoints[path], {"latencies": [], "statuses": Counter()})
+            endpoint["latencies"].append(latency)
+            endpoint["statuses"][str(status)] += 1
+
+        report = [self.summarize(name, endpoint["latencies"], endpoint["statuses"], seconds)
+                  for name, endpoint in by_endpoint.items()]
+        total = self.summarize("total", [latency for _, latency, _ in results],
+                               sum((endpoint["statuses"] for endpoint in by_endpoint.values()), Counter()), seconds)
+
+        self.stdout.write("{:<50} {:>8} {:>8} {:>8} {:>10} {:>10} {:>10} {:>10}".format(
+            "endpoint", "requests", "errors", "error%", "req/s", "p50(ms)", "p90(ms)", "p99(ms)"))
+        for summary in report + [total]:
+            latency = summary["latency_ms"]
+            self.stdout.write("{:<50} {:>8} {:>8} {:>8.1f} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f}".format(
+                summary["endpoint"], summary["requests"], summary["errors"], summary["error_rate"] * 100,
+                summary["requests_per_second"], latency["p50"], latency["p90"], latency["p99"]))
+
+        if options['output']:
+            write_report(OrderedDict([
+                ("environment", environment()),
+                ("url", base_url),
+                ("concurrency", options['concurrency']),
+                ("rate", rate),
+                ("seconds", seconds),
+                ("endpoints", report),
+                ("total", total),
+            ]), options['output'])
+            self.stdout.write(self.style.SUCCESS("Wrote the report to {}".format(options['output'])))
+
+        self.stdout.write(self.style.SUCCESS("Replayed {} requests in {:.1f} seconds".format(len(results), seconds)))
+
+    def summarize(self, endpoint, latencies, statuses, seconds):
+        """
+        Summarize the requests of an endpoint. The responses with an error status (4xx, 5xx)
+        and the requests without a response are errors.
+
+        :return: the endpoint report
+        :rtype: :class:`collections.OrderedDict`
+        """
+        errors = sum(count for status, count in statuses.items() if status == NO_RESPONSE or int(status) >= 400)
+        return OrderedDict([
+            ("endpoint", endpoint),
+            ("requests", len(latencies)),
+            ("errors", errors),
+            ("error_rate", errors / len(latencies)),
+            ("requests_per_second", len(latencies) / seconds if seconds else 0.0),
+            ("statuses", OrderedDict(sorted(statuses.items()))),
+            ("latency_ms", latency_summary(latencies)),
+        ])
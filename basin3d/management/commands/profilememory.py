@@ -0,0 +1,57 @@
+from collections import OrderedDict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from basin3d.management.benchmark import get_client, write_report
+from basin3d.management.requestlog import read_query_file
+from basin3d.profiling import MemoryProfile
+
+
+class Command(BaseCommand):
+    help = """Profile the memory of REST API requests at the collect, serialize and render phases
+of the synthesis listings."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='*', help="Request path with its query string")
+        parser.add_argument('--file', help="File with one query (URL or path) per line")
+        parser.add_argument('--top', type=int, default=10,
+                            help="Number of allocation sites to report for each phase (default: 10)")
+        parser.add_argument('--frames', type=int, default=1,
+                            help="Number of frames of each allocation site (default: 1)")
+        parser.add_argument('--output', help="File to write the JSON report to")
+
+    def handle(self, *args, **options):
+        if options['top'] < 0 or options['frames'] < 1:
+            raise CommandError("--top must not be negative and --frames must be at least 1")
+
+        paths = list(options['path'])
+        if options['file']:
+            try:
+                paths.extend(logged_request.path for logged_request in read_query_file(options['file']))
+            except OSError as e:
+                raise CommandError(str(e))
+        if not paths:
+            raise CommandError("Specify a request path or --file")
+
+        client = get_client()
+        report = []
+        for path in paths:
+            with MemoryProfile(top=options['top'], frames=options['frames']) as profile:
+                response = client.get(path)
+            report.append(OrderedDict([("path", path), ("status", response.status_code),
+                                       ("phases", profile.report())]))
+
+            self.stdout.write(self.style.MIGRATE_HEADING("{} ({})".format(path, response.status_code)))
+            if not profile.phases:
+                self.stdout.write("  No phases, it is not a synthesis listing")
+            for phase in profile.phases:
+                self.stdout.write("  {:<10} current {:>10.1f} KiB  peak {:>10.1f} KiB".format(
+                    phase["name"], phase["current_bytes"] / 1024, phase["peak_bytes"] / 1024))
+                for site in phase["top"]:
+                    location = "\n      ".join(site["site"]) if isinstance(site["site"], list) else site["site"]
+                    self.stdout.write("    {:>10.1f} KiB {:>8} blocks  {}".format(
+                        site["size_diff"] / 1024, site["count_diff"], location))
+
+        if options['output']:
+            write_report(report, options['output'])
+            self.stdout.write(self.style.SUCCESS("Wrote the report to {}".format(options['output'])))
@@ -0,0 +1,73 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from basin3d.testing import StubDataSourceServer
+
+
+class Command(BaseCommand):
+    help = """Run a local stand-in data source API with OAuth2 endpoints and paginated JSON resources.
+Set the location of a data source to the printed URL to run it offline."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+        parser.add_argument('--port', type=int, default=8001, help="Port to listen on (default: 8001)")
+        parser.add_argument('--resources',
+                            help="JSON file with the records of each resource ({\"<resource>\": [{...}, ...]})")
+        parser.add_argument('--client-id', default="client", help="OAuth2 client id (default: client)")
+        parser.add_argument('--client-secret', default="secret", help="OAuth2 client secret (default: secret)")
+        parser.add_argument('--no-token', action='store_true',
+                            help="Do not require an OAuth2 access token for the resources")
+        parser.add_argument('--page-size', type=int, default=100,
+                            help="Default number of records of a page (default: 100)")
+        parser.add_argument('--latency', type=float, default=0.0,
+                            help="Seconds to wait before each response (default: 0)")
+        parser.add_argument('--jitter', type=float, default=0.0,
+                            help="Maximum seconds to add to or remove from the latency (default: 0)")
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help="Fraction of the requests that fail (default: 0)")
+        parser.add_argument('--error-status', type=int, default=503,
+                            help="HTTP status of the failed requests (default: 503)")
+        parser.add_argument('--rate-limit', type=int, default=None,
+                            help="Maximum number of requests a second (default: no limit)")
+
+    def handle(self, *args, **options):
+        if options['page_size'] < 1:
+            raise CommandError("--page-size must be at least 1")
+        if not 0 <= options['error_rate'] <= 1:
+            raise CommandError("--error-rate must be from 0 to 1")
+        if options['latency'] < 0 or options['jitter'] < 0:
+            raise CommandError("--latency and --jitter must not be negative")
+
+        resources = {}
+        if options['resources']:
+            try:
+                with open(options['resources']) as resources_file:
+                    resources = json.load(resources_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(str(e))
+            if not isinstance(resources, dict) or not all(isinstance(r, list) for r in resources.values()):
+                raise CommandError("--resources must map each resource name to a list of records")
+
+        server = StubDataSourceServer(resources=resources, client_id=options['client_id'],
+                                      client_secret=options['client_secret'], require_token=not options['no_token'],
+                                      page_size=options['page_size'], latency=options['latency'],
+                                      jitter=options['jitter'], error_rate=options['error_rate'],
+                                      error_status=options['error_status'], rate_limit=options['rate_limit'],
+                                      host=options['host'], port=options['port'])
+        try:
+            server.start()
+        except OSError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write("Serving {} resources at {}".format(len(resources), server.url))
+        self.stdout.write("Quit with CONTROL-C.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+            self.stdout.write(", ".join("{} {}".format(count, name) for name, count in sorted(server.stats.items())))
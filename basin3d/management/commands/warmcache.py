@@ -0,0 +1,113 @@
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from basin3d.management.requestlog import most_popular, read_access_log, read_query_file
+from basin3d.synthesis.cache import get_cache
+from basin3d.synthesis.query import synthesis_request
+from basin3d.synthesis.viewsets import DataSourcePluginViewSet
+
+
+def get_list_viewset(path):
+    """
+    Get the synthesis viewset that lists the objects for the path
+
+    :param path: the request path
+    :return: the viewset instance or `None` if the path is not a synthesis listing
+    """
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    view_class = getattr(match.func, "cls", None)
+    actions = getattr(match.func, "actions", {}) or {}
+    if view_class and issubclass(view_class, DataSourcePluginViewSet) and actions.get("get") == "list":
+        return view_class(**getattr(match.func, "initkwargs", {}))
+    return None
+
+
+class Command(BaseCommand):
+    help = """Warm the synthesis caches by running queries from a query file or an access log."""
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument('--file', help="File with one query (URL or path) per line")
+        source.add_argument('--access-log', help="Access log to read the most popular queries from")
+        parser.add_argument('--recent', type=int, default=None,
+                            help="Only read this many of the most recent access log lines")
+        parser.add_argument('--top', type=int, default=100,
+                            help="Warm this many of the most popular access log queries (default: 100)")
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help="Maximum number of queries to run at once (default: 4)")
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency must be at least 1")
+
+        try:
+            if options['file']:
+                logged_requests = read_query_file(options['file'])
+            else:
+                logged_requests = most_popular(read_access_log(options['access_log'], recent=options['recent'],
+                                                               prefix="/synthesis/"),
+                                               top=options['top'])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        if not get_cache():
+            self.stdout.write(self.style.WARNING(
+                "TIMESERIES_CACHE_DIR is not set. Only the monitoring feature catalog will be warmed."))
+
+        # Plan the work: one task per (query, data source)
+        tasks = []
+        for logged_request in logged_requests:
+            request = synthesis_request(logged_request.path)
+            viewset = get_list_viewset(request.path_info)
+            if viewset is None:
+                self.stderr.write("Skipping '{}', it is not a synthesis listing".format(logged_request.path))
+                continue
+            for datasource in viewset.get_datasources(request):
+                if datasource.enabled:
+                    tasks.append((viewset, request, datasource))
+
+        timings = OrderedDict()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            for datasource, elapsed, count, error in executor.map(lambda task: self.warm(*task), tasks):
+                timing = timings.setdefault(datasource.name, {"queries": 0, "objects": 0, "errors": 0,
+                                                              "total": 0.0, "max": 0.0})
+                timing["queries"] += 1
+                timing["objects"] += count
+                timing["total"] += elapsed
+                timing["max"] = max(timing["max"], elapsed)
+                if error:
+                    timing["errors"] += 1
+                    self.stderr.write("{}: {}".format(datasource.name, error))
+
+        self.stdout.write("{:<20} {:>8} {:>8} {:>8} {:>10} {:>10} {:>10}".format(
+            "datasource", "queries", "objects", "errors", "total(s)", "mean(s)", "max(s)"))
+        for name, timing in timings.items():
+            self.stdout.write("{:<20} {:>8} {:>8} {:>8} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+                name, timing["queries"], timing["objects"], timing["errors"], timing["total"],
+                timing["total"] / timing["queries"], timing["max"]))
+
+        self.stdout.write(self.style.SUCCESS("Warmed {} queries across {} data sources".format(
+            len(tasks), len(timings))))
+
+    def warm(self, viewset, request, datasource):
+        """
+        Run a query for a data source through the synthesis viewset
+
+        :return: tuple `(datasource, elapsed seconds, number of objects, error)`
+        """
+        start = time.time()
+        try:
+            count = len(viewset.list_datasource(request, datasource))
+            return datasource, time.time() - start, count, None
+        except Exception as e:
+            return datasource, time.time() - start, 0, e
+        finally:
+            connections.close_all()
@@ -0,0 +1,90 @@
+"""
+`basin3d.management.requestlog`
+*******************************
+
+.. currentmodule:: basin3d.management.requestlog
+
+:synopsis: Read BASIN-3D REST API requests from query files and access logs
+
+Query files list one request per line. A request is a URL or an absolute path with
+its query string (e.g. ``/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1``).
+Blank lines and lines starting with ``#`` are ignored.
+
+Access logs may be in the common or combined log format, which includes the Django
+development server and most web server logs.
+
+"""
+import re
+from collections import Counter, deque, namedtuple
+from urllib.parse import urlsplit
+
+#: The request line of an access log entry
+ACCESS_LOG_PATTERN = re.compile(r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[0-9.]+" (?P<status>\d{3})')
+
+#: A logged request
+LoggedRequest = namedtuple('LoggedRequest', ['method', 'path'])
+
+
+def normalize_path(url):
+    """
+    The path and query string of the URL
+
+    :param url: a URL or absolute path
+    :rtype: str
+    """
+    parts = urlsplit(url.strip())
+    if parts.query:
+        return "{}?{}".format(parts.path, parts.query)
+    return parts.path
+
+
+def read_query_file(path):
+    """
+    Read the requests from a query file
+
+    :param path: the query file path
+    :return: the requests in file order
+    :rtype: list of :class:`LoggedRequest`
+    """
+    requests = []
+    with open(path) as query_file:
+        for line in query_file:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                requests.append(LoggedRequest("GET", normalize_path(line)))
+    return requests
+
+
+def read_access_log(path, recent=None, prefix="/"):
+    """
+    Read the successful requests from an access log
+
+    :param path: the access log path
+    :param recent: only read this many of the most recent lines
+    :param prefix: only read the requests with paths starting with the prefix
+    :return: the requests in log order
+    :rtype: list of :class:`LoggedRequest`
+    """
+    requests = []
+    with open(path) as log_file:
+        # Stream the log, only the most recent lines are kept in memory
+        lines = deque(log_file, maxlen=recent) if recent else log_file
+        for line in lines:
+            match = ACCESS_LOG_PATTERN.search(line)
+            if match and match.group("status").startswith("2"):
+                request_path = normalize_path(match.group("path"))
+                if request_path.startswith(prefix):
+                    requests.append(LoggedRequest(match.group("method"), request_path))
+    return requests
+
+
+def most_popular(requests, top=None):
+    """
+    The distinct requests ordered by popularity
+
+    :param requests: the requests
+    :type requests: list of :class:`LoggedRequest`
+    :param top: the number of requests to return (default: all)
+    :rtype: list of :class:`LoggedRequest`
+    """
+    return [request for request, _ in Counter(requests).most_common(top)]
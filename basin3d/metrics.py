@@ -0,0 +1,336 @@
+"""
+`basin3d.metrics`
+*****************
+
+.. currentmodule:: basin3d.metrics
+
+:platform: Unix, Mac
+:synopsis: BASIN-3D data source latency and throughput metrics
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+.. contents:: Contents
+    :local:
+    :backlinks: top
+
+The calls to the data sources are measured for each data source and operation:
+
+    - *list, get:* the plugin view calls. The time of a `list` is the time spent in the plugin
+      while it yields its objects, not the time spent by the consumer of the objects.
+    - *get_url, post_url:* the HTTP requests to the data source APIs. Responses with an error
+      status (4xx, 5xx) are counted as errors.
+    - *login:* the OAuth2 token requests (See :class:`basin3d.plugins.HTTPOAuth2DataSource`).
+      The requests that do not get a token are counted as errors.
+
+The HTTP requests are attributed to the data source of the plugin view call that makes them.
+The metrics are exposed in the Prometheus text format at ``/metrics`` (See
+:func:`basin3d.views.metrics`) when ``METRICS_ENABLED`` is set in ``settings.BASIN3D`` (default: False):
+
+    - *basin3d_datasource_requests_total:* counter of the calls
+    - *basin3d_datasource_errors_total:* counter of the calls that failed
+    - *basin3d_datasource_request_duration_seconds:* histogram of the call latencies
+    - *basin3d_datasource_objects_total:* counter of the objects yielded by the plugin views
+
+The metrics are kept in memory for each process. Recording a call is a few dictionary
+updates under a lock.  The same calls are the fetch and construct phases of the request
+timings (See :mod:`basin3d.timing`).
+
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+from basin3d import timing
+
+#: The latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+#: The data source label of the calls made outside of a plugin view call
+UNKNOWN_DATASOURCE = "unknown"
+
+_REQUESTS = "basin3d_datasource_requests_total"
+_ERRORS = "basin3d_datasource_errors_total"
+_DURATION = "basin3d_datasource_request_duration_seconds"
+_OBJECTS = "basin3d_datasource_objects_total"
+
+_HELP = {
+    _REQUESTS: ("counter", "Calls to the data sources"),
+    _ERRORS: ("counter", "Calls to the data sources that failed"),
+    _DURATION: ("histogram", "Latency of the calls to the data sources in seconds"),
+    _OBJECTS: ("counter", "Objects yielded by the data source plugin views"),
+}
+
+
+class MetricsRegistry(object):
+    """
+    The data source metrics of the process
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def record(self, datasource, operation, duration, error=False, objects=None):
+        """
+        Record a call to a data source
+
+        :param datasource: the data source label
+        :param operation: the operation (list, get, get_url, post_url, login)
+        :param duration: the duration of the call in seconds
+        :param error: did the call fail?
+        :param objects: the number of objects yielded (`None` if not applicable)
+        """
+        labels = (datasource, operation)
+        with self._lock:
+            counters = self._counters
+            counters[_REQUESTS, labels] = counters.get((_REQUESTS, labels), 0) + 1
+            if error:
+                counters[_ERRORS, labels] = counters.get((_ERRORS, labels), 0) + 1
+            if objects is not None:
+                counters[_OBJECTS, labels] = counters.get((_OBJECTS, labels), 0) + objects
+
+            histogram = self._histograms.get(labels)
+            if histogram is None:
+                # bucket counts, +Inf count, sum
+                histogram = self._histograms[labels] = [[0] * len(self.buckets), 0, 0.0]
+            bucket = bisect_left(self.buckets, duration)
+            if bucket < len(self.buckets):
+                histogram[0][bucket] += 1
+            histogram[1] += 1
+            histogram[2] += duration
+
+    def reset(self):
+        """
+        Remove all the metrics
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """
+        The metrics in the Prometheus text exposition format
+
+        :rtype: str
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {labels: (list(h[0]), h[1], h[2]) for labels, h in self._histograms.items()}
+
+        lines = []
+        for name in (_REQUESTS, _ERRORS, _OBJECTS):
+            _header(lines, name)
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append("{}{{{}}} {}".format(name, _labels(labels), value))
+
+        _header(lines, _DURATION)
+        for labels, (bucket_counts, count, total) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(_DURATION, _labels(labels), bound, cumulative))
+            lines.append('{}_bucket{{{},le="+Inf"}} {}'.format(_DURATION, _labels(labels), count))
+            lines.append("{}_sum{{{}}} {}".format(_DURATION, _labels(labels), total))
+            lines.append("{}_count{{{}}} {}".format(_DURATION, _labels(labels), count))
+        return "\n".join(lines) + "\n"
+
+
+def _header(lines, name):
+    metric_type, help_text = _HELP[name]
+    lines.append("# HELP {} {}".format(name, help_text))
+    lines.append("# TYPE {} {}".format(name, metric_type))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    datasource, operation = labels
+    return 'datasource="{}",operation="{}"'.format(_escape(datasource), _escape(operation))
+
+
+#: The metrics of the process
+metrics = MetricsRegistry()
+
+_context = threading.local()
+
+
+def current_datasource():
+    """
+    The data source label of the plugin view call in progress in this thread
+
+    :rtype: str
+    """
+    return getattr(_context, "datasource", None) or UNKNOWN_DATASOURCE
+
+
+def datasource_label(datasource):
+    """
+    The metrics label of a data source
+
+    :param datasource: The data source
+    :type datasource: :class:`basin3d.models.DataSource`
+    :rtype: str
+    """
+    return getattr(datasource, "name", None) or UNKNOWN_DATASOURCE
+
+
+class _DatasourceContext(object):
+    """
+    Attributes the calls made in the block to the data source
+    """
+
+    def __init__(self, datasource):
+        self.datasource = datasource
+        self.previous = None
+
+    def __enter__(self):
+        self.previous = getattr(_context, "datasource", None)
+        _context.datasource = self.datasource
+
+    def __exit__(self, *exc_info):
+        _context.datasource = self.previous
+
+
+def _observe_objects(datasource, operation, duration, objects):
+    """
+    Yield the objects of a plugin view list, timing the plugin work of each object
+    """
+    count = 0
+    error = False
+    try:
+        with _DatasourceContext(datasource):
+            start = time.perf_counter()
+            iterator = iter(objects or [])
+            duration += time.perf_counter() - start
+        while True:
+            with _DatasourceContext(datasource):
+                start = time.perf_counter()
+                try:
+                    obj = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    duration += time.perf_counter() - start
+            count += 1
+            yield obj
+    except Exception:
+        error = True
+        raise
+    finally:
+        # Also recorded when the consumer stops early
+        metrics.record(datasource, operation, duration, error=error, objects=count)
+        timing.add("plugin", datasource, duration)
+
+
+def instrument_list(method):
+    """
+    Measure a plugin view `list` method
+
+    :param method: the plugin view method
+    :return: the measured method, a generator of the synthesized objects
+    """
+    if getattr(method, "_basin3d_instrumented", False):
+        return method
+
+    @functools.wraps(method)
+    def instrumented(self, *args, **kwargs):
+        datasource = datasource_label(getattr(self, "datasource", None))
+        start = time.perf_counter()
+        try:
+            with _DatasourceContext(datasource):
+                objects = method(self, *args, **kwargs)
+        except Exception:
+            metrics.record(datasource, "list", time.perf_counter() - start, error=True, objects=0)
+            raise
+        return _observe_objects(datasource, "list", time.perf_counter() - start, objects)
+
+    instrumented._basin3d_instrumented = True
+    return instrumented
+
+
+def instrument_get(method):
+    """
+    Measure a plugin view `get` method
+
+    :param method: the plugin view method
+    :return: the measured method
+    """
+    if getattr(method, "_basin3d_instrumented", False):
+        return method
+
+    @functools.wraps(method)
+    def instrumented(self, *args, **kwargs):
+        datasource = datasource_label(getattr(self, "datasource", None))
+        start = time.perf_counter()
+        try:
+            with _DatasourceContext(datasource):
+                obj = method(self, *args, **kwargs)
+        except Exception:
+            metrics.record(datasource, "get", time.perf_counter() - start, error=True, objects=0)
+            raise
+        duration = time.perf_counter() - start
+        metrics.record(datasource, "get", duration, objects=0 if obj is None else 1)
+        timing.add("plugin", datasource, duration)
+        return obj
+
+    instrumented._basin3d_instrumented = True
+    return instrumented
+
+
+def observe_http(operation, function, *args, **kwargs):
+    """
+    Measure an HTTP request to a data source. Responses with an error status
+    are counted as errors.
+
+    :param operation: the operation (get_url, post_url)
+    :param function: the function that sends the request
+    :return: the response
+    """
+    datasource = current_datasource()
+    start = time.perf_counter()
+    try:
+        response = function(*args, **kwargs)
+    except Exception:
+        metrics.record(datasource, operation, time.perf_counter() - start, error=True)
+        raise
+    duration = time.perf_counter() - start
+    metrics.record(datasource, operation, duration, error=getattr(response, "status_code", 200) >= 400)
+    timing.add("fetch", None if datasource == UNKNOWN_DATASOURCE else datasource, duration)
+    return response
+
+
+class ObservedCall(object):
+    """
+    Measure the calls made in a block. The block can mark the call as failed with
+    :meth:`fail`; exceptions mark it as failed.
+
+    :param datasource: the data source
+    :type datasource: :class:`basin3d.models.DataSource`
+    :param operation: the operation (e.g. login)
+    """
+
+    def __init__(self, datasource, operation):
+        self.datasource = datasource_label(datasource)
+        self.operation = operation
+        self.error = False
+        self.start = None
+
+    def fail(self):
+        """
+        Mark the call as failed
+        """
+        self.error = True
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        metrics.record(self.datasource, self.operation, time.perf_counter() - self.start,
+                       error=self.error or exc_type is not None)
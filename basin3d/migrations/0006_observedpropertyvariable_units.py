@@ -0,0 +1,18 @@
+# Generated by Django 2.0.13 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basin3d', '0005_OGC_Obs_model_update'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='observedpropertyvariable',
+            name='units',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+    ]
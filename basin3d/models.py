@@ -223,6 +223,7 @@ class ObservedPropertyVariable(models.Model):
         - *full_name:* string,
         - *abbreviation:* string,
         - *categories:* Array of strings (in order of priority).
+        - *units:* string, the canonical unit of measurement (See :mod:`basin3d.synthesis.units`)
 
     See http://vocabulary.odm2.org/variabletype/ for options, although I think we should have our own list (theirs is a bit funky).
 
@@ -238,6 +239,9 @@ class ObservedPropertyVariable(models.Model):
     # Ordered list of categories
     categories = StringListField(blank=True, null=True)
 
+    # Canonical unit of measurement
+    units = models.CharField(max_length=50, blank=True, null=True)
+
     class Meta:
         ordering = ('id',)
 
@@ -23,6 +23,7 @@ import requests
 import six
 import yaml
 from basin3d import get_url, post_url
+from basin3d.metrics import ObservedCall, instrument_get, instrument_list
 from basin3d.synthesis.models import Base
 from basin3d.apps import Basin3DConfig
 from basin3d.models import FeatureTypes
@@ -169,6 +170,13 @@ class DataSourcePluginViewMeta(type):
     """
     Metaclass for DataSource plugin views.  The should be registered in a subclass of
     :class:`basin3d.plugins.DataSourcePluginPoint` in attribute `plugin_view_classes`.
+
+    Plugin views that set ``supports_paging = True`` receive the ``offset`` and ``limit``
+    keyword arguments in ``list`` (See :mod:`basin3d.synthesis.pagination`). Monitoring feature
+    plugin views that set ``supports_spatial_filter = True`` receive the ``bbox`` and ``near``
+    spatial filters (See :mod:`basin3d.synthesis.spatial`).
+
+    The ``list`` and ``get`` calls of the plugin views are measured (See :mod:`basin3d.metrics`).
     """
 
     def __new__(cls, name, parents, dct):
@@ -250,6 +258,12 @@ class DataSourcePluginViewMeta(type):
         dct["get_observed_property"] = get_observed_property
         dct["get_observed_properties"] = get_observed_properties
 
+        # Measure the data source calls
+        if "list" in dct:
+            dct["list"] = instrument_list(dct["list"])
+        if "get" in dct:
+            dct["get"] = instrument_get(dct["get"])
+
         return type.__new__(cls, name, parents, dct)
 
     def __init__(cls, name, parents, dct):
@@ -552,7 +566,7 @@ class HTTPOAuth2DataSource(HTTPConnectionDataSource):
 
         # If there are credentials then make the api call
         if self.credentials:
-            self.credentials = yaml.load(self.credentials)
+            self.credentials = yaml.safe_load(self.credentials)
             if self._validate_credentials():
                 return self.credentials["client_id"], self.credentials["client_secret"]
             raise InvalidOrMissingCredentials("client_id and client_secret are missing or invalid")
@@ -598,18 +612,20 @@ class HTTPOAuth2DataSource(HTTPConnectionDataSource):
         try:
 
             # Login to the Data Source
-            res = requests.post(url, params={"scope": self.auth_scope, "grant_type": self.grant_type},
-                                auth=(self.client_id, self.client_secret),
-                                verify=self.verify_ssl)
-
-            # Validate the response
-            if res.status_code != requests.codes.ok:
-                logger.error("Authentication  error {}: {}".format(url, res.content))
-                return None
-
-            # Get the JSON content (This has the token)
-            result_json = res.json()
-            self.token = result_json
+            with ObservedCall(self.datasource, "login") as call:
+                res = requests.post(url, params={"scope": self.auth_scope, "grant_type": self.grant_type},
+                                    auth=(self.client_id, self.client_secret),
+                                    verify=self.verify_ssl)
+
+                # Validate the response
+                if res.status_code != requests.codes.ok:
+                    call.fail()
+                    logger.error("Authentication  error {}: {}".format(url, res.content))
+                    return None
+
+                # Get the JSON content (This has the token)
+                result_json = res.json()
+                self.token = result_json
         except Exception as e:
             logger.error("Authentication  error {}: {}".format(url, e))
             # Access is denied!!
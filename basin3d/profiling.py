@@ -0,0 +1,172 @@
+"""
+`basin3d.profiling`
+*******************
+
+.. currentmodule:: basin3d.profiling
+
+:platform: Unix, Mac
+:synopsis: BASIN-3D memory profiling of the synthesis responses
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+.. contents:: Contents
+    :local:
+    :backlinks: top
+
+:class:`MemoryProfile` traces the memory allocations (See :mod:`tracemalloc`) of the
+requests of its thread and takes a snapshot at the phase boundaries of
+:meth:`basin3d.synthesis.viewsets.DataSourcePluginViewSet.list`:
+
+    - *collect:* the synthesized objects of all the data sources are collected
+    - *serialize:* the objects are serialized
+    - *render:* the response body is rendered
+
+For each phase the profile has the memory allocated at its end, the peak memory
+and the allocation sites that grew the most during the phase.  The peak is the peak of the
+phase when :func:`tracemalloc.reset_peak` is available (Python 3.9+), and the peak since the
+start of the profile otherwise.
+
+Profile a request with ``manage.py profilememory <path>``, or in the tests with the
+``memory_profile`` fixture::
+
+    def test_timeseries_memory(client, memory_profile):
+        client.get("/synthesis/measurement_tvp_timeseries/?...")
+        assert memory_profile.peak() < 50 * 1024 * 1024
+
+Profiling slows the requests down, it is not meant for production.
+
+"""
+import threading
+import tracemalloc
+from collections import OrderedDict
+
+#: The phases of :meth:`basin3d.synthesis.viewsets.DataSourcePluginViewSet.list`
+PHASE_COLLECT = "collect"
+PHASE_SERIALIZE = "serialize"
+PHASE_RENDER = "render"
+
+_context = threading.local()
+
+_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"))
+
+
+class MemoryProfile(object):
+    """
+    Profile the memory of the requests of this thread
+
+    :param top: the number of allocation sites to report for each phase
+    :param frames: the number of frames of each allocation site
+    """
+
+    def __init__(self, top=10, frames=1):
+        self.top = top
+        self.frames = frames
+        self.phases = []
+        self._previous = None
+        self._tracing = False
+
+    def start(self):
+        """
+        Start tracing the memory allocations
+
+        :return: the profile
+        """
+        self._tracing = tracemalloc.is_tracing()
+        if not self._tracing:
+            tracemalloc.start(self.frames)
+        elif hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._previous = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        _context.profile = self
+        return self
+
+    def stop(self):
+        """
+        Stop tracing the memory allocations
+        """
+        if getattr(_context, "profile", None) is self:
+            _context.profile = None
+        self._previous = None
+        if not self._tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def mark(self, name):
+        """
+        End a phase: record the memory and the allocation sites that grew since the previous phase
+
+        :param name: the phase name
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        key_type = "lineno" if self.frames == 1 else "traceback"
+        sites = []
+        grown = [stat for stat in snapshot.compare_to(self._previous, key_type) if stat.size_diff > 0]
+        for stat in sorted(grown, key=lambda stat: stat.size_diff, reverse=True)[:self.top]:
+            sites.append(OrderedDict([
+                ("site", [str(frame) for frame in stat.traceback] if self.frames > 1 else str(stat.traceback[0])),
+                ("size_diff", stat.size_diff),
+                ("count_diff", stat.count_diff),
+            ]))
+        self.phases.append(OrderedDict([
+            ("name", name),
+            ("current_bytes", current),
+            ("peak_bytes", peak),
+            ("top", sites),
+        ]))
+        self._previous = snapshot
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    def peak(self, name=None):
+        """
+        The peak memory of the phases
+
+        :param name: the phase name (default: all the phases)
+        :return: the peak in bytes, `0` if there is no such phase
+        """
+        return max([phase["peak_bytes"] for phase in self.phases if name is None or phase["name"] == name],
+                   default=0)
+
+    def report(self):
+        """
+        The phases of the profile
+
+        :rtype: list of :class:`collections.OrderedDict`
+        """
+        return list(self.phases)
+
+
+def mark(name):
+    """
+    End a phase of the profile of this thread, if it is profiled
+
+    :param name: the phase name
+    """
+    profile = getattr(_context, "profile", None)
+    if profile is not None:
+        profile.mark(name)
+
+
+def mark_rendered(response):
+    """
+    End the render phase of the profile of this thread when the response is rendered,
+    if it is profiled
+
+    :param response: the response
+    :type response: :class:`rest_framework.response.Response`
+    :return: the response
+    """
+    profile = getattr(_context, "profile", None)
+    if profile is not None:
+        response.add_post_render_callback(lambda r: profile.mark(PHASE_RENDER))
+    return response
@@ -181,7 +181,7 @@ class ObservedPropertyVariableSerializer(serializers.HyperlinkedModelSerializer)
     class Meta:
         model = ObservedPropertyVariable
         depth = 2
-        fields = ('url', 'id', 'full_name', 'categories', 'datasources')
+        fields = ('url', 'id', 'full_name', 'categories', 'units', 'datasources')
 
 
 class ObservedPropertySerializer(serializers.HyperlinkedModelSerializer):
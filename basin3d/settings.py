@@ -17,4 +17,17 @@ REST_FRAMEWORK = {
 BASIN3D = {
     'SYNTHESIS': True,
     'DIRECT_API': True,
+    'CATALOG_ENABLED': True,  # Serve monitoring feature listings from the catalog snapshots
+    'CATALOG_REFRESH_INTERVAL': 300,  # Seconds between catalog refreshes (0 disables the scheduler)
+    'TIMESERIES_CACHE_DIR': None,  # Directory for the disk-backed timeseries cache (None disables it)
+    'TIMESERIES_CACHE_MAX_BYTES': 1024 ** 3,  # Size bound of the timeseries cache
+    'TIMESERIES_CACHE_MAX_AGE': 3600,  # Seconds to cache the timeseries of ranges that reach the current date
+    'BATCH_MAX_QUERIES': 100,  # Maximum number of queries in a /synthesis/batch/ request
+    'BATCH_CONCURRENCY': 4,  # Maximum number of queries of a batch to run at once
+    'JOBS_DIR': None,  # Directory for the extraction job results (None uses the system temporary directory)
+    'JOBS_CONCURRENCY': 2,  # Maximum number of extraction jobs to run at once
+    'JOBS_CHUNK_SIZE': 20,  # Number of monitoring features in an extraction job chunk
+    'JOBS_MAX_AGE': 86400,  # Seconds to keep the finished extraction jobs
+    'METRICS_ENABLED': False,  # Expose the data source metrics at /metrics in the Prometheus text format
+    'SERVER_TIMING_FOOTER': False,  # Wrap JSON responses with the request timings for X-Debug-Timing requests
 }
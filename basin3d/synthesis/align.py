@@ -0,0 +1,220 @@
+"""
+`basin3d.synthesis.align`
+*************************
+
+.. currentmodule:: basin3d.synthesis.align
+
+:synopsis: Align synthesized timeseries onto a shared time grid as a wide table
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Analyses that correlate several variables at a site need the timeseries aligned by
+timestamp.  With ``?align=NULL|LINEAR`` the timeseries of a query are aligned onto a shared
+time grid (every timestamp of any of the series) and returned as a wide table with a
+`timestamp` column and one column per timeseries.  The gaps of a series are filled with:
+
+    - *NULL:* `null` values
+    - *LINEAR:* values interpolated in time between the neighbouring values of the series.
+      Gaps before the first and after the last value of a series stay `null`.
+
+Combine with ``aggregation_duration`` to align the series onto a regular grid.  The table is
+columnar JSON::
+
+    {"columns": ["timestamp", "A-1", "A-2"],
+     "series": [{"column": "A-1", "id": "A-1", "observed_property": "1", ...}, ...],
+     "data": {"timestamp": [...], "A-1": [...], "A-2": [...]}}
+
+or CSV with ``?format=csv`` (See :class:`WideTableCSVRenderer`).
+
+The table is built in a single k-way merge (:func:`heapq.merge`) of the time ordered series
+that appends each value to its column, without a timestamp lookup for each point.
+
+----------------------------------
+
+"""
+import csv
+import heapq
+import io
+from collections import OrderedDict, namedtuple
+from datetime import date
+
+from rest_framework import renderers
+
+from basin3d.synthesis.merge import ordered_timed_points
+from basin3d.synthesis.query import QUERY_PARAM_ALIGN
+
+ALIGN_NULL = "NULL"
+ALIGN_LINEAR = "LINEAR"
+
+#: Supported gap fill methods
+ALIGN_METHODS = [ALIGN_NULL, ALIGN_LINEAR]
+
+#: The name of the time grid column
+TIMESTAMP_COLUMN = "timestamp"
+
+
+class Alignment(namedtuple('Alignment', ['fill'])):
+    """
+    The requested alignment
+
+    `(fill)`
+    """
+
+    @classmethod
+    def from_query_plan(cls, plan):
+        """
+        Get the alignment requested in the query
+
+        :param plan: The query plan
+        :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+        :return: the alignment or `None` if none was requested
+        :rtype: :class:`Alignment`
+        :raises ValueError: if the `align` query parameter is invalid
+        """
+        if QUERY_PARAM_ALIGN not in plan.query_params:
+            return None
+        fill = plan.query_params[QUERY_PARAM_ALIGN].upper()
+        if fill not in ALIGN_METHODS:
+            raise ValueError("{} must be one of {}".format(QUERY_PARAM_ALIGN, "|".join(ALIGN_METHODS)))
+        return cls(fill)
+
+
+def _indexed_points(index, result_points):
+    for moment, point in ordered_timed_points(result_points):
+        yield moment, index, point
+
+
+def align_points(series):
+    """
+    Align time value pairs onto the time grid of all their timestamps. When a series has
+    several points with the same timestamp, its first point is kept.
+
+    :param series: the result points of each series
+    :type series: list
+    :return: tuple `(timestamps, moments, columns)`: the timestamps of the grid as given in
+        the series, the timestamps as datetimes and a list of values (`None` in the gaps) for
+        each series
+    """
+    timestamps, moments = [], []
+    columns = [[] for _ in series]
+    indexed = [_indexed_points(index, points) for index, points in enumerate(series)]
+    for moment, index, point in heapq.merge(*indexed, key=lambda indexed_point: indexed_point[0]):
+        if not moments or moment != moments[-1]:
+            timestamps.append(point[0])
+            moments.append(moment)
+            for column in columns:
+                column.append(None)
+        column = columns[index]
+        if column[-1] is None:
+            column[-1] = point[1]
+    return timestamps, moments, columns
+
+
+def interpolate(moments, column):
+    """
+    Fill the gaps of a column with values linearly interpolated in time. The gaps
+    before the first and after the last value are left.
+
+    :param moments: the time grid as datetimes
+    :param column: the values of the column, `None` in the gaps. The column is updated.
+    :return: the column
+    """
+    previous = None
+    for index, value in enumerate(column):
+        if value is None:
+            continue
+        if previous is not None and index - previous > 1:
+            start, start_value = moments[previous], column[previous]
+            span = (moments[index] - start).total_seconds()
+            for gap in range(previous + 1, index):
+                column[gap] = start_value + (value - start_value) * (moments[gap] - start).total_seconds() / span
+        previous = index
+    return column
+
+
+def column_names(observations):
+    """
+    The column names of the timeseries: their ids, made unique
+
+    :param observations: the timeseries
+    :return: the names
+    :rtype: list
+    """
+    names = []
+    used = {TIMESTAMP_COLUMN}
+    for number, observation in enumerate(observations, start=1):
+        name = str(observation.id) if observation.id else "series{}".format(number)
+        unique_name, suffix = name, 1
+        while unique_name in used:
+            suffix += 1
+            unique_name = "{}_{}".format(name, suffix)
+        used.add(unique_name)
+        names.append(unique_name)
+    return names
+
+
+def wide_table(observations, alignment):
+    """
+    Align the timeseries into a wide table
+
+    :param observations: the timeseries
+    :type observations: list of :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+    :param alignment: the requested alignment
+    :type alignment: :class:`Alignment`
+    :return: the table with the `columns`, the `series` metadata and the column `data`
+    :rtype: :class:`collections.OrderedDict`
+    """
+    names = column_names(observations)
+    timestamps, moments, columns = align_points([observation.result_points for observation in observations])
+    if alignment.fill == ALIGN_LINEAR:
+        for column in columns:
+            interpolate(moments, column)
+
+    series = []
+    for name, observation in zip(names, observations):
+        feature_of_interest = observation.feature_of_interest
+        series.append(OrderedDict([
+            ("column", name),
+            ("id", observation.id),
+            ("feature_of_interest", getattr(feature_of_interest, "id", feature_of_interest)),
+            ("observed_property", observation.observed_property),
+            ("unit_of_measurement", observation.unit_of_measurement),
+            ("aggregation_duration", observation.aggregation_duration),
+            ("statistic", observation.statistic),
+        ]))
+
+    data = OrderedDict([(TIMESTAMP_COLUMN, timestamps)])
+    data.update(zip(names, columns))
+    return OrderedDict([("columns", [TIMESTAMP_COLUMN] + names), ("series", series), ("data", data)])
+
+
+def _csv_value(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class WideTableCSVRenderer(renderers.BaseRenderer):
+    """
+    Renders a wide table (See :func:`wide_table`) or a list of records (e.g. the
+    timeseries summaries) as CSV with a header row. Other responses (e.g. errors) are
+    rendered as rows of keys and values.
+    """
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        if isinstance(data, dict) and "columns" in data and "data" in data:
+            writer.writerow(data["columns"])
+            for row in zip(*[data["data"][name] for name in data["columns"]]):
+                writer.writerow([_csv_value(value) for value in row])
+        elif isinstance(data, list) and data and isinstance(data[0], dict):
+            writer.writerow(data[0].keys())
+            for record in data:
+                writer.writerow([_csv_value(value) for value in record.values()])
+        elif isinstance(data, dict):
+            writer.writerows(data.items())
+        return output.getvalue().encode(self.charset)
@@ -0,0 +1,253 @@
+"""
+`basin3d.synthesis.batch`
+*************************
+
+.. currentmodule:: basin3d.synthesis.batch
+
+:synopsis: Run many synthesis queries in a single request
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Clients that need many small listings (e.g. one timeseries query per variable) send them
+together with ``POST /synthesis/batch/``.  The body is a list of query specifications with an
+`id`, the synthesis listing `path` and optional query `params`::
+
+    [{"id": "temperature", "path": "/synthesis/measurement_tvp_timeseries/",
+      "params": {"monitoring_features": ["A-1", "A-2"], "observed_property_variables": "ACT",
+                 "start_date": "2016-02-01"}},
+     {"id": "points", "path": "/synthesis/monitoringfeatures/points/?bbox=-21,70,-20,71"}]
+
+The response has the `status` and `data` of each query keyed by the query id.  Queries with
+the same path and parameters are run once.  The other queries run concurrently and share their
+plugin work (See :class:`SharedWork`): a data source is asked once for the queries that have
+the same parameters for that data source.
+
+The batches are configured in ``settings.BASIN3D``:
+
+    - *BATCH_MAX_QUERIES:* maximum number of queries in a batch (default: 100)
+    - *BATCH_CONCURRENCY:* maximum number of queries of a batch to run at once (default: 4)
+
+----------------------------------
+
+"""
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from django.conf import settings
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from basin3d.synthesis.query import synthesis_request
+
+logger = logging.getLogger(__name__)
+
+#: Default maximum number of queries in a batch
+DEFAULT_MAX_QUERIES = 100
+
+#: Default maximum number of queries of a batch to run at once
+DEFAULT_CONCURRENCY = 4
+
+
+def get_max_queries():
+    """
+    The configured maximum number of queries in a batch
+
+    :rtype: int
+    """
+    return settings.BASIN3D.get("BATCH_MAX_QUERIES", DEFAULT_MAX_QUERIES)
+
+
+def get_concurrency():
+    """
+    The configured maximum number of queries of a batch to run at once
+
+    :rtype: int
+    """
+    return max(1, settings.BASIN3D.get("BATCH_CONCURRENCY", DEFAULT_CONCURRENCY))
+
+
+class BatchQuery(namedtuple('BatchQuery', ['id', 'path', 'query_string'])):
+    """
+    A query of a batch. The query string has the parameters in sorted order
+    so that the same queries have the same :attr:`url`.
+
+    `(id, path, query_string)`
+    """
+
+    @property
+    def url(self):
+        """
+        The path with the query string
+        """
+        return "{}?{}".format(self.path, self.query_string) if self.query_string else self.path
+
+
+def param_value(name, value):
+    """
+    Convert a query specification parameter value to a query string value
+    """
+    if isinstance(value, (list, tuple)):
+        return ",".join(param_value(name, v) for v in value)
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    raise ValueError("The value of query parameter '{}' must be a string, number or list".format(name))
+
+
+def parse_batch(data):
+    """
+    Parse the query specifications of a batch request
+
+    :param data: the request body, a list of `{"id": ..., "path": ..., "params": {...}}`
+    :return: the queries in request order
+    :rtype: list of :class:`BatchQuery`
+    :raises ValueError: if the batch is invalid
+    """
+    if not isinstance(data, list) or not data:
+        raise ValueError("The batch must be a non-empty list of queries")
+    if len(data) > get_max_queries():
+        raise ValueError("The batch has more than {} queries".format(get_max_queries()))
+
+    queries = []
+    query_ids = set()
+    for spec in data:
+        if not isinstance(spec, dict) or not isinstance(spec.get("path"), str):
+            raise ValueError("Each query must have a 'path'")
+        query_id = spec.get("id")
+        if not isinstance(query_id, (str, int)) or isinstance(query_id, bool):
+            raise ValueError("Each query must have an 'id'")
+        query_id = str(query_id)
+        if query_id in query_ids:
+            raise ValueError("Duplicate query id '{}'".format(query_id))
+        query_ids.add(query_id)
+
+        parts = urlsplit(spec["path"])
+        if not parts.path.startswith("/synthesis/") or parts.scheme or parts.netloc:
+            raise ValueError("Query '{}' path must start with /synthesis/".format(query_id))
+        params = spec.get("params") or {}
+        if not isinstance(params, dict):
+            raise ValueError("Query '{}' params must be an object".format(query_id))
+
+        query_params = OrderedDict(parse_qsl(parts.query, keep_blank_values=True))
+        for name, value in params.items():
+            query_params[name] = param_value(name, value)
+        queries.append(BatchQuery(query_id, parts.path, urlencode(sorted(query_params.items()))))
+    return queries
+
+
+class SharedWork(object):
+    """
+    Results of the work shared by the concurrent queries of a batch. The first query to
+    ask for a key does the work, the other queries wait for its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}
+
+    def run(self, key, function):
+        """
+        Get the result for the key, running the function if no other query has
+
+        :param key: the key of the work
+        :param function: function without arguments that does the work
+        :return: the result of the function
+        """
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+        if owner:
+            try:
+                future.set_result(function())
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+
+def get_shared_work(request):
+    """
+    Get the shared work of the batch that the request is part of
+
+    :param request: The request
+    :return: the shared work or `None` if the request is not part of a batch
+    :rtype: :class:`SharedWork`
+    """
+    return getattr(request, "_basin3d_shared_work", None)
+
+
+def resolve_list_view(path):
+    """
+    Get the view that lists the synthesized objects for the path
+
+    :param path: the request path
+    :return: the view function and its keyword arguments, `None` if the path is not a synthesis listing
+    """
+    from basin3d.synthesis.viewsets import DataSourcePluginViewSet
+
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    view_class = getattr(match.func, "cls", None)
+    actions = getattr(match.func, "actions", {}) or {}
+    if view_class and issubclass(view_class, DataSourcePluginViewSet) and actions.get("get") == "list":
+        return match.func, match.kwargs
+    return None
+
+
+def run_query(query, base_request, shared_work):
+    """
+    Run a query of a batch
+
+    :param query: The query
+    :type query: :class:`BatchQuery`
+    :param base_request: the batch request
+    :param shared_work: the shared work of the batch
+    :type shared_work: :class:`SharedWork`
+    :return: the result `{"status": ..., "data": ...}`
+    :rtype: dict
+    """
+    resolved = resolve_list_view(query.path)
+    if resolved is None:
+        return OrderedDict([("status", 404), ("data", {'success': False,
+                                                       'detail': "{} is not a synthesis listing".format(query.path)})])
+
+    view, view_kwargs = resolved
+    request = synthesis_request(query.url, base_request)
+    request._request._basin3d_shared_work = shared_work
+    try:
+        response = view(request._request, **view_kwargs)
+        return OrderedDict([("status", response.status_code), ("data", response.data)])
+    except Exception as e:
+        logger.exception("Batch query '%s' failed", query.url)
+        return OrderedDict([("status", 500), ("data", {'success': False, 'detail': str(e)})])
+    finally:
+        connections.close_all()
+
+
+def run_batch(queries, base_request):
+    """
+    Run the queries of a batch concurrently. The same queries are run once.
+
+    :param queries: The queries
+    :type queries: list of :class:`BatchQuery`
+    :param base_request: the batch request
+    :type base_request: :class:`rest_framework.request.Request`
+    :return: the results keyed by query id, in request order
+    :rtype: :class:`collections.OrderedDict`
+    """
+    unique = OrderedDict()
+    for query in queries:
+        unique.setdefault(query.url, query)
+
+    shared_work = SharedWork()
+    with ThreadPoolExecutor(max_workers=min(get_concurrency(), len(unique))) as executor:
+        results = dict(zip(unique, executor.map(lambda query: run_query(query, base_request, shared_work),
+                                                unique.values())))
+    return OrderedDict((query.id, results[query.url]) for query in queries)
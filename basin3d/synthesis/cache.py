@@ -0,0 +1,418 @@
+"""
+`basin3d.synthesis.cache`
+*************************
+
+.. currentmodule:: basin3d.synthesis.cache
+
+:synopsis: Persistent disk-backed cache for synthesized timeseries
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Synthesized :class:`~basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+objects are stored in a SQLite database so that warmed upstream data survives restarts and
+deploys.  Each cached query records the date range it covers, and the result points are stored
+in time ordered segments.  A query for a date range inside a cached range is answered by reading
+only the overlapping segments.  The least recently used queries are evicted when the cache
+grows past its size bound.
+
+Queries with an open end date, or an end date of yesterday or later, may still get new upstream
+data. Their entries expire after a maximum age and are synthesized again on the next request.
+
+The cache is configured in ``settings.BASIN3D``:
+
+    - *TIMESERIES_CACHE_DIR:* directory for the cache database. The cache is disabled when
+      this is not set (default: None)
+    - *TIMESERIES_CACHE_MAX_BYTES:* size bound for the cached data (default: 1 GiB)
+    - *TIMESERIES_CACHE_MAX_AGE:* seconds to serve the entries of ranges that reach the current date.
+      `None` serves them until they are evicted (default: 3600)
+
+----------------------------------
+
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+from basin3d.synthesis.query import QUERY_PARAM_ALIGN, QUERY_PARAM_DOWNSAMPLE, QUERY_PARAM_END_DATE, \
+    QUERY_PARAM_MAX_POINTS, QUERY_PARAM_MERGE, QUERY_PARAM_START_DATE, QUERY_PARAM_TZ, QUERY_PARAM_UNITS
+
+logger = logging.getLogger(__name__)
+
+#: Default size bound for the cache in bytes
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+#: Default maximum age in seconds of the entries for ranges that reach the current date
+DEFAULT_MAX_AGE = 3600
+
+#: The number of result points stored in a segment
+SEGMENT_SIZE = 4096
+
+#: Query parameters of the downsampling, units, time zone, merge and align stages. These
+#: stages are applied to the cached timeseries.
+POST_CACHE_QUERY_PARAMS = (QUERY_PARAM_MAX_POINTS, QUERY_PARAM_DOWNSAMPLE, QUERY_PARAM_UNITS, QUERY_PARAM_TZ,
+                           QUERY_PARAM_MERGE, QUERY_PARAM_ALIGN)
+
+#: Query parameters that do not change the cached result
+IGNORED_QUERY_PARAMS = {"format", "fields", "datasource"} | set(POST_CACHE_QUERY_PARAMS)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    datasource TEXT NOT NULL,
+    range_start TEXT,
+    range_end TEXT,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_key ON entries (key);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS observations (
+    entry_id INTEGER NOT NULL REFERENCES entries (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (entry_id, position)
+);
+CREATE TABLE IF NOT EXISTS segments (
+    entry_id INTEGER NOT NULL REFERENCES entries (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    sequence INTEGER NOT NULL,
+    first TEXT,
+    last TEXT,
+    points BLOB NOT NULL,
+    PRIMARY KEY (entry_id, position, sequence)
+);
+CREATE INDEX IF NOT EXISTS segments_range ON segments (entry_id, position, last, first);
+"""
+
+
+def get_cache_dir():
+    """
+    :return: The configured cache directory. `None` if the cache is disabled
+    """
+    return settings.BASIN3D.get("TIMESERIES_CACHE_DIR", None)
+
+
+def timestamp_key(timestamp):
+    """
+    A sortable string for a result point timestamp
+
+    :param timestamp: a date, datetime or ISO 8601 string
+    :rtype: str
+    """
+    if timestamp is None:
+        return None
+    if hasattr(timestamp, "isoformat"):
+        return timestamp.isoformat()
+    return str(timestamp)
+
+
+def in_range(key, start=None, end=None):
+    """
+    Is the timestamp key in the (inclusive) range? A date end includes the whole day.
+
+    :param key: timestamp key (See :func:`timestamp_key`)
+    :param start: start of the range (ISO 8601)
+    :param end: end of the range (ISO 8601)
+    :rtype: bool
+    """
+    if key is None:
+        return start is None and end is None
+    return (start is None or key >= start) and (end is None or key[:len(end)] <= end)
+
+
+def live_range_start():
+    """
+    The earliest end date of the ranges that may still get new upstream data. It is
+    the day before the current UTC date, so that it holds in the time zones of all the data sources.
+
+    :return: ISO 8601 date
+    :rtype: str
+    """
+    return (datetime.utcnow() - timedelta(days=1)).date().isoformat()
+
+
+def _normalize(value):
+    """
+    Convert a synthesized query parameter value to something that can be put in a key
+    """
+    if isinstance(value, models.Model):
+        return value.pk
+    if isinstance(value, (list, tuple, set, frozenset, models.QuerySet)):
+        return sorted(str(_normalize(v)) for v in value)
+    return value if isinstance(value, (int, float, bool)) or value is None else str(value)
+
+
+def cache_key(synthesis_model, datasource, query_params):
+    """
+    Build the cache key for a synthesis query. The date range is not part of the key.
+
+    :param synthesis_model: the synthesis model class
+    :param datasource: The data source
+    :type datasource: :class:`basin3d.models.DataSource`
+    :param query_params: the query parameters that were passed to the plugin view
+    :type query_params: dict
+    :return: the key
+    :rtype: str
+    """
+    params = {k: _normalize(v) for k, v in query_params.items()
+              if k not in IGNORED_QUERY_PARAMS and k not in (QUERY_PARAM_START_DATE, QUERY_PARAM_END_DATE)}
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return "{}:{}:{}".format(synthesis_model.__name__, datasource.id_prefix, digest)
+
+
+class _Pickler(pickle.Pickler):
+    """
+    Store references to Django models instead of the models themselves.  This keeps
+    data source credentials out of the cache.
+    """
+
+    def persistent_id(self, obj):
+        if isinstance(obj, models.Model) and obj.pk is not None:
+            return obj._meta.label, obj.pk
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """
+    Resolve the Django model references from :class:`_Pickler`
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._models = {}
+
+    def persistent_load(self, pid):
+        if pid not in self._models:
+            label, pk = pid
+            self._models[pid] = apps.get_model(label).objects.get(pk=pk)
+        return self._models[pid]
+
+
+class TimeseriesCache(object):
+    """
+    SQLite backed cache of synthesized timeseries observations
+
+    :param path: path of the cache database file
+    :param max_bytes: size bound for the cached data
+    :param max_age: seconds to serve the entries of ranges that reach the current date
+        (See :func:`live_range_start`), `None` to serve them until they are evicted
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        """
+        :return: the connection for the current thread
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+        return connection
+
+    def _dumps(self, obj):
+        buffer = io.BytesIO()
+        _Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+        return buffer.getvalue()
+
+    def _loads(self, data):
+        return _Unpickler(io.BytesIO(data)).load()
+
+    def _find_entry(self, key, start, end):
+        """
+        Find the most recently used entry for the key that covers the date range. The
+        entries of ranges that reach the current date are skipped when they are older than
+        the maximum age.
+
+        :return: the entry row `(id, created)` or `None`
+        """
+        expired = time.time() - self.max_age if self.max_age is not None else None
+        return self._connection().execute(
+            "SELECT id, created FROM entries WHERE key = ? "
+            "AND (range_start IS NULL OR (? IS NOT NULL AND range_start <= ?)) "
+            "AND ((range_end IS NULL AND ? IS NULL) OR (? IS NOT NULL AND range_end >= ?)) "
+            "AND (? IS NULL OR created >= ? OR (range_end IS NOT NULL AND range_end < ?)) "
+            "ORDER BY accessed DESC LIMIT 1",
+            (key, start, start, end, end, end, expired, expired, live_range_start())).fetchone()
+
+    def version(self, key, start=None, end=None):
+        """
+        The version of the cached observations for the key and date range. The
+        observations are not read.
+
+        :param key: the cache key (See :func:`cache_key`)
+        :param start: start date (ISO 8601), `None` for an open start
+        :param end: end date (ISO 8601), `None` for an open end
+        :return: tuple `(entry id, created)` or `None` if the range is not cached
+        :rtype: tuple
+        """
+        row = self._find_entry(key, start, end)
+        return tuple(row) if row else None
+
+    def get(self, key, start=None, end=None):
+        """
+        Get the cached observations for the key and date range
+
+        :param key: the cache key (See :func:`cache_key`)
+        :param start: start date (ISO 8601), `None` for an open start
+        :param end: end date (ISO 8601), `None` for an open end (only matches open ended entries)
+        :return: the observations or `None` if the range is not cached
+        :rtype: list
+        """
+        connection = self._connection()
+        row = self._find_entry(key, start, end)
+        if row is None:
+            return None
+
+        entry_id = row[0]
+        connection.execute("UPDATE entries SET accessed = ? WHERE id = ?", (time.time(), entry_id))
+
+        observations = []
+        for position, metadata in connection.execute(
+                "SELECT position, metadata FROM observations WHERE entry_id = ? ORDER BY position", (entry_id,)):
+            observation = self._loads(metadata)
+            points = []
+            # Only read the segments that overlap the range
+            for segment, in connection.execute(
+                    "SELECT points FROM segments WHERE entry_id = ? AND position = ? "
+                    "AND (? IS NULL OR last IS NULL OR last >= ?) "
+                    "AND (? IS NULL OR first IS NULL OR substr(first, 1, length(?)) <= ?) "
+                    "ORDER BY sequence",
+                    (entry_id, position, start, start, end, end, end)):
+                points.extend(p for p in pickle.loads(segment)
+                              if in_range(timestamp_key(p[0]), start, end))
+            observation.result_points = points
+            observations.append(observation)
+        return observations
+
+    def put(self, key, datasource, observations, start=None, end=None):
+        """
+        Cache the observations synthesized for the key and date range
+
+        :param key: the cache key (See :func:`cache_key`)
+        :param datasource: The data source the observations were synthesized from
+        :type datasource: :class:`basin3d.models.DataSource`
+        :param observations: the synthesized observations
+        :type observations: list
+        :param start: start date (ISO 8601) of the query, `None` for an open start
+        :param end: end date (ISO 8601) of the query, `None` for an open end
+        """
+        rows = []
+        size = 0
+        for position, observation in enumerate(observations):
+            points = list(observation.result_points or [])
+            observation.result_points = []
+            try:
+                metadata = self._dumps(observation)
+            finally:
+                observation.result_points = points
+            size += len(metadata)
+
+            segments = []
+            # Keep the segments time ordered so that range reads can skip segments
+            points = sorted(points, key=lambda p: timestamp_key(p[0]) or "")
+            for sequence, i in enumerate(range(0, len(points), SEGMENT_SIZE)):
+                segment = points[i:i + SEGMENT_SIZE]
+                data = pickle.dumps([tuple(p) for p in segment], protocol=pickle.HIGHEST_PROTOCOL)
+                size += len(data)
+                segments.append((sequence, timestamp_key(segment[0][0]), timestamp_key(segment[-1][0]), data))
+            rows.append((position, metadata, segments))
+
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DELETE FROM entries WHERE key = ? AND range_start IS ? AND range_end IS ?",
+                               (key, start, end))
+            entry_id = connection.execute(
+                "INSERT INTO entries (key, datasource, range_start, range_end, created, accessed, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, datasource.id_prefix, start, end, now, now, size)).lastrowid
+            for position, metadata, segments in rows:
+                connection.execute("INSERT INTO observations (entry_id, position, metadata) VALUES (?, ?, ?)",
+                                   (entry_id, position, metadata))
+                connection.executemany(
+                    "INSERT INTO segments (entry_id, position, sequence, first, last, points) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(entry_id, position) + segment for segment in segments])
+        self.evict()
+
+    def size(self):
+        """
+        :return: the number of bytes of cached data
+        :rtype: int
+        """
+        return self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is within its size bound
+        """
+        connection = self._connection()
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for entry_id, size in connection.execute("SELECT id, size FROM entries ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append((entry_id,))
+            total -= size
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany("DELETE FROM entries WHERE id = ?", evicted)
+        logger.debug("Evicted {} timeseries cache entries".format(len(evicted)))
+
+    def clear(self):
+        """
+        Remove all of the entries
+        """
+        with self._connection() as connection:
+            connection.execute("DELETE FROM entries")
+
+
+_caches = {}  # type: Dict[str, TimeseriesCache]
+_caches_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Get the timeseries cache configured in ``settings.BASIN3D``
+
+    :return: The cache or `None` if it is disabled
+    :rtype: :class:`TimeseriesCache`
+    """
+    cache_dir = get_cache_dir()
+    if not cache_dir:
+        return None
+    with _caches_lock:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = TimeseriesCache(
+                os.path.join(cache_dir, "timeseries.sqlite3"),
+                max_bytes=settings.BASIN3D.get("TIMESERIES_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+                max_age=settings.BASIN3D.get("TIMESERIES_CACHE_MAX_AGE", DEFAULT_MAX_AGE))
+        return _caches[cache_dir]
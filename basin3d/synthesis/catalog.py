@@ -0,0 +1,351 @@
+"""
+`basin3d.synthesis.catalog`
+***************************
+
+.. currentmodule:: basin3d.synthesis.catalog
+
+:synopsis: In-process snapshots of the synthesized monitoring feature catalog
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Monitoring feature listings change rarely.  Instead of asking every data source for its
+features on each request, the :class:`MonitoringFeatureCatalog` keeps a snapshot for each
+`(datasource, feature_type)` pair.  A background scheduler refreshes the snapshots and
+requests are served the current snapshot, even if it is stale, while it is revalidated.
+
+The catalog is configured in ``settings.BASIN3D``:
+
+    - *CATALOG_ENABLED:* serve unfiltered monitoring feature listings from the catalog (default: True)
+    - *CATALOG_REFRESH_INTERVAL:* seconds between snapshot refreshes. Set to 0 to disable the
+      background scheduler (default: 300)
+
+----------------------------------
+
+"""
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, models
+
+from basin3d.models import DataSource, FeatureTypes
+from basin3d.plugins import InvalidOrMissingCredentials
+from basin3d.synthesis.hierarchy import HierarchyIndex
+from basin3d.synthesis.models import Base
+from basin3d.synthesis.models.field import MonitoringFeature
+from basin3d.synthesis.query import synthesis_request
+from basin3d.synthesis.search import SearchIndex
+from basin3d.synthesis.spatial import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+#: Default number of seconds between snapshot refreshes
+DEFAULT_REFRESH_INTERVAL = 300
+
+
+def get_refresh_interval():
+    """
+    The configured number of seconds between catalog snapshot refreshes
+
+    :return: refresh interval in seconds
+    :rtype: float
+    """
+    return settings.BASIN3D.get("CATALOG_REFRESH_INTERVAL", DEFAULT_REFRESH_INTERVAL)
+
+
+def is_catalog_enabled():
+    """
+    Is the monitoring feature catalog turned on?
+
+    :rtype: bool
+    """
+    return settings.BASIN3D.get("CATALOG_ENABLED", True)
+
+
+def catalog_request(feature_type):
+    """
+    Build a request for the unfiltered listing of the specified feature type. Plugin views
+    receive this request when a snapshot is refreshed outside of a client request.
+
+    :param feature_type: The feature type (:class:`basin3d.models.FeatureTypes`)
+    :return: an empty `GET` request for the feature type listing
+    :rtype: :class:`rest_framework.request.Request`
+    """
+    if feature_type is None:
+        return synthesis_request("/synthesis/monitoringfeatures/")
+    return synthesis_request("/synthesis/monitoringfeatures/{}s/".format(
+        "".join(FeatureTypes.TYPES[feature_type].lower().split())))
+
+
+def list_features(datasource, feature_type):
+    """
+    List the monitoring features of the feature type from the data source plugin
+
+    :param datasource: The data source
+    :type datasource: :class:`basin3d.models.DataSource`
+    :param feature_type: The feature type (:class:`basin3d.models.FeatureTypes`), `None` for all
+    :return: the synthesized monitoring features
+    :rtype: list
+    """
+    plugin_views = datasource.get_plugin().get_plugin_views()
+    if MonitoringFeature in plugin_views and hasattr(plugin_views[MonitoringFeature], "list"):
+        return list(plugin_views[MonitoringFeature].list(catalog_request(feature_type), feature_type=feature_type))
+    return []
+
+
+def _content(value):
+    """
+    A comparable representation of a synthesized value and its nested objects
+    """
+    if isinstance(value, Base):
+        return value.__class__.__name__, sorted((name, _content(v)) for name, v in value.__getstate__().items())
+    if isinstance(value, models.Model):
+        return value._meta.label, value.pk
+    if isinstance(value, dict):
+        return sorted((str(k), _content(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_content(v) for v in value]
+    return value
+
+
+def features_version(features):
+    """
+    A version of the monitoring features made from their content. It only changes when the
+    features change.
+
+    :param features: The synthesized :class:`~basin3d.synthesis.models.field.MonitoringFeature` objects
+    :type features: list
+    :return: the version
+    :rtype: str
+    """
+    digest = hashlib.sha1()
+    for feature in features:
+        digest.update(repr(_content(feature)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CatalogSnapshot(object):
+    """
+    The monitoring features listed by one data source for a feature type at a point in time
+
+    :param datasource: The data source the features were listed from
+    :type datasource: :class:`basin3d.models.DataSource`
+    :param feature_type: The feature type (:class:`basin3d.models.FeatureTypes`)
+    :param features: The synthesized :class:`~basin3d.synthesis.models.field.MonitoringFeature` objects
+    :type features: list
+    :param refreshed_at: epoch time when the snapshot was taken
+    :param refresh_duration: seconds it took to take the snapshot
+    :param previous: The previous snapshot of the data source and feature type, if any
+    :type previous: :class:`CatalogSnapshot`
+    """
+
+    def __init__(self, datasource, feature_type, features, refreshed_at, refresh_duration, previous=None):
+        #: Version of the snapshot features (e.g. for ETags), see :func:`features_version`
+        self.version = features_version(features)
+        self.datasource = datasource
+        self.feature_type = feature_type
+        self.features = features
+        self.refreshed_at = refreshed_at
+        self.refresh_duration = refresh_duration
+        #: epoch time when the features last changed
+        self.modified_at = previous.modified_at if previous and previous.version == self.version else refreshed_at
+        self._spatial_index = None
+        self._hierarchy_index = None
+        self._search_index = None
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """The spatial index of the features, built on first use"""
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(self.features)
+        return self._spatial_index
+
+    @property
+    def hierarchy_index(self) -> HierarchyIndex:
+        """The hierarchy index of the features, built on first use"""
+        if self._hierarchy_index is None:
+            self._hierarchy_index = HierarchyIndex(self.features)
+        return self._hierarchy_index
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """The search index of the features, built on first use"""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.features)
+        return self._search_index
+
+    @property
+    def age(self) -> float:
+        """Age of the snapshot in seconds"""
+        return time.time() - self.refreshed_at
+
+    def is_stale(self, refresh_interval) -> bool:
+        """
+        Is the snapshot older than the refresh interval?
+
+        :param refresh_interval: seconds between refreshes (0 means never stale)
+        """
+        return bool(refresh_interval) and self.age > refresh_interval
+
+
+class MonitoringFeatureCatalog(object):
+    """
+    Snapshots of the synthesized monitoring features for each `(datasource, feature_type)`.
+
+    The first read of a snapshot takes it synchronously.  After that, reads never wait on
+    the data source: stale snapshots are returned while a background thread revalidates them.
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+        self._refreshing = set()
+        self._lock = threading.RLock()
+        self._scheduler = None
+        self._stop = threading.Event()
+
+    def clear(self):
+        """Remove all of the snapshots"""
+        with self._lock:
+            self._snapshots.clear()
+
+    def snapshots(self):
+        """
+        :return: the current snapshots
+        :rtype: list of :class:`CatalogSnapshot`
+        """
+        with self._lock:
+            return list(self._snapshots.values())
+
+    def get(self, datasource, feature_type):
+        """
+        Get the snapshot for the data source and feature type. A snapshot is taken
+        if there is none yet. If it is stale, it is refreshed in the background.
+
+        :param datasource: The data source
+        :type datasource: :class:`basin3d.models.DataSource`
+        :param feature_type: The feature type (:class:`basin3d.models.FeatureTypes`)
+        :rtype: :class:`CatalogSnapshot`
+        """
+        self.start()
+
+        key = (datasource.id_prefix, feature_type)
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+
+        if snapshot is None:
+            return self.refresh(datasource, feature_type)
+
+        if snapshot.is_stale(get_refresh_interval()):
+            self.refresh_async(datasource, feature_type)
+        return snapshot
+
+    def refresh(self, datasource, feature_type):
+        """
+        Take a new snapshot from the data source.  If the data source fails, the
+        previous snapshot is kept.
+
+        :param datasource: The data source
+        :type datasource: :class:`basin3d.models.DataSource`
+        :param feature_type: The feature type (:class:`basin3d.models.FeatureTypes`)
+        :return: the current snapshot
+        :rtype: :class:`CatalogSnapshot`
+        """
+        key = (datasource.id_prefix, feature_type)
+        start = time.time()
+        try:
+            features = list_features(datasource, feature_type)
+            with self._lock:
+                self._snapshots[key] = CatalogSnapshot(datasource, feature_type, features,
+                                                       refreshed_at=time.time(), refresh_duration=time.time() - start,
+                                                       previous=self._snapshots.get(key))
+        except InvalidOrMissingCredentials as e:
+            logger.error(e)
+        except Exception as e:
+            logger.error("Catalog refresh error: ({},{}) -- {}".format(datasource.name, feature_type, e))
+
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                # Remember the failure so that readers don't hammer the data source
+                snapshot = CatalogSnapshot(datasource, feature_type, [],
+                                           refreshed_at=time.time(), refresh_duration=time.time() - start)
+                self._snapshots[key] = snapshot
+        return snapshot
+
+    def refresh_async(self, datasource, feature_type):
+        """
+        Refresh the snapshot in a background thread, unless it is already being refreshed
+
+        :param datasource: The data source
+        :type datasource: :class:`basin3d.models.DataSource`
+        :param feature_type: The feature type (:class:`basin3d.models.FeatureTypes`)
+        """
+        key = (datasource.id_prefix, feature_type)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.refresh(datasource, feature_type)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+                connections.close_all()
+
+        threading.Thread(target=run, name="basin3d-catalog-refresh", daemon=True).start()
+
+    def refresh_stale(self):
+        """
+        Refresh all the snapshots that are older than the refresh interval
+        """
+        refresh_interval = get_refresh_interval()
+        for snapshot in self.snapshots():
+            if snapshot.is_stale(refresh_interval):
+                try:
+                    datasource = DataSource.objects.get(id_prefix=snapshot.datasource.id_prefix)
+                except DataSource.DoesNotExist:
+                    with self._lock:
+                        self._snapshots.pop((snapshot.datasource.id_prefix, snapshot.feature_type), None)
+                    continue
+                if datasource.enabled:
+                    self.refresh(datasource, snapshot.feature_type)
+
+    def start(self):
+        """
+        Start the background scheduler, if it is configured and not already running
+        """
+        if not get_refresh_interval():
+            return
+        with self._lock:
+            if self._scheduler and self._scheduler.is_alive():
+                return
+            self._stop.clear()
+            self._scheduler = threading.Thread(target=self._run_scheduler,
+                                               name="basin3d-catalog-scheduler", daemon=True)
+            self._scheduler.start()
+
+    def stop(self):
+        """
+        Stop the background scheduler
+        """
+        self._stop.set()
+
+    def _run_scheduler(self):
+        """
+        Refresh stale snapshots every refresh interval until stopped
+        """
+        while not self._stop.wait(get_refresh_interval() or DEFAULT_REFRESH_INTERVAL):
+            try:
+                self.refresh_stale()
+            except Exception as e:
+                logger.error("Catalog scheduler error: {}".format(e))
+            finally:
+                connections.close_all()
+
+
+#: The monitoring feature catalog for this process
+catalog = MonitoringFeatureCatalog()
@@ -0,0 +1,202 @@
+"""
+`basin3d.synthesis.downsample`
+******************************
+
+.. currentmodule:: basin3d.synthesis.downsample
+
+:synopsis: Downsampling of synthesized measurement timeseries for plotting
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Plots do not need more points than they have pixels.  Timeseries with more than
+``max_points`` time value pairs are downsampled to at most ``max_points`` with the
+requested ``downsample`` method:
+
+    - *LTTB* (default): `Largest-Triangle-Three-Buckets
+      <https://skemman.is/handle/1946/15343>`_. Keeps the first and last points and, for each
+      bucket, the point that makes the largest triangle with the neighbouring buckets.
+    - *MINMAX:* keeps the minimum and maximum points of each bucket.
+
+Both keep the visual shape of the series (peaks and troughs).  Points without a value or a
+readable timestamp are dropped from downsampled series.
+
+----------------------------------
+
+"""
+import math
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from basin3d.synthesis.query import QUERY_PARAM_DOWNSAMPLE, QUERY_PARAM_MAX_POINTS
+from basin3d.synthesis.resample import to_datetime
+
+DOWNSAMPLE_LTTB = "LTTB"
+DOWNSAMPLE_MINMAX = "MINMAX"
+
+#: Supported downsampling methods
+DOWNSAMPLE_METHODS = [DOWNSAMPLE_LTTB, DOWNSAMPLE_MINMAX]
+
+#: Smallest supported ``max_points``
+MIN_POINTS = 3
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class Downsampling(namedtuple('Downsampling', ['max_points', 'method'])):
+    """
+    The requested downsampling
+
+    `(max_points, method)`
+    """
+
+    @classmethod
+    def from_query_plan(cls, plan):
+        """
+        Get the downsampling requested in the query
+
+        :param plan: The query plan
+        :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+        :return: the downsampling or `None` if none was requested
+        :rtype: :class:`Downsampling`
+        :raises ValueError: if a downsampling parameter is invalid
+        """
+        query_params = plan.query_params
+        if QUERY_PARAM_MAX_POINTS not in query_params:
+            return None
+        try:
+            max_points = int(query_params[QUERY_PARAM_MAX_POINTS])
+        except ValueError:
+            max_points = 0
+        if max_points < MIN_POINTS:
+            raise ValueError("{} must be an integer of at least {}".format(QUERY_PARAM_MAX_POINTS, MIN_POINTS))
+        method = query_params.get(QUERY_PARAM_DOWNSAMPLE, DOWNSAMPLE_LTTB).upper()
+        if method not in DOWNSAMPLE_METHODS:
+            raise ValueError("{} must be one of {}".format(QUERY_PARAM_DOWNSAMPLE, "|".join(DOWNSAMPLE_METHODS)))
+        return cls(max_points, method)
+
+
+def _seconds(moment):
+    """
+    Seconds since the epoch of a naive or aware datetime
+    """
+    return (moment - (_EPOCH if moment.tzinfo is None else _EPOCH_UTC)).total_seconds()
+
+
+def _plottable(result_points):
+    """
+    The points as `(x, y, point)` with x in seconds, in x order. Points without a value or a
+    readable timestamp are dropped. Series that are not in time order are sorted.
+    """
+    plottable = []
+    ordered = True
+    for point in result_points:
+        moment = to_datetime(point[0])
+        if moment is not None and point[1] is not None:
+            x = _seconds(moment)
+            if plottable and x < plottable[-1][0]:
+                ordered = False
+            plottable.append((x, point[1], point))
+    if not ordered:
+        plottable.sort(key=lambda p: p[0])
+    return plottable
+
+
+def lttb(points, max_points):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    :param points: list of `(x, y, point)` in x order
+    :param max_points: the number of points to keep (at least 3)
+    :return: the kept `(x, y, point)`
+    :rtype: list
+    """
+    size = len(points)
+    if size <= max_points:
+        return list(points)
+
+    bucket_size = (size - 2) / (max_points - 2)
+    sampled = [points[0]]
+    a_x, a_y = points[0][0], points[0][1]
+    for bucket in range(max_points - 2):
+        # The average point of the next bucket (the last point for the last bucket)
+        next_start = int(math.floor((bucket + 1) * bucket_size)) + 1
+        next_end = min(int(math.floor((bucket + 2) * bucket_size)) + 1, size)
+        next_bucket = points[next_start:next_end] or points[-1:]
+        average_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        average_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+
+        # The point of this bucket that makes the largest triangle
+        start = int(math.floor(bucket * bucket_size)) + 1
+        end = int(math.floor((bucket + 1) * bucket_size)) + 1
+        largest, largest_area = points[start], -1.0
+        for point in points[start:end]:
+            area = abs((a_x - average_x) * (point[1] - a_y) - (a_x - point[0]) * (average_y - a_y))
+            if area > largest_area:
+                largest, largest_area = point, area
+        sampled.append(largest)
+        a_x, a_y = largest[0], largest[1]
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def min_max(points, max_points):
+    """
+    Minimum and maximum per bucket downsampling
+
+    :param points: list of `(x, y, point)` in x order
+    :param max_points: the maximum number of points to keep
+    :return: the kept `(x, y, point)` in x order
+    :rtype: list
+    """
+    size = len(points)
+    if size <= max_points:
+        return list(points)
+
+    buckets = max_points // 2
+    sampled = []
+    for bucket in range(buckets):
+        bucket_points = points[bucket * size // buckets:(bucket + 1) * size // buckets]
+        if not bucket_points:
+            continue
+        low = min(bucket_points, key=lambda p: p[1])
+        high = max(bucket_points, key=lambda p: p[1])
+        if low is high:
+            sampled.append(low)
+        else:
+            sampled.extend([low, high] if low[0] <= high[0] else [high, low])
+    return sampled
+
+
+def downsample_points(result_points, max_points, method=DOWNSAMPLE_LTTB):
+    """
+    Downsample the time value pairs to at most `max_points`
+
+    :param result_points: the time value pairs
+    :param max_points: the maximum number of points
+    :param method: the downsampling method (LTTB, MINMAX)
+    :return: the time value pairs in time order (the same list if it is not longer than `max_points`)
+    :rtype: list
+    """
+    if not isinstance(result_points, (list, tuple)):
+        result_points = list(result_points or [])
+    if len(result_points) <= max_points:
+        return result_points
+
+    downsample = min_max if method == DOWNSAMPLE_MINMAX else lttb
+    return [point for _, _, point in downsample(_plottable(result_points), max_points)]
+
+
+def downsample_observation(observation, downsampling):
+    """
+    Downsample the result points of the observation
+
+    :param observation: the timeseries observation
+    :type observation: :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+    :param downsampling: the requested downsampling
+    :type downsampling: :class:`Downsampling`
+    :return: the observation
+    """
+    observation.result_points = downsample_points(observation.result_points, *downsampling)
+    return observation
@@ -0,0 +1,144 @@
+"""
+`basin3d.synthesis.hierarchy`
+*****************************
+
+.. currentmodule:: basin3d.synthesis.hierarchy
+
+:synopsis: The spatial hierarchy of the monitoring features
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Monitoring features are arranged in a hierarchy by their PARENT
+:class:`~basin3d.synthesis.models.field.RelatedSamplingFeature` links (e.g. REGION > SITE > POINT).
+The :class:`HierarchyIndex` stores the parent to children links and the ancestor and
+descendant closures, so that all the features under a feature are found with one lookup.
+
+Monitoring feature listings are filtered with the query parameters:
+
+    - *ancestor:* comma separated feature ids. Lists the features under any of them (at any depth).
+    - *descendants_of:* same as *ancestor*
+    - *feature_type:* only list descendants of this feature type (e.g. POINT)
+
+----------------------------------
+
+"""
+from collections import OrderedDict
+
+from basin3d.models import FeatureTypes
+from basin3d.synthesis.models.field import RelatedSamplingFeature
+from basin3d.synthesis.query import QUERY_PARAM_ANCESTOR, QUERY_PARAM_DESCENDANTS_OF, QUERY_PARAM_FEATURE_TYPE
+
+
+def parse_feature_type(value):
+    """
+    Parse a feature type query parameter value
+
+    :param value: the feature type name (e.g. `POINT`, `horizontal path`, `horizontalpaths`)
+    :return: the feature type (:class:`basin3d.models.FeatureTypes`)
+    :raises ValueError: if the value is not a feature type
+    """
+    name = "".join(value.lower().split())
+    for feature_type, type_name in FeatureTypes.TYPES.items():
+        type_name = "".join(type_name.lower().split())
+        if name in (type_name, "{}s".format(type_name)):
+            return feature_type
+    raise ValueError("feature_type must be one of {}".format("|".join(FeatureTypes.TYPES.values())))
+
+
+def hierarchy_filter_ids(plan):
+    """
+    The feature ids of the hierarchy filter in the query
+
+    :param plan: The query plan
+    :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+    :return: the ids (with the data source id prefix) or `None` if there is no hierarchy filter
+    :rtype: list
+    """
+    values = [plan.query_params[param_name] for param_name in (QUERY_PARAM_ANCESTOR, QUERY_PARAM_DESCENDANTS_OF)
+              if param_name in plan.query_params]
+    if not values:
+        return None
+    return [feature_id for value in values for feature_id in value.split(",") if feature_id]
+
+
+def hierarchy_feature_type(plan, default=None):
+    """
+    The feature type of the descendants to list
+
+    :param plan: The query plan
+    :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+    :param default: the feature type if the query has none (e.g. from the URL)
+    :raises ValueError: if the feature type is invalid
+    """
+    if QUERY_PARAM_FEATURE_TYPE in plan.query_params:
+        return parse_feature_type(plan.query_params[QUERY_PARAM_FEATURE_TYPE])
+    return default
+
+
+class HierarchyIndex(object):
+    """
+    The parent, child, ancestor and descendant links of monitoring features
+
+    :param features: The monitoring features
+    :type features: list of :class:`basin3d.synthesis.models.field.MonitoringFeature`
+    """
+
+    def __init__(self, features):
+        #: The features by id
+        self.features = OrderedDict((feature.id, feature) for feature in features)
+
+        #: The parent ids of each feature
+        self.parents = {}
+
+        #: The child ids of each feature
+        self.children = {}
+
+        for feature in self.features.values():
+            for related in getattr(feature, "related_sampling_feature_complex", None) or []:
+                if related.role == RelatedSamplingFeature.ROLE_PARENT and related.related_sampling_feature:
+                    parent_id = related.related_sampling_feature
+                    self.parents.setdefault(feature.id, []).append(parent_id)
+                    self.children.setdefault(parent_id, []).append(feature.id)
+
+        #: The ancestor closure of each feature
+        self.ancestors = {}
+        for feature_id in self.features:
+            self._ancestors(feature_id, set())
+
+        #: The descendant closure of each feature
+        self.descendants = {}
+        for feature_id, ancestors in self.ancestors.items():
+            for ancestor_id in ancestors:
+                self.descendants.setdefault(ancestor_id, set()).add(feature_id)
+
+    def _ancestors(self, feature_id, visiting):
+        """
+        Compute the ancestor closure of a feature. Cycles are broken.
+        """
+        if feature_id in self.ancestors:
+            return self.ancestors[feature_id]
+        visiting.add(feature_id)
+        ancestors = set()
+        for parent_id in self.parents.get(feature_id, []):
+            if parent_id in visiting:
+                continue
+            ancestors.add(parent_id)
+            ancestors.update(self._ancestors(parent_id, visiting))
+        visiting.discard(feature_id)
+        self.ancestors[feature_id] = frozenset(ancestors)
+        return self.ancestors[feature_id]
+
+    def descendants_of(self, feature_ids, feature_type=None):
+        """
+        The features under any of the features
+
+        :param feature_ids: The ids of the ancestor features
+        :param feature_type: only return features of this type (:class:`basin3d.models.FeatureTypes`)
+        :return: the descendant features in index order
+        :rtype: list of :class:`basin3d.synthesis.models.field.MonitoringFeature`
+        """
+        descendant_ids = set()
+        for feature_id in feature_ids:
+            descendant_ids.update(self.descendants.get(feature_id, ()))
+        return [feature for feature_id, feature in self.features.items()
+                if feature_id in descendant_ids and (feature_type is None or feature.feature_type == feature_type)]
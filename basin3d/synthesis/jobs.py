@@ -0,0 +1,341 @@
+"""
+`basin3d.synthesis.jobs`
+************************
+
+.. currentmodule:: basin3d.synthesis.jobs
+
+:synopsis: Asynchronous extraction jobs for large synthesis queries
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Extractions that are too large for a request (e.g. decades of timeseries for hundreds of
+monitoring features) are submitted as jobs.  A job runs on a local worker pool with bounded
+concurrency and writes its results to a JSON file on local disk, so the extraction size is
+limited by the disk and not by the request timeouts.
+
+The query of a job is split into chunks: one for each data source, and for queries with
+`monitoring_features`, one for each group of :data:`DEFAULT_CHUNK_SIZE` monitoring features
+of a data source.  The progress of a job is the fraction of the chunks that are done.
+
+Each job has a directory with its status (``status.json``) and its results (``result.json``),
+so that the status and the results are available to every process on the host.
+
+The jobs are configured in ``settings.BASIN3D``:
+
+    - *JOBS_DIR:* directory for the job directories (default: ``basin3d-jobs`` in the system
+      temporary directory)
+    - *JOBS_CONCURRENCY:* maximum number of jobs to run at once (default: 2)
+    - *JOBS_CHUNK_SIZE:* number of monitoring features in a chunk (default: 20)
+    - *JOBS_MAX_AGE:* seconds to keep the jobs that are finished (default: 86400). Jobs that are
+      not finished and whose status has not changed for as long were abandoned (e.g. the process
+      running them was restarted) and are failed.
+
+----------------------------------
+
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
+
+from basin3d.synthesis.query import QUERY_PARAM_MONITORING_FEATURES, get_query_plan, synthesis_request
+
+logger = logging.getLogger(__name__)
+
+#: Default maximum number of jobs to run at once
+DEFAULT_CONCURRENCY = 2
+
+#: Default number of monitoring features in a chunk
+DEFAULT_CHUNK_SIZE = 20
+
+#: Default number of seconds to keep the jobs that are finished
+DEFAULT_MAX_AGE = 86400
+
+STATUS_QUEUED = "QUEUED"
+STATUS_RUNNING = "RUNNING"
+STATUS_DONE = "DONE"
+STATUS_FAILED = "FAILED"
+STATUS_CANCELLED = "CANCELLED"
+
+#: The job statuses that do not change anymore
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+STATUS_FILE = "status.json"
+RESULT_FILE = "result.json"
+CANCEL_FILE = "cancel"
+
+
+def get_jobs_dir():
+    """
+    The configured directory for the job directories
+
+    :rtype: str
+    """
+    return settings.BASIN3D.get("JOBS_DIR") or os.path.join(tempfile.gettempdir(), "basin3d-jobs")
+
+
+def get_chunk_size():
+    """
+    The configured number of monitoring features in a chunk
+
+    :rtype: int
+    """
+    return max(1, settings.BASIN3D.get("JOBS_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+
+
+def get_max_age():
+    """
+    The configured number of seconds to keep the finished jobs
+
+    :rtype: float
+    """
+    return settings.BASIN3D.get("JOBS_MAX_AGE", DEFAULT_MAX_AGE)
+
+
+def is_job_id(job_id):
+    """
+    Is the value a valid job id? Job ids are used in file paths.
+    """
+    return isinstance(job_id, str) and len(job_id) == 32 and all(c in "0123456789abcdef" for c in job_id)
+
+
+def job_chunks(viewset, request):
+    """
+    Split the query into the chunks of a job
+
+    :param viewset: The synthesis viewset of the query
+    :type viewset: :class:`basin3d.synthesis.viewsets.DataSourcePluginViewSet`
+    :param request: The request of the query
+    :type request: :class:`rest_framework.request.Request`
+    :return: list of `(datasource, request)`
+    """
+    plan = get_query_plan(request)
+    chunk_size = get_chunk_size()
+    chunks = []
+    for datasource in viewset.get_datasources(request):
+        if not datasource.enabled:
+            continue
+        ids = plan.datasource_ids(QUERY_PARAM_MONITORING_FEATURES, datasource.id_prefix)
+        if not ids:
+            chunks.append((datasource, request))
+            continue
+        for start in range(0, len(ids), chunk_size):
+            feature_ids = ",".join("{}-{}".format(datasource.id_prefix, i) for i in ids[start:start + chunk_size])
+            chunks.append((datasource, synthesis_request(
+                replace_query_param(request.get_full_path(), QUERY_PARAM_MONITORING_FEATURES, feature_ids), request)))
+    return chunks
+
+
+class JobManager(object):
+    """
+    Runs the extraction jobs on a worker pool and keeps their status and results on disk
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _job_dir(self, job_id):
+        return os.path.join(get_jobs_dir(), job_id)
+
+    def _write_status(self, job):
+        job_dir = self._job_dir(job["id"])
+        temp_path = os.path.join(job_dir, "{}.{}".format(STATUS_FILE, threading.get_ident()))
+        with open(temp_path, "w") as status_file:
+            json.dump(job, status_file)
+        os.replace(temp_path, os.path.join(job_dir, STATUS_FILE))
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.BASIN3D.get("JOBS_CONCURRENCY", DEFAULT_CONCURRENCY)),
+                    thread_name_prefix="basin3d-job")
+            return self._executor
+
+    def submit(self, viewset, request):
+        """
+        Submit a job for the query
+
+        :param viewset: The synthesis viewset of the query
+        :type viewset: :class:`basin3d.synthesis.viewsets.DataSourcePluginViewSet`
+        :param request: The request of the query
+        :type request: :class:`rest_framework.request.Request`
+        :return: the job status
+        :rtype: dict
+        """
+        self.remove_expired()
+
+        job = OrderedDict([
+            ("id", uuid.uuid4().hex),
+            ("query", request.get_full_path()),
+            ("status", STATUS_QUEUED),
+            ("progress", 0.0),
+            ("chunks", None),
+            ("chunks_done", 0),
+            ("objects", 0),
+            ("bytes", 0),
+            ("error", None),
+            ("submitted", time.time()),
+            ("started", None),
+            ("finished", None),
+        ])
+        os.makedirs(self._job_dir(job["id"]))
+        self._write_status(job)
+        self._get_executor().submit(self.run, job, viewset, request)
+        return job
+
+    def get(self, job_id):
+        """
+        Get the status of a job. A job that is not finished and whose status has not
+        changed for ``JOBS_MAX_AGE`` seconds is failed (See :meth:`fail_abandoned`).
+
+        :param job_id: the job id
+        :return: the job status or `None` if there is no such job
+        :rtype: dict
+        """
+        if not is_job_id(job_id):
+            return None
+        status_path = os.path.join(self._job_dir(job_id), STATUS_FILE)
+        try:
+            with open(status_path) as status_file:
+                job = json.load(status_file, object_pairs_hook=OrderedDict)
+            updated = os.path.getmtime(status_path)
+        except (OSError, ValueError):
+            return None
+        if job["status"] not in FINISHED_STATUSES and updated < time.time() - get_max_age():
+            job = self.fail_abandoned(job)
+        return job
+
+    def fail_abandoned(self, job):
+        """
+        Fail a job that is no longer run, e.g. because the process running it was restarted,
+        and remove its partial results
+
+        :param job: the job status
+        :return: the job status
+        :rtype: dict
+        """
+        logger.warning("Job %s was abandoned while %s", job["id"], job["status"])
+        job["error"] = "The job was abandoned while {}".format(job["status"].lower())
+        job["status"] = STATUS_FAILED
+        job["finished"] = time.time()
+        try:
+            partial_path = os.path.join(self._job_dir(job["id"]), "{}.part".format(RESULT_FILE))
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            self._write_status(job)
+        except OSError as e:
+            logger.error("Job %s status could not be written: %s", job["id"], e)
+        return job
+
+    def result_path(self, job_id):
+        """
+        The path of the result file of a job
+
+        :param job_id: the job id
+        :return: the path or `None` if the job is not done
+        :rtype: str
+        """
+        job = self.get(job_id)
+        if job is None or job["status"] != STATUS_DONE:
+            return None
+        return os.path.join(self._job_dir(job_id), RESULT_FILE)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job that is not finished or remove a job that is finished
+
+        :param job_id: the job id
+        :return: the job status or `None` if there is no such job
+        :rtype: dict
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job["status"] in FINISHED_STATUSES:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        else:
+            # The worker stops after the current chunk
+            open(os.path.join(self._job_dir(job_id), CANCEL_FILE), "w").close()
+        return job
+
+    def remove_expired(self):
+        """
+        Remove the finished jobs that are older than ``JOBS_MAX_AGE``, and fail the
+        abandoned jobs
+        """
+        jobs_dir = get_jobs_dir()
+        if not os.path.isdir(jobs_dir):
+            return
+        expires = time.time() - get_max_age()
+        for job_id in os.listdir(jobs_dir):
+            job = self.get(job_id)
+            if job and job["status"] in FINISHED_STATUSES and (job["finished"] or 0) < expires:
+                shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+
+    def run(self, job, viewset, request):
+        """
+        Run a job. The results of each chunk are appended to the result file as
+        they are synthesized.
+        """
+        job_dir = self._job_dir(job["id"])
+        temp_path = os.path.join(job_dir, "{}.part".format(RESULT_FILE))
+        job["status"] = STATUS_RUNNING
+        job["started"] = time.time()
+        try:
+            chunks = job_chunks(viewset, request)
+            job["chunks"] = len(chunks)
+            self._write_status(job)
+
+            encoder = JSONEncoder()
+            with open(temp_path, "w") as result_file:
+                result_file.write("[")
+                for datasource, chunk_request in chunks:
+                    if os.path.exists(os.path.join(job_dir, CANCEL_FILE)):
+                        job["status"] = STATUS_CANCELLED
+                        break
+                    for obj in viewset.list_datasource(chunk_request, datasource):
+                        data = viewset.serializer_class(obj, context={'request': chunk_request}).data
+                        result_file.write("," if job["objects"] else "")
+                        result_file.write(encoder.encode(data))
+                        job["objects"] += 1
+                    job["chunks_done"] += 1
+                    job["progress"] = job["chunks_done"] / len(chunks)
+                    job["bytes"] = result_file.tell()
+                    self._write_status(job)
+                result_file.write("]")
+                job["bytes"] = result_file.tell()
+
+            if job["status"] == STATUS_RUNNING:
+                os.replace(temp_path, os.path.join(job_dir, RESULT_FILE))
+                job["status"] = STATUS_DONE
+                job["progress"] = 1.0
+            else:
+                os.remove(temp_path)
+        except Exception as e:
+            logger.exception("Job %s failed", job["id"])
+            job["status"] = STATUS_FAILED
+            job["error"] = str(e)
+        finally:
+            job["finished"] = time.time()
+            try:
+                self._write_status(job)
+            except OSError as e:
+                logger.error("Job %s status could not be written: %s", job["id"], e)
+            connections.close_all()
+
+
+#: The job manager of the process
+jobs = JobManager()
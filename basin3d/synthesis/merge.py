@@ -0,0 +1,171 @@
+"""
+`basin3d.synthesis.merge`
+*************************
+
+.. currentmodule:: basin3d.synthesis.merge
+
+:synopsis: Merge the timeseries of several data sources into a single series
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+When the same variable comes from several data sources for one logical site, the timeseries
+are merged with ``?merge=true``.  The timeseries with the same observed property, aggregation
+duration, statistic and unit of measurement are merged into one series ordered by timestamp.
+The timeseries of different monitoring features of the same data source are different sites:
+when a data source has several monitoring features with the same key, none of the timeseries
+with that key are merged.  Query one monitoring feature of each data source for the site.
+
+The merge is a streaming k-way merge (:func:`heapq.merge`) of the time value pairs of the
+series.  The merged points are produced while the response is rendered, without copying or
+sorting the concatenated series.  The timestamps are compared in UTC, timestamps without an offset
+are taken as UTC.  Where the series overlap, the point of the first series
+(in data source order) is kept and the duplicate timestamps of the other series are dropped.
+
+----------------------------------
+
+"""
+import copy
+import heapq
+from collections import OrderedDict
+
+from basin3d.synthesis.query import QUERY_PARAM_MERGE
+from basin3d.synthesis.resample import comparable_datetime
+
+
+def merge_requested(plan):
+    """
+    Is the merge of the timeseries requested?
+
+    :param plan: The query plan
+    :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+    :rtype: bool
+    """
+    return plan.query_params.get(QUERY_PARAM_MERGE) in ["true", "True"]
+
+
+def merge_key(observation):
+    """
+    The timeseries with the same key are merged
+
+    :param observation: the timeseries observation
+    :type observation: :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+    :return: tuple `(observed_property, aggregation_duration, statistic, unit_of_measurement)`
+    """
+    return (str(observation.observed_property), observation.aggregation_duration, observation.statistic,
+            observation.unit_of_measurement)
+
+
+def merge_source(observation):
+    """
+    The data source and monitoring feature of a timeseries
+
+    :param observation: the timeseries observation
+    :type observation: :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+    :return: tuple `(datasource id prefix, feature of interest id)`
+    """
+    datasource = getattr(observation, "datasource", None)
+    feature_of_interest = getattr(observation, "feature_of_interest", None)
+    return getattr(datasource, "id_prefix", None), getattr(feature_of_interest, "id", feature_of_interest)
+
+
+def is_one_site(group):
+    """
+    Are the timeseries of one logical site? Each data source may only have one
+    monitoring feature in the group.
+
+    :param group: the timeseries with the same :func:`merge_key`
+    :rtype: bool
+    """
+    features = {}
+    for observation in group:
+        datasource, feature = merge_source(observation)
+        if features.setdefault(datasource, feature) != feature:
+            return False
+    return True
+
+
+def _timed_points(result_points):
+    """
+    The time value pairs with their timestamps as naive UTC datetimes (See
+    :func:`~basin3d.synthesis.resample.comparable_datetime`). Points with unreadable
+    timestamps are dropped.
+    """
+    for point in result_points or []:
+        moment = comparable_datetime(point[0])
+        if moment is not None:
+            yield moment, point
+
+
+def ordered_timed_points(result_points):
+    """
+    The time value pairs with their timestamps as naive UTC datetimes, in time order. Series that
+    are in time order (the usual case) are read lazily, the others are sorted.
+
+    :param result_points: the time value pairs
+    :return: iterable of `(datetime, point)`
+    """
+    previous = None
+    for moment, _ in _timed_points(result_points):
+        if previous is not None and moment < previous:
+            return sorted(_timed_points(result_points), key=lambda timed_point: timed_point[0])
+        previous = moment
+    return _timed_points(result_points)
+
+
+def merge_points(series):
+    """
+    Merge time ordered series of time value pairs. When several points have the same
+    timestamp, the point of the first series is kept.
+
+    :param series: the result points of each series
+    :type series: list
+    :return: generator of the time value pairs in time order
+    """
+    previous = None
+    for moment, point in heapq.merge(*[ordered_timed_points(points) for points in series],
+                                     key=lambda timed_point: timed_point[0]):
+        if moment == previous:
+            continue
+        previous = moment
+        yield point
+
+
+class MergedPoints(object):
+    """
+    The result points of a merged timeseries. The points are merged each time they are iterated.
+
+    :param series: the result points of each series
+    :type series: list
+    """
+
+    def __init__(self, series):
+        self.series = series
+
+    def __iter__(self):
+        return merge_points(self.series)
+
+
+def merge_observations(observations):
+    """
+    Merge the timeseries with the same :func:`merge_key` that are of one logical site
+    (See :func:`is_one_site`). The merged timeseries has the metadata of the first timeseries
+    and the ids of all the timeseries joined by `+`.
+
+    :param observations: the timeseries in data source order
+    :return: the timeseries, merged in the order of their first timeseries
+    :rtype: list of :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+    """
+    groups = OrderedDict()
+    for observation in observations:
+        groups.setdefault(merge_key(observation), []).append(observation)
+
+    merged = []
+    for group in groups.values():
+        if len(group) == 1 or not is_one_site(group):
+            merged.extend(group)
+            continue
+        observation = copy.copy(group[0])
+        observation.id = "+".join(str(o.id) for o in group if o.id) or None
+        observation.result_points = MergedPoints([o.result_points for o in group])
+        merged.append(observation)
+    return merged
@@ -70,6 +70,18 @@ class Base(object):
         self.__setattr__ = __setattr__
         self.__delattr__ = __delattr__
 
+    def __getstate__(self):
+        """
+        The instance attributes without the (unpicklable) immutability hooks
+
+        :return: the object state to pickle
+        :rtype: dict
+        """
+        state = self.__dict__.copy()
+        state.pop('__setattr__', None)
+        state.pop('__delattr__', None)
+        return state
+
     @property
     def datasource_ids(self):
         return self._datasource_ids
@@ -0,0 +1,83 @@
+"""
+`basin3d.synthesis.pagination`
+******************************
+
+.. currentmodule:: basin3d.synthesis.pagination
+
+:synopsis: Cursor pagination over the merged results of the data sources
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Synthesis listings are paged with the ``limit`` and ``cursor`` query parameters
+(e.g. ``?limit=100&cursor=...``).  The results of the data sources are merged in data source
+order. The opaque cursor records the position in each data source: the data sources that are
+done and the number of objects already returned from the current one.
+
+Plugin views that set ``supports_paging = True`` receive the ``offset`` and ``limit`` keyword
+arguments in ``list`` and resume from the upstream offset, unless the broker filters their objects
+(e.g. search queries).  For the other plugin views the objects before the offset are skipped.
+
+----------------------------------
+
+"""
+import base64
+import binascii
+import json
+
+#: Maximum page size
+MAX_LIMIT = 10000
+
+
+def parse_limit(value):
+    """
+    Parse the `limit` query parameter
+
+    :param value: the query parameter value
+    :return: the page size
+    :rtype: int
+    :raises ValueError: if the value is not an integer between 1 and :data:`MAX_LIMIT`
+    """
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError("limit must be between 1 and {}".format(MAX_LIMIT))
+    return limit
+
+
+def encode_cursor(done, offsets):
+    """
+    Encode the position in the merged data source results
+
+    :param done: the id prefixes of the data sources that have no more results
+    :type done: iterable
+    :param offsets: the number of objects returned so far for each unfinished data source id prefix
+    :type offsets: dict
+    :return: the opaque cursor
+    :rtype: str
+    """
+    position = {"done": sorted(done), "offsets": offsets}
+    return base64.urlsafe_b64encode(json.dumps(position, sort_keys=True).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor
+
+    :param cursor: the opaque cursor, `None` for the first page
+    :return: tuple `(done, offsets)`
+    :rtype: tuple
+    :raises ValueError: if the cursor is invalid
+    """
+    if not cursor:
+        return set(), {}
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        done = set(position["done"])
+        offsets = {str(prefix): int(offset) for prefix, offset in position["offsets"].items()}
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError, AttributeError):
+        raise ValueError("Invalid cursor")
+    if any(offset < 0 for offset in offsets.values()):
+        raise ValueError("Invalid cursor")
+    return done, offsets
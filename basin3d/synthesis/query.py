@@ -1,3 +1,12 @@
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from django.http import HttpRequest, QueryDict
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.request import Request
+
+from basin3d.timing import phase
+
 QUERY_PARAM_MONITORING_FEATURES = "monitoring_features"
 QUERY_PARAM_OBSERVED_PROPERTY_VARIABLES = "observed_property_variables"
 QUERY_PARAM_AGGREGATION_DURATION = "aggregation_duration"
@@ -6,6 +15,26 @@ QUERY_PARAM_END_DATE = "end_date"
 QUERY_PARAM_SUBBASINS = "subbasins"
 QUERY_PARAM_REGIONS = "regions"
 QUERY_PARAM_RESULT_QUALITY = "result_quality"
+QUERY_PARAM_STATISTIC = "statistic"
+QUERY_PARAM_TIME_REFERENCE_POSITION = "time_reference_position"
+QUERY_PARAM_ANCESTOR = "ancestor"
+QUERY_PARAM_DESCENDANTS_OF = "descendants_of"
+QUERY_PARAM_FEATURE_TYPE = "feature_type"
+QUERY_PARAM_SEARCH = "q"
+QUERY_PARAM_MERGE = "merge"
+QUERY_PARAM_MAX_POINTS = "max_points"
+QUERY_PARAM_DOWNSAMPLE = "downsample"
+QUERY_PARAM_UNITS = "units"
+QUERY_PARAM_ALIGN = "align"
+QUERY_PARAM_TZ = "tz"
+QUERY_PARAM_BBOX = "bbox"
+QUERY_PARAM_NEAR = "near"
+QUERY_PARAM_LIMIT = "limit"
+QUERY_PARAM_CURSOR = "cursor"
+
+#: The query parameters that are comma separated lists of BASIN-3D ids (e.g. `A-1,B-2`)
+QUERY_PARAM_ID_LISTS = (QUERY_PARAM_MONITORING_FEATURES, QUERY_PARAM_REGIONS, QUERY_PARAM_SUBBASINS,
+                        QUERY_PARAM_ANCESTOR, QUERY_PARAM_DESCENDANTS_OF)
 
 
 def extract_id(identifer):
@@ -61,3 +90,156 @@ def extract_query_param_ids(request, param_name, id_prefix, query_params):
             query_params[param_name] = [extract_id(x) for x in
                                         values.split(",")
                                         if x.startswith("{}-".format(id_prefix))]
+
+
+def synthesis_request(url, base_request=None):
+    """
+    Build a `GET` request for a synthesis URL outside of the HTTP request cycle
+    (e.g. background refreshes, management commands)
+
+    :param url: The URL or absolute path with an optional query string
+    :param base_request: The request to copy the server information (host, scheme) from. The
+        body and conditional headers are not copied.
+    :type base_request: :class:`rest_framework.request.Request`
+    :return: the request
+    :rtype: :class:`rest_framework.request.Request`
+    """
+    parts = urlsplit(url)
+    http_request = HttpRequest()
+    if base_request is not None:
+        http_request.META.update(base_request.META)
+        for name in ("CONTENT_LENGTH", "CONTENT_TYPE", "HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE"):
+            http_request.META.pop(name, None)
+    http_request.method = "GET"
+    http_request.path = http_request.path_info = parts.path
+    http_request.META["REQUEST_METHOD"] = "GET"
+    http_request.META["PATH_INFO"] = parts.path
+    http_request.META["QUERY_STRING"] = parts.query
+    http_request.GET = QueryDict(parts.query)
+    return Request(http_request)
+
+
+def parse_query_date(value):
+    """
+    Parse a date query parameter value
+
+    :param value: date (YYYY-MM-DD) or datetime (ISO 8601)
+    :return: the parsed value or `None` if it is empty or invalid
+    :rtype: :class:`datetime.date` or :class:`datetime.datetime`
+    """
+    if not value:
+        return None
+    try:
+        return parse_date(value) or parse_datetime(value)
+    except ValueError:
+        return None
+
+
+class QueryPlan(object):
+    """
+    The query parameters of a synthesis request, parsed once and shared by all the data
+    sources of the request.  Use :func:`get_query_plan` to get the plan for a request.
+
+    :param request: The request to plan
+    :type request: :class:`rest_framework.request.Request`
+    """
+
+    def __init__(self, request):
+        #: The query parameters (one value per parameter) without the pagination parameters
+        self.query_params = dict(request.query_params.items())
+
+        #: The pagination parameters (See :mod:`basin3d.synthesis.pagination`)
+        self.limit = self.query_params.pop(QUERY_PARAM_LIMIT, None)
+        self.cursor = self.query_params.pop(QUERY_PARAM_CURSOR, None)
+
+        #: The ids in the id list parameters grouped by data source id prefix. The
+        #: ids do not have the prefix. (e.g. `{'monitoring_features': {'A': ['1', '2']}}`)
+        self.ids = {}
+        for param_name in QUERY_PARAM_ID_LISTS:
+            values = self.query_params.get(param_name)
+            if values:
+                grouped = self.ids[param_name] = OrderedDict()
+                for value in values.split(","):
+                    if "-" in value:
+                        grouped.setdefault(value.split("-")[0], []).append(extract_id(value))
+
+        #: The requested BASIN-3D observed property variables (`None` if not requested)
+        self.observed_property_variables = None
+        if QUERY_PARAM_OBSERVED_PROPERTY_VARIABLES in self.query_params:
+            self.observed_property_variables = self.query_params[QUERY_PARAM_OBSERVED_PROPERTY_VARIABLES].split(",")
+
+        #: The parsed start and end dates
+        self.start_date = parse_query_date(self.query_params.get(QUERY_PARAM_START_DATE))
+        self.end_date = parse_query_date(self.query_params.get(QUERY_PARAM_END_DATE))
+
+        #: The requested result quality (`None` if not requested)
+        self.result_quality = None
+        if QUERY_PARAM_RESULT_QUALITY in self.query_params:
+            self.result_quality = self.query_params[QUERY_PARAM_RESULT_QUALITY] in ["true", "True"]
+
+        self._variable_mappings = None
+
+    def datasource_ids(self, param_name, id_prefix):
+        """
+        The ids of an id list parameter that belong to a data source
+
+        :param param_name: the name of the id list parameter
+        :param id_prefix: the data source id prefix
+        :return: the ids without the prefix, `None` if the parameter was not requested
+        :rtype: list
+        """
+        if param_name not in self.ids:
+            return None
+        return list(self.ids[param_name].get(id_prefix, []))
+
+    def datasource_variables(self, datasource):
+        """
+        The data source variable mappings for the requested observed property variables.
+        The mappings for all data sources are read with a single query.
+
+        :param datasource: The data source
+        :type datasource: :class:`basin3d.models.DataSource`
+        :return: the mappings, `None` if no variables were requested
+        :rtype: list of :class:`basin3d.models.DataSourceObservedPropertyVariable`
+        """
+        if not self.observed_property_variables:
+            return None
+
+        if self._variable_mappings is None:
+            from basin3d.models import DataSourceObservedPropertyVariable
+            mappings = {}
+            for mapping in DataSourceObservedPropertyVariable.objects.filter(
+                    observed_property_variable_id__in=set(self.observed_property_variables)):
+                mappings.setdefault(mapping.datasource_id, []).append(mapping)
+            self._variable_mappings = mappings
+        return list(self._variable_mappings.get(datasource.pk, []))
+
+    def datasource_query_params(self, id_prefix):
+        """
+        The query parameters with the id lists filtered for a data source
+
+        :param id_prefix: the data source id prefix
+        :return: a new query parameter dictionary
+        :rtype: dict
+        """
+        query_params = dict(self.query_params)
+        for param_name in self.ids:
+            query_params[param_name] = self.datasource_ids(param_name, id_prefix)
+        return query_params
+
+
+def get_query_plan(request):
+    """
+    Get the query plan for the request. The plan is built on first use and kept
+    with the request.
+
+    :param request: The request
+    :type request: :class:`rest_framework.request.Request`
+    :rtype: :class:`QueryPlan`
+    """
+    plan = getattr(request, "_basin3d_query_plan", None)
+    if plan is None:
+        with phase("plan"):
+            plan = QueryPlan(request)
+        request._basin3d_query_plan = plan
+    return plan
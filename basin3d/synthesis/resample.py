@@ -0,0 +1,272 @@
+"""
+`basin3d.synthesis.resample`
+****************************
+
+.. currentmodule:: basin3d.synthesis.resample
+
+:synopsis: Temporal resampling of synthesized measurement timeseries
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Timeseries that are finer grained than the requested ``aggregation_duration`` are
+resampled into windows of that duration (YEAR, MONTH, DAY, HOUR, MINUTE, SECOND) with the
+requested ``statistic`` (MEAN, MIN, MAX, TOTAL).  The timestamp of each window is given by the
+requested ``time_reference_position`` (START, MIDDLE, END).
+
+Resampling is a single pass over the time value pairs that accumulates the count, sum,
+minimum and maximum of each window.
+
+----------------------------------
+
+"""
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+
+from django.utils.dateparse import parse_date, parse_datetime
+
+from basin3d.synthesis.models.measurement import MeasurementMetadataMixin, TimeMetadataMixin, TimeValuePair
+from basin3d.synthesis.query import QUERY_PARAM_AGGREGATION_DURATION, QUERY_PARAM_STATISTIC, \
+    QUERY_PARAM_TIME_REFERENCE_POSITION
+
+#: Aggregation durations from the finest to the coarsest
+AGGREGATION_DURATIONS = [TimeMetadataMixin.AGGREGATION_DURATION_SECOND,
+                         TimeMetadataMixin.AGGREGATION_DURATION_MINUTE,
+                         TimeMetadataMixin.AGGREGATION_DURATION_HOUR,
+                         TimeMetadataMixin.AGGREGATION_DURATION_DAY,
+                         TimeMetadataMixin.AGGREGATION_DURATION_MONTH,
+                         TimeMetadataMixin.AGGREGATION_DURATION_YEAR]
+
+#: Supported statistics
+STATISTICS = [MeasurementMetadataMixin.STATISTIC_MEAN,
+              MeasurementMetadataMixin.STATISTIC_MIN,
+              MeasurementMetadataMixin.STATISTIC_MAX,
+              MeasurementMetadataMixin.STATISTIC_TOTAL]
+
+#: Supported time reference positions
+TIME_REFERENCE_POSITIONS = [TimeMetadataMixin.TIME_REFERENCE_START,
+                            TimeMetadataMixin.TIME_REFERENCE_MIDDLE,
+                            TimeMetadataMixin.TIME_REFERENCE_END]
+
+
+class Resampling(namedtuple('Resampling', ['aggregation_duration', 'statistic', 'time_reference_position'])):
+    """
+    The requested resampling
+
+    `(aggregation_duration, statistic, time_reference_position)`
+    """
+
+    @classmethod
+    def from_query_plan(cls, plan):
+        """
+        Get the resampling requested in the query. Resampling is requested with the
+        ``aggregation_duration`` or ``statistic`` query parameters.
+
+        :param plan: The query plan
+        :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+        :return: the resampling or `None` if none was requested
+        :rtype: :class:`Resampling`
+        :raises ValueError: if a resampling parameter is invalid
+        """
+        query_params = plan.query_params
+        if QUERY_PARAM_AGGREGATION_DURATION not in query_params and QUERY_PARAM_STATISTIC not in query_params:
+            return None
+
+        resampling = cls(
+            query_params.get(QUERY_PARAM_AGGREGATION_DURATION, TimeMetadataMixin.AGGREGATION_DURATION_DAY).upper(),
+            query_params.get(QUERY_PARAM_STATISTIC, MeasurementMetadataMixin.STATISTIC_MEAN).upper(),
+            query_params.get(QUERY_PARAM_TIME_REFERENCE_POSITION, TimeMetadataMixin.TIME_REFERENCE_START).upper())
+        for value, choices, param_name in [
+                (resampling.aggregation_duration, AGGREGATION_DURATIONS, QUERY_PARAM_AGGREGATION_DURATION),
+                (resampling.statistic, STATISTICS, QUERY_PARAM_STATISTIC),
+                (resampling.time_reference_position, TIME_REFERENCE_POSITIONS, QUERY_PARAM_TIME_REFERENCE_POSITION)]:
+            if value not in choices:
+                raise ValueError("{} must be one of {}".format(param_name, "|".join(choices)))
+        return resampling
+
+
+def to_datetime(timestamp):
+    """
+    Convert a time value pair timestamp to a datetime
+
+    :param timestamp: date, datetime or ISO 8601 string
+    :return: the datetime or `None` if the timestamp cannot be read
+    :rtype: :class:`datetime.datetime`
+    """
+    if isinstance(timestamp, datetime):
+        return timestamp
+    if isinstance(timestamp, date):
+        return datetime(timestamp.year, timestamp.month, timestamp.day)
+    if isinstance(timestamp, str):
+        try:
+            parsed = parse_datetime(timestamp) or parse_date(timestamp)
+        except ValueError:
+            return None
+        return to_datetime(parsed) if parsed else None
+    return None
+
+
+def comparable_datetime(timestamp):
+    """
+    Convert a time value pair timestamp to a naive UTC datetime that can be compared with the
+    timestamps of any series. Timestamps with an offset are converted to UTC, and timestamps
+    without one are taken as UTC.
+
+    :param timestamp: date, datetime or ISO 8601 string
+    :return: the naive datetime or `None` if the timestamp cannot be read
+    :rtype: :class:`datetime.datetime`
+    """
+    moment = to_datetime(timestamp)
+    if moment is not None and moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def window_start(timestamp, aggregation_duration):
+    """
+    The start of the window that the timestamp is in
+
+    :param timestamp: the timestamp
+    :type timestamp: :class:`datetime.datetime`
+    :param aggregation_duration: the window duration
+    :rtype: :class:`datetime.datetime`
+    """
+    if aggregation_duration == TimeMetadataMixin.AGGREGATION_DURATION_YEAR:
+        return timestamp.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    if aggregation_duration == TimeMetadataMixin.AGGREGATION_DURATION_MONTH:
+        return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if aggregation_duration == TimeMetadataMixin.AGGREGATION_DURATION_DAY:
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if aggregation_duration == TimeMetadataMixin.AGGREGATION_DURATION_HOUR:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if aggregation_duration == TimeMetadataMixin.AGGREGATION_DURATION_MINUTE:
+        return timestamp.replace(second=0, microsecond=0)
+    return timestamp.replace(microsecond=0)
+
+
+def window_end(start, aggregation_duration):
+    """
+    The end of the window (the start of the next window)
+
+    :param start: the start of the window
+    :type start: :class:`datetime.datetime`
+    :param aggregation_duration: the window duration
+    :rtype: :class:`datetime.datetime`
+    """
+    if aggregation_duration == TimeMetadataMixin.AGGREGATION_DURATION_YEAR:
+        return start.replace(year=start.year + 1)
+    if aggregation_duration == TimeMetadataMixin.AGGREGATION_DURATION_MONTH:
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    seconds = {TimeMetadataMixin.AGGREGATION_DURATION_DAY: 86400,
+               TimeMetadataMixin.AGGREGATION_DURATION_HOUR: 3600,
+               TimeMetadataMixin.AGGREGATION_DURATION_MINUTE: 60}.get(aggregation_duration, 1)
+    return start + timedelta(seconds=seconds)
+
+
+def reference_time(start, aggregation_duration, time_reference_position):
+    """
+    The timestamp of a window
+
+    :param start: the start of the window
+    :type start: :class:`datetime.datetime`
+    :param aggregation_duration: the window duration
+    :param time_reference_position: the position of the timestamp in the window (START, MIDDLE, END)
+    :rtype: :class:`datetime.datetime`
+    """
+    if time_reference_position == TimeMetadataMixin.TIME_REFERENCE_START:
+        return start
+    end = window_end(start, aggregation_duration)
+    if time_reference_position == TimeMetadataMixin.TIME_REFERENCE_END:
+        return end
+    return start + (end - start) / 2
+
+
+def resample_points(result_points, aggregation_duration, statistic, time_reference_position):
+    """
+    Resample the time value pairs into windows of the aggregation duration
+
+    :param result_points: the time value pairs
+    :param aggregation_duration: the window duration
+    :param statistic: the statistic of the values in a window (MEAN, MIN, MAX, TOTAL)
+    :param time_reference_position: the position of the timestamp in the window (START, MIDDLE, END)
+    :return: the resampled time value pairs in time order
+    :rtype: list of :class:`basin3d.synthesis.models.measurement.TimeValuePair`
+    """
+    # Accumulate [count, total, minimum, maximum] for each window
+    windows = {}
+    dates_only = True
+    for timestamp, value in result_points:
+        moment = to_datetime(timestamp)
+        if moment is None or value is None:
+            continue
+        dates_only = dates_only and isinstance(timestamp, date) and not isinstance(timestamp, datetime)
+        start = window_start(moment, aggregation_duration)
+        window = windows.get(start)
+        if window is None:
+            windows[start] = [1, value, value, value]
+        else:
+            window[0] += 1
+            window[1] += value
+            if value < window[2]:
+                window[2] = value
+            if value > window[3]:
+                window[3] = value
+
+    points = []
+    for start in sorted(windows):
+        count, total, minimum, maximum = windows[start]
+        if statistic == MeasurementMetadataMixin.STATISTIC_MIN:
+            value = minimum
+        elif statistic == MeasurementMetadataMixin.STATISTIC_MAX:
+            value = maximum
+        elif statistic == MeasurementMetadataMixin.STATISTIC_TOTAL:
+            value = total
+        else:
+            value = total / count
+
+        timestamp = reference_time(start, aggregation_duration, time_reference_position)
+        if dates_only and timestamp.time() == datetime.min.time():
+            timestamp = timestamp.date()
+        points.append(TimeValuePair(timestamp, value))
+    return points
+
+
+def needs_resampling(observation, resampling):
+    """
+    Is the observation finer grained than the requested aggregation duration? Observations
+    without an aggregation duration are raw data. Observations with an unknown aggregation
+    duration are left as they are.
+
+    :param observation: the timeseries observation
+    :type observation: :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+    :param resampling: the requested resampling
+    :type resampling: :class:`Resampling`
+    :rtype: bool
+    """
+    duration = observation.aggregation_duration
+    if duration is None:
+        # Raw (not aggregated) observations
+        return True
+    duration = str(duration).upper()
+    if duration not in AGGREGATION_DURATIONS:
+        return False
+    return AGGREGATION_DURATIONS.index(duration) < AGGREGATION_DURATIONS.index(resampling.aggregation_duration)
+
+
+def resample_observation(observation, resampling):
+    """
+    Resample the result points of the observation, if it is finer grained than requested
+
+    :param observation: the timeseries observation
+    :type observation: :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+    :param resampling: the requested resampling
+    :type resampling: :class:`Resampling`
+    :return: the observation
+    """
+    if needs_resampling(observation, resampling):
+        observation.result_points = resample_points(observation.result_points or [], *resampling)
+        observation.aggregation_duration = resampling.aggregation_duration
+        observation.statistic = resampling.statistic
+        observation.time_reference_position = resampling.time_reference_position
+    return observation
@@ -0,0 +1,153 @@
+"""
+`basin3d.synthesis.search`
+**************************
+
+.. currentmodule:: basin3d.synthesis.search
+
+:synopsis: Type-ahead search of the monitoring features
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Monitoring feature listings are searched with the ``q`` query parameter (e.g. ``?q=east riv``).
+Every word of the query must be the start of a word in the feature id, name or description.
+Matches are ranked by where the words matched (id, then name, then description), whole word
+matches rank above prefix matches, and names that start with the query rank first. Paged
+listings (See :mod:`basin3d.synthesis.pagination`) are ranked within each data source.
+
+Catalog snapshots are indexed with a :class:`SearchIndex`, an inverted index from the
+words to the features with a sorted vocabulary for the prefix lookups.
+
+----------------------------------
+
+"""
+import re
+from bisect import bisect_left
+
+from basin3d.synthesis.query import QUERY_PARAM_SEARCH
+
+#: The searched feature attributes and their ranking weights
+SEARCH_FIELDS = (("id", 3), ("name", 2), ("description", 1))
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """
+    Split the text into lower case words
+
+    :param text: the text
+    :rtype: list
+    """
+    if not text:
+        return []
+    return WORD_PATTERN.findall(str(text).lower())
+
+
+def search_query(plan):
+    """
+    The search query of the request
+
+    :param plan: The query plan
+    :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+    :return: the search words or `None` if there is no search
+    :rtype: list
+    """
+    if QUERY_PARAM_SEARCH not in plan.query_params:
+        return None
+    return tokenize(plan.query_params[QUERY_PARAM_SEARCH])
+
+
+def search_score(feature, words):
+    """
+    Score a feature for the search words
+
+    :param feature: The monitoring feature
+    :type feature: :class:`basin3d.synthesis.models.field.MonitoringFeature`
+    :param words: the search words
+    :type words: list
+    :return: the score, 0 if the feature does not match
+    :rtype: int
+    """
+    field_words = [(tokenize(getattr(feature, field, None)), weight) for field, weight in SEARCH_FIELDS]
+    score = 0
+    for word in words:
+        best = 0
+        for tokens, weight in field_words:
+            for token in tokens:
+                if token == word:
+                    best = max(best, weight * 2)
+                elif token.startswith(word):
+                    best = max(best, weight)
+        if not best:
+            return 0
+        score += best
+
+    name = " ".join(tokenize(getattr(feature, "name", None)))
+    if words and name.startswith(" ".join(words)):
+        score += 10
+    return score
+
+
+def rank(features, words):
+    """
+    The features that match the search words, best first. Features with the
+    same score keep their order.
+
+    :param features: The monitoring features
+    :param words: the search words
+    :rtype: list
+    """
+    scored = [(search_score(feature, words), index, feature) for index, feature in enumerate(features)]
+    return [feature for score, index, feature in sorted((item for item in scored if item[0]),
+                                                        key=lambda item: (-item[0], item[1]))]
+
+
+class SearchIndex(object):
+    """
+    Inverted index of the words of the monitoring features
+
+    :param features: The monitoring features to index
+    :type features: list of :class:`basin3d.synthesis.models.field.MonitoringFeature`
+    """
+
+    def __init__(self, features):
+        self.features = list(features)
+        self._postings = {}
+        for index, feature in enumerate(self.features):
+            for field, _ in SEARCH_FIELDS:
+                for token in tokenize(getattr(feature, field, None)):
+                    self._postings.setdefault(token, set()).add(index)
+        self._vocabulary = sorted(self._postings)
+
+    def candidates(self, word):
+        """
+        The indexes of the features with a word that starts with the search word
+
+        :param word: a search word
+        :rtype: set
+        """
+        found = set()
+        position = bisect_left(self._vocabulary, word)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(word):
+            found.update(self._postings[self._vocabulary[position]])
+            position += 1
+        return found
+
+    def search(self, words):
+        """
+        The features that match all of the search words, best first
+
+        :param words: the search words
+        :type words: list
+        :rtype: list of :class:`basin3d.synthesis.models.field.MonitoringFeature`
+        """
+        if not words:
+            return list(self.features)
+
+        candidates = None
+        for word in words:
+            found = self.candidates(word)
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return []
+        return rank([self.features[index] for index in sorted(candidates)], words)
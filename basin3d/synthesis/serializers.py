@@ -415,6 +415,24 @@ class MonitoringFeatureSerializer(SpatialSamplingFeatureSerializer):
         instance.utc_offset = validated_data.get('utc_offset', instance.utc_offset)
 
 
+class UtcOffsetField(serializers.FloatField):
+    """
+    Extends :class:`rest_framework.serializers.FloatField` to keep whole hour
+    offsets as integers.
+
+    """
+
+    def to_representation(self, value):
+        """
+        Fractional offsets (e.g. 5.5) are floats, and the others are integers.
+
+        :param value:
+        :return:
+        """
+        value = super(UtcOffsetField, self).to_representation(value)
+        return int(value) if value.is_integer() else value
+
+
 class ObservationSerializerMixin(object):
     """
     Serializes a :class:`basin3d.synthesis.models.measurement.Observation`
@@ -424,7 +442,7 @@ class ObservationSerializerMixin(object):
 
         self.fields["id"] = serializers.CharField()
         self.fields["type"] = serializers.CharField()
-        self.fields["utc_offset"] = serializers.IntegerField()
+        self.fields["utc_offset"] = UtcOffsetField()
         self.fields["phenomenon_time"] = TimestampField()
         self.fields["observed_property"] = serializers.SerializerMethodField()
         self.fields["result_quality"] = serializers.CharField()
@@ -489,7 +507,9 @@ class MeasurementTimeseriesTVPObservationSerializer(ObservationSerializerMixin,
             if not instance.id:
                 field_to_remove.update(["id", "url"])
             for field in self.FIELDS_OPTIONAL:
-                if not instance.__getattribute__(field):
+                value = instance.__getattribute__(field)
+                # A utc offset of 0 is a value
+                if not value and value != 0:
                     field_to_remove.update([field])
 
         # remove unneeded fields
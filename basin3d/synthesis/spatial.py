@@ -0,0 +1,298 @@
+"""
+`basin3d.synthesis.spatial`
+***************************
+
+.. currentmodule:: basin3d.synthesis.spatial
+
+:synopsis: Spatial filters and the spatial index of the monitoring feature catalog
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Monitoring features are filtered by their :class:`~basin3d.synthesis.models.field.GeographicCoordinate`
+positions (absolute and representative) with the query parameters:
+
+    - *bbox:* bounding box in decimal degrees `min_longitude,min_latitude,max_longitude,max_latitude`
+    - *near:* circle in decimal degrees and kilometers `latitude,longitude,radius`
+
+A feature matches if any of its positions is in the bounding box and the circle.  Catalog
+snapshots are indexed with a :class:`SpatialIndex`, a grid of one degree cells.  Plugin
+views that set ``supports_spatial_filter = True`` receive the parsed ``bbox``
+(:class:`BoundingBox`) and ``near`` (:class:`Near`) filters and do the filtering upstream.
+
+----------------------------------
+
+"""
+import math
+from collections import namedtuple
+
+from basin3d.synthesis.models.field import GeographicCoordinate
+from basin3d.synthesis.query import QUERY_PARAM_BBOX, QUERY_PARAM_NEAR
+
+#: Mean radius of the Earth in kilometers
+EARTH_RADIUS = 6371.0088
+
+#: Kilometers in one degree of latitude
+KM_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+#: Spatial index cell size in degrees
+CELL_SIZE = 1.0
+
+
+def _parse_numbers(value, count, param_name):
+    """
+    Parse a comma separated list of numbers
+    """
+    try:
+        numbers = [float(v) for v in value.split(",")]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count or not all(math.isfinite(n) for n in numbers):
+        raise ValueError("{} must be {} comma separated numbers".format(param_name, count))
+    return numbers
+
+
+class BoundingBox(namedtuple('BoundingBox', ['min_longitude', 'min_latitude', 'max_longitude', 'max_latitude'])):
+    """
+    Bounding box in decimal degrees. Boxes that cross the antimeridian have
+    `min_longitude > max_longitude`.
+
+    `(min_longitude, min_latitude, max_longitude, max_latitude)`
+    """
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Parse a `bbox` query parameter value
+
+        :param value: `min_longitude,min_latitude,max_longitude,max_latitude`
+        :rtype: :class:`BoundingBox`
+        :raises ValueError: if the value is invalid
+        """
+        bbox = cls(*_parse_numbers(value, 4, QUERY_PARAM_BBOX))
+        if not -90 <= bbox.min_latitude <= bbox.max_latitude <= 90 or \
+                not (-180 <= bbox.min_longitude <= 180 and -180 <= bbox.max_longitude <= 180):
+            raise ValueError("bbox must be min_longitude,min_latitude,max_longitude,max_latitude")
+        return bbox
+
+    def contains(self, latitude, longitude):
+        """
+        Is the position in the bounding box?
+        """
+        if not self.min_latitude <= latitude <= self.max_latitude:
+            return False
+        if self.min_longitude <= self.max_longitude:
+            return self.min_longitude <= longitude <= self.max_longitude
+        return longitude >= self.min_longitude or longitude <= self.max_longitude
+
+    def longitude_ranges(self):
+        """
+        :return: the longitude ranges of the box (two if it crosses the antimeridian)
+        """
+        if self.min_longitude <= self.max_longitude:
+            return [(self.min_longitude, self.max_longitude)]
+        return [(self.min_longitude, 180.0), (-180.0, self.max_longitude)]
+
+
+class Near(namedtuple('Near', ['latitude', 'longitude', 'radius'])):
+    """
+    Circle with a center in decimal degrees and a radius in kilometers
+
+    `(latitude, longitude, radius)`
+    """
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Parse a `near` query parameter value
+
+        :param value: `latitude,longitude,radius`
+        :rtype: :class:`Near`
+        :raises ValueError: if the value is invalid
+        """
+        near = cls(*_parse_numbers(value, 3, QUERY_PARAM_NEAR))
+        if not -90 <= near.latitude <= 90 or not -180 <= near.longitude <= 180 or near.radius < 0:
+            raise ValueError("near must be latitude,longitude,radius (km)")
+        return near
+
+    def contains(self, latitude, longitude):
+        """
+        Is the position within the radius (great circle distance)?
+        """
+        return distance(self.latitude, self.longitude, latitude, longitude) <= self.radius
+
+    def bounding_box(self):
+        """
+        :return: the bounding box of the circle
+        :rtype: :class:`BoundingBox`
+        """
+        delta_latitude = self.radius / KM_PER_DEGREE
+        min_latitude = max(-90.0, self.latitude - delta_latitude)
+        max_latitude = min(90.0, self.latitude + delta_latitude)
+        cos_latitude = math.cos(math.radians(max(abs(min_latitude), abs(max_latitude))))
+        if cos_latitude <= 0 or self.radius / (KM_PER_DEGREE * cos_latitude) >= 180:
+            return BoundingBox(-180.0, min_latitude, 180.0, max_latitude)
+
+        delta_longitude = self.radius / (KM_PER_DEGREE * cos_latitude)
+        min_longitude = self.longitude - delta_longitude
+        max_longitude = self.longitude + delta_longitude
+        if min_longitude < -180:
+            min_longitude += 360
+        if max_longitude > 180:
+            max_longitude -= 360
+        return BoundingBox(min_longitude, min_latitude, max_longitude, max_latitude)
+
+
+def distance(latitude1, longitude1, latitude2, longitude2):
+    """
+    Great circle (haversine) distance in kilometers between two positions in decimal degrees
+    """
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + \
+        math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(longitude2 - longitude1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def feature_positions(feature):
+    """
+    The absolute and representative positions of a monitoring feature in decimal degrees.
+    Positions in other units than decimal degrees and radians are ignored.
+
+    :param feature: The monitoring feature
+    :type feature: :class:`basin3d.synthesis.models.field.MonitoringFeature`
+    :return: list of `(latitude, longitude)`
+    """
+    coordinates = getattr(feature, "coordinates", None)
+    if not coordinates:
+        return []
+
+    horizontal_positions = []
+    if coordinates.absolute:
+        horizontal_positions.extend(coordinates.absolute.horizontal_position or [])
+    if coordinates.representative and coordinates.representative.representative_point:
+        horizontal_positions.extend(coordinates.representative.representative_point.horizontal_position or [])
+
+    positions = []
+    for position in horizontal_positions:
+        if not isinstance(position, GeographicCoordinate) or position.latitude is None or \
+                position.longitude is None:
+            continue
+        if position.units == GeographicCoordinate.UNITS_DEC_DEGREES:
+            positions.append((position.latitude, position.longitude))
+        elif position.units == GeographicCoordinate.UNITS_RADIANS:
+            positions.append((math.degrees(position.latitude), math.degrees(position.longitude)))
+    return positions
+
+
+class SpatialFilter(namedtuple('SpatialFilter', ['bbox', 'near'])):
+    """
+    The requested spatial filters
+
+    `(bbox, near)`
+    """
+
+    @classmethod
+    def from_query_plan(cls, plan):
+        """
+        Get the spatial filter requested in the query
+
+        :param plan: The query plan
+        :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+        :return: the filter or `None` if none was requested
+        :rtype: :class:`SpatialFilter`
+        :raises ValueError: if a spatial parameter is invalid
+        """
+        bbox = plan.query_params.get(QUERY_PARAM_BBOX)
+        near = plan.query_params.get(QUERY_PARAM_NEAR)
+        if bbox is None and near is None:
+            return None
+        return cls(BoundingBox.parse(bbox) if bbox is not None else None,
+                   Near.parse(near) if near is not None else None)
+
+    def contains(self, latitude, longitude):
+        """
+        Is the position in the bounding box and the circle?
+        """
+        return (self.bbox is None or self.bbox.contains(latitude, longitude)) and \
+            (self.near is None or self.near.contains(latitude, longitude))
+
+    def matches(self, feature):
+        """
+        Is any position of the feature in the bounding box and the circle?
+
+        :param feature: The monitoring feature
+        :type feature: :class:`basin3d.synthesis.models.field.MonitoringFeature`
+        """
+        return any(self.contains(latitude, longitude) for latitude, longitude in feature_positions(feature))
+
+    def bounding_boxes(self):
+        """
+        :return: the bounding boxes to look up in a spatial index
+        :rtype: list of :class:`BoundingBox`
+        """
+        return [bbox for bbox in (self.bbox, self.near and self.near.bounding_box()) if bbox is not None]
+
+
+def _cell(latitude, longitude):
+    return int(math.floor(latitude / CELL_SIZE)), int(math.floor(longitude / CELL_SIZE))
+
+
+class SpatialIndex(object):
+    """
+    Grid index of the positions of monitoring features
+
+    :param features: The monitoring features to index
+    :type features: list of :class:`basin3d.synthesis.models.field.MonitoringFeature`
+    """
+
+    def __init__(self, features):
+        self.features = list(features)
+        self._cells = {}
+        for index, feature in enumerate(self.features):
+            for latitude, longitude in feature_positions(feature):
+                cell = self._cells.setdefault(_cell(latitude, longitude), [])
+                if not cell or cell[-1] != index:
+                    cell.append(index)
+
+    def candidates(self, bbox):
+        """
+        The indexes of the features with a position in the cells that the bounding box overlaps
+
+        :param bbox: The bounding box
+        :type bbox: :class:`BoundingBox`
+        :rtype: set
+        """
+        min_row, max_row = _cell(bbox.min_latitude, 0)[0], _cell(bbox.max_latitude, 0)[0]
+        cells = []
+        for min_longitude, max_longitude in bbox.longitude_ranges():
+            min_column, max_column = _cell(0, min_longitude)[1], _cell(0, max_longitude)[1]
+            cells.append((min_column, max_column))
+
+        count = sum((max_row - min_row + 1) * (max_column - min_column + 1) for min_column, max_column in cells)
+        if count > len(self._cells):
+            # Scan the occupied cells instead of the box
+            return {index for (row, column), indexes in self._cells.items()
+                    if min_row <= row <= max_row and
+                    any(min_column <= column <= max_column for min_column, max_column in cells)
+                    for index in indexes}
+
+        found = set()
+        for min_column, max_column in cells:
+            for row in range(min_row, max_row + 1):
+                for column in range(min_column, max_column + 1):
+                    found.update(self._cells.get((row, column), ()))
+        return found
+
+    def query(self, spatial_filter):
+        """
+        The features that match the spatial filter, in index order
+
+        :param spatial_filter: The spatial filter
+        :type spatial_filter: :class:`SpatialFilter`
+        :rtype: list of :class:`basin3d.synthesis.models.field.MonitoringFeature`
+        """
+        candidates = None
+        for bbox in spatial_filter.bounding_boxes():
+            found = self.candidates(bbox)
+            candidates = found if candidates is None else candidates & found
+        return [self.features[index] for index in sorted(candidates or ())
+                if spatial_filter.matches(self.features[index])]
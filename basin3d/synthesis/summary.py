@@ -0,0 +1,158 @@
+"""
+`basin3d.synthesis.summary`
+***************************
+
+.. currentmodule:: basin3d.synthesis.summary
+
+:synopsis: Summary statistics of synthesized timeseries
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Data availability overviews need the number of values, their minimum, maximum and mean and
+the first and last timestamps of each monitoring feature and observed property, not the
+values themselves.  ``/synthesis/measurement_tvp_timeseries/summary/`` returns these
+statistics for the timeseries of a query.
+
+Each timeseries is summarized in a single pass over its time value pairs as the plugin yields
+it, and is dropped once it is summarized.  The result points are never serialized.  The
+summaries of the timeseries with the same monitoring feature, observed property and unit of
+measurement are combined.  Points without a value are not counted.  Timestamps are compared in
+UTC, and timestamps without an offset are taken as UTC.  The summaries are JSON
+or CSV (``?format=csv``).
+
+----------------------------------
+
+"""
+from collections import OrderedDict
+
+from basin3d.synthesis.resample import comparable_datetime
+
+
+def summary_key(observation):
+    """
+    The summaries of the timeseries with the same key are combined
+
+    :param observation: the timeseries observation
+    :type observation: :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+    :return: tuple `(feature_of_interest, observed_property, unit_of_measurement)`
+    """
+    feature_of_interest = observation.feature_of_interest
+    return (getattr(feature_of_interest, "id", feature_of_interest), observation.observed_property,
+            observation.unit_of_measurement)
+
+
+class TimeseriesSummary(object):
+    """
+    Summary statistics of the values of one or more timeseries
+
+    :param key: the :func:`summary_key` of the timeseries
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.first = None
+        self.last = None
+        self._first_moment = None
+        self._last_moment = None
+
+    @classmethod
+    def from_observation(cls, observation):
+        """
+        Summarize a timeseries
+
+        :param observation: the timeseries observation
+        :type observation: :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+        :rtype: :class:`TimeseriesSummary`
+        """
+        summary = cls(summary_key(observation))
+        summary.add_points(observation.result_points)
+        return summary
+
+    def add_points(self, result_points):
+        """
+        Add the time value pairs to the summary
+
+        :param result_points: iterable of time value pairs
+        """
+        for timestamp, value in result_points or []:
+            if value is None:
+                continue
+            self.count += 1
+            self.total += value
+            if self.minimum is None or value < self.minimum:
+                self.minimum = value
+            if self.maximum is None or value > self.maximum:
+                self.maximum = value
+
+            moment = comparable_datetime(timestamp)
+            if moment is None:
+                continue
+            if self._first_moment is None or moment < self._first_moment:
+                self.first, self._first_moment = timestamp, moment
+            if self._last_moment is None or moment > self._last_moment:
+                self.last, self._last_moment = timestamp, moment
+
+    def combine(self, other):
+        """
+        Add the statistics of another summary to this summary
+
+        :param other: the other summary
+        :type other: :class:`TimeseriesSummary`
+        """
+        self.count += other.count
+        self.total += other.total
+        if other.minimum is not None and (self.minimum is None or other.minimum < self.minimum):
+            self.minimum = other.minimum
+        if other.maximum is not None and (self.maximum is None or other.maximum > self.maximum):
+            self.maximum = other.maximum
+        if other._first_moment is not None and (self._first_moment is None or other._first_moment < self._first_moment):
+            self.first, self._first_moment = other.first, other._first_moment
+        if other._last_moment is not None and (self._last_moment is None or other._last_moment > self._last_moment):
+            self.last, self._last_moment = other.last, other._last_moment
+
+    @property
+    def mean(self):
+        """
+        The mean of the values, `None` if there are none
+        """
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        """
+        The summary for the response
+
+        :rtype: :class:`collections.OrderedDict`
+        """
+        feature_of_interest, observed_property, unit_of_measurement = self.key
+        return OrderedDict([
+            ("feature_of_interest", feature_of_interest),
+            ("observed_property", observed_property),
+            ("unit_of_measurement", unit_of_measurement),
+            ("count", self.count),
+            ("min", self.minimum),
+            ("max", self.maximum),
+            ("mean", self.mean),
+            ("first", self.first),
+            ("last", self.last),
+        ])
+
+
+def combine_summaries(summaries):
+    """
+    Combine the summaries with the same key
+
+    :param summaries: the summaries of the timeseries
+    :return: the combined summaries in the order of their first timeseries
+    :rtype: list of :class:`TimeseriesSummary`
+    """
+    combined = OrderedDict()
+    for summary in summaries:
+        if summary.key in combined:
+            combined[summary.key].combine(summary)
+        else:
+            combined[summary.key] = summary
+    return list(combined.values())
@@ -0,0 +1,139 @@
+"""
+`basin3d.synthesis.timezones`
+*****************************
+
+.. currentmodule:: basin3d.synthesis.timezones
+
+:synopsis: Time zone normalization of synthesized timeseries
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+The timestamps of the time value pairs are in the local time of the data source, given by the
+``utc_offset`` (hours) of each timeseries.  With ``?tz=UTC`` (or a target offset in hours,
+e.g. ``?tz=-8`` or ``?tz=5.5``) the timestamps are converted to that offset and the ``utc_offset`` of the
+timeseries is set to it.  The converted timestamps carry their offset
+(e.g. ``2016-02-01T09:00:00Z``).
+
+The shift of a timeseries is computed once from its ``utc_offset``, and is applied to each of
+its timestamps in a single pass.  Timestamps that are dates (daily and coarser timeseries) are
+calendar days and are not shifted.  Timeseries without a ``utc_offset`` are left unchanged
+unless their timestamps carry an offset.  Merged and aligned timeseries and summaries compare
+the timestamps that are left without an offset as UTC.
+
+----------------------------------
+
+"""
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+
+from django.utils.dateparse import parse_date
+
+from basin3d.synthesis.models.measurement import TimeValuePair
+from basin3d.synthesis.query import QUERY_PARAM_TZ
+from basin3d.synthesis.resample import to_datetime
+
+#: ``tz`` query parameter value for Coordinated Universal Time
+TZ_UTC = "UTC"
+
+#: The range of the target offsets in hours
+MIN_OFFSET = -12
+MAX_OFFSET = 14
+
+
+class TimezoneNormalization(namedtuple('TimezoneNormalization', ['utc_offset'])):
+    """
+    The requested time zone normalization
+
+    `(utc_offset)`
+    """
+
+    @classmethod
+    def from_query_plan(cls, plan):
+        """
+        Get the time zone normalization requested in the query. The target offset is in
+        hours, and may be fractional (e.g. 5.5 or 5.75).
+
+        :param plan: The query plan
+        :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+        :return: the normalization or `None` if none was requested
+        :rtype: :class:`TimezoneNormalization`
+        :raises ValueError: if the `tz` query parameter is invalid
+        """
+        value = plan.query_params.get(QUERY_PARAM_TZ)
+        if value is None:
+            return None
+        if value.upper() in (TZ_UTC, "Z"):
+            return cls(0)
+        try:
+            utc_offset = float(value)
+        except ValueError:
+            utc_offset = None
+        if utc_offset is None or not MIN_OFFSET <= utc_offset <= MAX_OFFSET:
+            raise ValueError("{} must be {} or an offset in hours (e.g. -8 or 5.5) from {} to +{}".format(
+                QUERY_PARAM_TZ, TZ_UTC, MIN_OFFSET, MAX_OFFSET))
+        return cls(int(utc_offset) if utc_offset.is_integer() else utc_offset)
+
+    @property
+    def tzinfo(self):
+        """
+        The target time zone
+
+        :rtype: :class:`datetime.timezone`
+        """
+        return timezone.utc if self.utc_offset == 0 else timezone(timedelta(hours=self.utc_offset))
+
+
+def _is_day(timestamp):
+    """
+    Is the timestamp a date (a date or a YYYY-MM-DD string)?
+    """
+    if isinstance(timestamp, str):
+        try:
+            return parse_date(timestamp) is not None
+        except ValueError:
+            return False
+    return isinstance(timestamp, date) and not isinstance(timestamp, datetime)
+
+
+def normalize_points(result_points, utc_offset, target):
+    """
+    Convert the timestamps of the time value pairs to the target time zone
+
+    :param result_points: the time value pairs
+    :param utc_offset: the offset in hours of the timestamps without an offset (`None` if unknown)
+    :param target: the target time zone
+    :type target: :class:`datetime.timezone`
+    :return: the time value pairs
+    :rtype: list of :class:`basin3d.synthesis.models.measurement.TimeValuePair`
+    """
+    source = None if utc_offset is None else timezone(timedelta(hours=utc_offset))
+    normalized = []
+    for point in result_points or []:
+        if _is_day(point[0]):
+            normalized.append(point)
+            continue
+        moment = to_datetime(point[0])
+        if moment is None or moment.tzinfo is None and source is None:
+            normalized.append(point)
+            continue
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=source)
+        normalized.append(TimeValuePair(moment.astimezone(target), point[1]))
+    return normalized
+
+
+def normalize_observation(observation, normalization):
+    """
+    Convert the timestamps of the observation to the requested time zone
+
+    :param observation: the timeseries observation
+    :type observation: :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+    :param normalization: the requested normalization
+    :type normalization: :class:`TimezoneNormalization`
+    :return: the observation
+    """
+    observation.result_points = normalize_points(observation.result_points, observation.utc_offset,
+                                                 normalization.tzinfo)
+    if observation.utc_offset is not None:
+        observation.utc_offset = normalization.utc_offset
+    return observation
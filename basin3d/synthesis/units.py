@@ -0,0 +1,238 @@
+"""
+`basin3d.synthesis.units`
+*************************
+
+.. currentmodule:: basin3d.synthesis.units
+
+:synopsis: Unit of measurement harmonization of synthesized timeseries
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+Data sources report the same observed property variable in different units.  Each
+:class:`~basin3d.models.ObservedPropertyVariable` may have a canonical unit (the ``units``
+column of the ``measurement_variables.csv`` of the plugin).  With ``?units=canonical`` the
+values of the timeseries are converted to the canonical unit of their variable.
+
+Units are looked up in the :data:`UNITS` registry.  A unit is a linear conversion
+(`scale`, `offset`) to the SI unit of its dimension, so any two units of a dimension convert
+with one multiplication and one addition per value.  The conversion of each
+`(source unit, target unit)` pair is computed once and cached.  Timeseries in units that are
+not in the registry, or that cannot be converted, are left in their units.
+
+----------------------------------
+
+"""
+import logging
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict
+
+from basin3d.synthesis.models.measurement import TimeValuePair
+from basin3d.synthesis.query import QUERY_PARAM_UNITS
+
+logger = logging.getLogger(__name__)
+
+#: ``units`` query parameter value for the canonical units of the variables
+UNITS_CANONICAL = "canonical"
+
+
+class Unit(namedtuple('Unit', ['dimension', 'scale', 'offset'])):
+    """
+    A unit of measurement. The value in the SI unit of the dimension is `value * scale + offset`.
+
+    `(dimension, scale, offset)`
+    """
+
+
+def _units(dimension, *units):
+    return {symbol: Unit(dimension, scale, offset) for symbols, scale, offset in units for symbol in symbols}
+
+
+#: The unit registry: unit symbols (and their aliases) to :class:`Unit`
+UNITS = {}  # type: Dict[str, Unit]
+UNITS.update(_units("length",
+                    (("m", "meter", "meters"), 1.0, 0.0),
+                    (("km",), 1e3, 0.0),
+                    (("cm",), 1e-2, 0.0),
+                    (("mm",), 1e-3, 0.0),
+                    (("um", "micron"), 1e-6, 0.0),
+                    (("nm",), 1e-9, 0.0),
+                    (("in", "inch", "inches"), 0.0254, 0.0),
+                    (("ft", "feet", "foot"), 0.3048, 0.0),
+                    (("mi", "mile", "miles"), 1609.344, 0.0)))
+UNITS.update(_units("temperature",
+                    (("K", "kelvin"), 1.0, 0.0),
+                    (("degC", "deg C", "celsius"), 1.0, 273.15),
+                    (("degF", "deg F", "fahrenheit"), 5.0 / 9.0, 459.67 * 5.0 / 9.0)))
+UNITS.update(_units("mass concentration",
+                    (("kg/m3", "g/L", "g/l"), 1.0, 0.0),
+                    (("mg/L", "mg/l", "g/m3"), 1e-3, 0.0),
+                    (("ug/L", "ug/l", "mg/m3"), 1e-6, 0.0),
+                    (("ng/L", "ng/l", "ug/m3"), 1e-9, 0.0)))
+UNITS.update(_units("amount concentration",
+                    (("mol/m3", "mmol/L", "mmol/l", "mM"), 1.0, 0.0),
+                    (("mol/L", "mol/l", "M"), 1e3, 0.0),
+                    (("umol/L", "umol/l", "uM"), 1e-3, 0.0),
+                    (("nmol/L", "nmol/l", "nM"), 1e-6, 0.0)))
+UNITS.update(_units("volume",
+                    (("m3",), 1.0, 0.0),
+                    (("L", "l", "liter", "liters"), 1e-3, 0.0),
+                    (("mL", "ml"), 1e-6, 0.0),
+                    (("ft3",), 0.028316846592, 0.0),
+                    (("gal", "gallon", "gallons"), 0.003785411784, 0.0)))
+UNITS.update(_units("volumetric flow",
+                    (("m3/s",), 1.0, 0.0),
+                    (("m3/d",), 1.0 / 86400, 0.0),
+                    (("L/s", "l/s"), 1e-3, 0.0),
+                    (("L/min", "l/min"), 1e-3 / 60, 0.0),
+                    (("ft3/s", "cfs"), 0.028316846592, 0.0),
+                    (("gpm",), 0.003785411784 / 60, 0.0)))
+UNITS.update(_units("pressure",
+                    (("Pa",), 1.0, 0.0),
+                    (("hPa", "mbar"), 1e2, 0.0),
+                    (("kPa",), 1e3, 0.0),
+                    (("MPa",), 1e6, 0.0),
+                    (("bar",), 1e5, 0.0),
+                    (("atm",), 101325.0, 0.0),
+                    (("psi",), 6894.757293168, 0.0),
+                    (("mmHg",), 133.322387415, 0.0),
+                    (("inHg",), 3386.389, 0.0)))
+UNITS.update(_units("speed",
+                    (("m/s",), 1.0, 0.0),
+                    (("km/h",), 1.0 / 3.6, 0.0),
+                    (("ft/s",), 0.3048, 0.0),
+                    (("mph",), 0.44704, 0.0)))
+UNITS.update(_units("mass",
+                    (("kg",), 1.0, 0.0),
+                    (("g",), 1e-3, 0.0),
+                    (("mg",), 1e-6, 0.0),
+                    (("ug",), 1e-9, 0.0),
+                    (("lb",), 0.45359237, 0.0)))
+UNITS.update(_units("electrical conductivity",
+                    (("S/m",), 1.0, 0.0),
+                    (("mS/cm", "dS/m"), 0.1, 0.0),
+                    (("uS/cm",), 1e-4, 0.0)))
+UNITS.update(_units("fraction",
+                    (("fraction", "1"), 1.0, 0.0),
+                    (("%", "percent"), 1e-2, 0.0)))
+
+#: Unit symbol characters that are written more than one way
+_SYMBOL_REPLACEMENTS = [("µ", "u"), ("μ", "u"), ("°", "deg"), ("³", "3"), ("^3", "3"),
+                        ("²", "2"), ("^2", "2"), ("**", "")]
+
+
+def get_unit(symbol):
+    """
+    Look up a unit in the registry. Micro signs, degree signs, superscripts and
+    extra spaces are normalized (e.g. `µg/L`, `°C`, `m³/s`).
+
+    :param symbol: the unit symbol
+    :return: the unit or `None` if it is not in the registry
+    :rtype: :class:`Unit`
+    """
+    if not symbol:
+        return None
+    symbol = " ".join(str(symbol).split())
+    for character, replacement in _SYMBOL_REPLACEMENTS:
+        symbol = symbol.replace(character, replacement)
+    return UNITS.get(symbol)
+
+
+@lru_cache(maxsize=None)
+def conversion(source, target):
+    """
+    The conversion from the source unit to the target unit
+
+    :param source: the source unit symbol
+    :param target: the target unit symbol
+    :return: tuple `(scale, offset)` to convert with `value * scale + offset`, `None` if
+        the units cannot be converted
+    """
+    source_unit, target_unit = get_unit(source), get_unit(target)
+    if source_unit is None or target_unit is None or source_unit.dimension != target_unit.dimension:
+        return None
+    return (source_unit.scale / target_unit.scale,
+            (source_unit.offset - target_unit.offset) / target_unit.scale)
+
+
+def convert_points(result_points, scale, offset):
+    """
+    Convert the values of the time value pairs
+
+    :param result_points: the time value pairs
+    :param scale: the conversion scale
+    :param offset: the conversion offset
+    :return: the converted time value pairs
+    :rtype: list of :class:`basin3d.synthesis.models.measurement.TimeValuePair`
+    """
+    return [TimeValuePair(timestamp, value if value is None else value * scale + offset)
+            for timestamp, value in result_points or []]
+
+
+class UnitHarmonization(object):
+    """
+    Converts timeseries to the canonical units of their observed property variables.
+    The canonical units are read with a single query.
+    """
+
+    @classmethod
+    def from_query_plan(cls, plan):
+        """
+        Get the unit harmonization requested in the query. The harmonization is kept
+        with the plan.
+
+        :param plan: The query plan
+        :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+        :return: the harmonization or `None` if it was not requested
+        :rtype: :class:`UnitHarmonization`
+        :raises ValueError: if the `units` query parameter is invalid
+        """
+        units = plan.query_params.get(QUERY_PARAM_UNITS)
+        if units is None:
+            return None
+        if units.lower() != UNITS_CANONICAL:
+            raise ValueError("{} must be {}".format(QUERY_PARAM_UNITS, UNITS_CANONICAL))
+
+        harmonization = getattr(plan, "_unit_harmonization", None)
+        if harmonization is None:
+            harmonization = plan._unit_harmonization = cls()
+        return harmonization
+
+    def __init__(self):
+        self._canonical_units = None
+
+    def canonical_units(self, observed_property):
+        """
+        The canonical unit of the variable of an observed property
+
+        :param observed_property: the :class:`~basin3d.models.ObservedProperty` id
+        :return: the unit or `None` if the variable has no canonical unit
+        """
+        if self._canonical_units is None:
+            from basin3d.models import ObservedProperty
+            self._canonical_units = {
+                str(pk): units for pk, units in ObservedProperty.objects.filter(
+                    observed_property_variable__units__isnull=False).values_list(
+                    "pk", "observed_property_variable__units") if units}
+        return self._canonical_units.get(str(observed_property))
+
+    def harmonize(self, observation):
+        """
+        Convert the observation to the canonical unit of its variable
+
+        :param observation: the timeseries observation
+        :type observation: :class:`basin3d.synthesis.models.measurement.MeasurementTimeseriesTVPObservation`
+        :return: the observation
+        """
+        target = self.canonical_units(observation.observed_property)
+        source = observation.unit_of_measurement
+        if not target or source == target:
+            return observation
+
+        factors = conversion(source, target)
+        if factors is None:
+            logger.debug("Cannot convert %s from '%s' to '%s'", observation.id, source, target)
+            return observation
+        observation.result_points = convert_points(observation.result_points, *factors)
+        observation.unit_of_measurement = target
+        return observation
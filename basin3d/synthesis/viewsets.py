@@ -21,23 +21,51 @@ from the connected data sources.
 
 """
 import logging
-from typing import Dict
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Dict, List, Set, Tuple
+from urllib.parse import urlencode
 
+from basin3d import profiling
+from basin3d.conditional import catalog_version, conditional_response, make_etag, request_variant
 from basin3d.models import DataSource, FeatureTypes
 from basin3d.plugins import InvalidOrMissingCredentials, get_request_feature_type
+from basin3d.synthesis.align import Alignment, WideTableCSVRenderer, wide_table
+from basin3d.synthesis.batch import get_shared_work, param_value
+from basin3d.synthesis.cache import cache_key, get_cache, POST_CACHE_QUERY_PARAMS
+from basin3d.synthesis.catalog import catalog, is_catalog_enabled, list_features
+from basin3d.synthesis.downsample import Downsampling, downsample_observation
+from basin3d.synthesis.hierarchy import HierarchyIndex, hierarchy_feature_type, hierarchy_filter_ids
+from basin3d.synthesis.jobs import STATUS_DONE, jobs
+from basin3d.synthesis.merge import merge_observations, merge_requested
 
 from basin3d.synthesis.models.field import MonitoringFeature
 from basin3d.synthesis.models.measurement import MeasurementTimeseriesTVPObservation, TimeMetadataMixin
-from basin3d.synthesis.query import extract_query_param_ids, \
+from basin3d.synthesis.pagination import decode_cursor, encode_cursor, parse_limit
+from basin3d.synthesis.query import get_query_plan, synthesis_request, QueryPlan, \
     QUERY_PARAM_OBSERVED_PROPERTY_VARIABLES, QUERY_PARAM_AGGREGATION_DURATION, \
-    QUERY_PARAM_MONITORING_FEATURES, QUERY_PARAM_RESULT_QUALITY, QUERY_PARAM_REGIONS, QUERY_PARAM_SUBBASINS
+    QUERY_PARAM_MONITORING_FEATURES, QUERY_PARAM_RESULT_QUALITY, QUERY_PARAM_REGIONS, QUERY_PARAM_SUBBASINS, \
+    QUERY_PARAM_START_DATE, QUERY_PARAM_END_DATE, QUERY_PARAM_LIMIT, QUERY_PARAM_CURSOR, QUERY_PARAM_BBOX, \
+    QUERY_PARAM_NEAR, QUERY_PARAM_ANCESTOR, QUERY_PARAM_DESCENDANTS_OF, QUERY_PARAM_FEATURE_TYPE, \
+    QUERY_PARAM_SEARCH, QUERY_PARAM_MAX_POINTS, QUERY_PARAM_DOWNSAMPLE
+from basin3d.synthesis.resample import Resampling, resample_observation
+from basin3d.synthesis.search import rank, search_query, search_score
+from basin3d.synthesis.spatial import SpatialFilter
+from basin3d.synthesis.summary import TimeseriesSummary, combine_summaries
+from basin3d.synthesis.timezones import TimezoneNormalization, normalize_observation
+from basin3d.synthesis.units import UnitHarmonization
+from basin3d.timing import phase
 
 from basin3d.synthesis.serializers import MonitoringFeatureSerializer, \
     MeasurementTimeseriesTVPObservationSerializer
+from django.http import FileResponse
 from rest_framework import status
 from rest_framework import versioning
+from rest_framework.reverse import reverse
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.viewsets import ViewSet
 from rest_framework.decorators import action
 
@@ -57,6 +85,9 @@ class DataSourcePluginViewSet(ViewSet):
     """
     versioning_class = versioning.NamespaceVersioning
 
+    #: The id list query parameters that are filtered by data source id prefix
+    ID_QUERY_PARAMS = ()  # type: Tuple[str, ...]
+
     def synthesize_query_params(self, request, plugin_view: 'DataSourcePluginViewSet') -> Dict[str, str]:
         """
         Synthesizes query parameters, if necessary
@@ -68,47 +99,220 @@ class DataSourcePluginViewSet(ViewSet):
         # do nothing, subclasses may override this
         return request.query_params
 
-    def list(self, request: Request, format: str = None) -> Response:
+    def synthesize_objects(self, request: Request, plugin_view: 'DataSourcePluginViewSet',
+                           query_params: Dict[str, str]):
         """
-        Return the synthesized plugin results
+        Get the synthesized objects from the plugin view
 
         :param request: The incoming request object
         :type request: :class:`rest_framework.request.Request`
-        :param format: The format to present the data (default is json)
-        :return: The HTTP Response
-        :rtype: :class:`rest_framework.request.Response`
+        :param plugin_view: The plugin view to list the objects from
+        :param query_params: The synthesized query parameters for the plugin view
+        :return: iterable of synthesized objects
         """
-        items = []
+        # subclasses may override this
+        return plugin_view.list(request, **query_params)
 
+    def filters_objects(self, request: Request, plugin_view: 'DataSourcePluginViewSet') -> bool:
+        """
+        Does :meth:`synthesize_objects` drop some of the objects of the plugin view for the request?
+        The offset and limit of a page are then applied to the filtered objects instead of being
+        passed to the plugin view.
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param plugin_view: The plugin view to list the objects from
+        """
+        # subclasses may override this
+        return False
+
+    def get_datasources(self, request: Request):
+        """
+        The data sources to synthesize for the request
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :return: the data sources, optionally filtered by the `datasource` query parameter
+        """
         # Are we filtering by Datasource?
         if 'datasource' in request.query_params.keys():
             datasources = DataSource.objects.filter(id_prefix=request.query_params['datasource'])
         else:
             datasources = DataSource.objects.all()
 
+        # Skip the data sources that cannot contribute to the results
+        plan = get_query_plan(request)
+        selected = []
+        for datasource in datasources:
+            if self.can_contribute(plan, datasource):
+                selected.append(datasource)
+            else:
+                logger.debug("Skipping %s, it cannot contribute to the query", datasource.name)
+        return selected
+
+    def can_contribute(self, plan: QueryPlan, datasource: DataSource) -> bool:
+        """
+        Can the data source contribute to the results of the query? A data source
+        that has no ids in one of the requested :attr:`ID_QUERY_PARAMS` is skipped.
+
+        :param plan: The query plan of the request
+        :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+        :param datasource: The data source
+        :type datasource: :class:`basin3d.models.DataSource`
+        """
+        for param_name in self.ID_QUERY_PARAMS:
+            if plan.datasource_ids(param_name, datasource.id_prefix) == []:
+                return False
+        return True
+
+    def list(self, request: Request, format: str = None) -> Response:
+        """
+        Return the synthesized plugin results
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param format: The format to present the data (default is json)
+        :return: The HTTP Response
+        :rtype: :class:`rest_framework.request.Response`
+        """
+        if get_query_plan(request).limit is not None:
+            return self.list_page(request)
+
+        items = []  # type: List[Any]
+
         # Iterate over the plugins
         # (Consider parallelizing this, and using a StreamingHttpResponse )
-        for datasource in datasources:  # Get the plugin model
+        for datasource in self.get_datasources(request):  # Get the plugin model
+            items.extend(self.list_datasource(request, datasource))
+        items = self.order_items(request, items)
+        profiling.mark(profiling.PHASE_COLLECT)
+
+        with phase("serialize"):
+            serializer = self.__class__.serializer_class(items, many=True, context={'request': request})
+            data = serializer.data
+        profiling.mark(profiling.PHASE_SERIALIZE)
+        return profiling.mark_rendered(Response(data))
+
+    def order_items(self, request: Request, items: List[Any]) -> List[Any]:
+        """
+        Order the synthesized objects of all the data sources
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param items: The synthesized objects in data source order
+        :return: The ordered objects
+        :rtype: list
+        """
+        # do nothing, subclasses may override this
+        return items
 
-            if datasource.enabled:
+    def list_page(self, request: Request) -> Response:
+        """
+        Return a page of the synthesized plugin results. The results of the data sources
+        are merged in data source order (See :mod:`basin3d.synthesis.pagination`).
 
-                plugin_views = datasource.get_plugin().get_plugin_views()
-                if self.synthesis_model in plugin_views and \
-                        hasattr(plugin_views[self.synthesis_model], "list"):
-                    try:
-                        for obj in plugin_views[self.synthesis_model].list(request,
-                                                                           **self.synthesize_query_params(
-                                                                               request,
-                                                                               plugin_views[
-                                                                                   self.synthesis_model])
-                                                                           ):
-                            items.append(obj)
-                            logger.debug(self.synthesize_query_params(request, plugin_views[self.synthesis_model]))
-                    except InvalidOrMissingCredentials as e:
-                        logger.error(e)
-
-        serializer = self.__class__.serializer_class(items, many=True, context={'request': request})
-        return Response(serializer.data)
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :return: The HTTP Response with the `next` page URL and the `results`
+        :rtype: :class:`rest_framework.request.Response`
+        """
+        plan = get_query_plan(request)
+        try:
+            limit = parse_limit(plan.limit)
+            done, offsets = decode_cursor(plan.cursor)
+        except ValueError as e:
+            return Response({'success': False, 'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        items = []  # type: List[Any]
+        remaining_datasources = False
+        for datasource in self.get_datasources(request):
+            id_prefix = datasource.id_prefix
+            if id_prefix in done:
+                continue
+            remaining = limit - len(items)
+            if remaining == 0:
+                remaining_datasources = True
+                break
+
+            # Ask for one more than needed to know if the data source has more results
+            offset = offsets.pop(id_prefix, 0)
+            objects = self.list_datasource(request, datasource, offset=offset, limit=remaining + 1)
+            if len(objects) > remaining:
+                items.extend(objects[:remaining])
+                offsets[id_prefix] = offset + remaining
+                remaining_datasources = True
+                break
+            items.extend(objects)
+            done.add(id_prefix)
+
+        next_url = None
+        if remaining_datasources:
+            next_url = replace_query_param(request.build_absolute_uri(), QUERY_PARAM_CURSOR,
+                                           encode_cursor(done, offsets))
+        profiling.mark(profiling.PHASE_COLLECT)
+
+        with phase("serialize"):
+            serializer = self.__class__.serializer_class(items, many=True, context={'request': request})
+            data = serializer.data
+        profiling.mark(profiling.PHASE_SERIALIZE)
+        return profiling.mark_rendered(Response(OrderedDict([('next', next_url), ('results', data)])))
+
+    def list_datasource(self, request: Request, datasource: DataSource, offset: int = 0, limit: int = None,
+                        transform=None) -> List[Any]:
+        """
+        Return the synthesized plugin results for a single data source
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param datasource: The data source to synthesize
+        :type datasource: :class:`basin3d.models.DataSource`
+        :param offset: The number of objects to skip
+        :param limit: The maximum number of objects to return (default: all)
+        :param transform: function applied to each synthesized object as the plugin yields it
+            (default: none). The results of the function are returned.
+        :return: The synthesized objects
+        :rtype: list
+        """
+        items = []  # type: List[Any]
+        if datasource.enabled:
+
+            plugin_views = datasource.get_plugin().get_plugin_views()
+            if self.synthesis_model in plugin_views and \
+                    hasattr(plugin_views[self.synthesis_model], "list"):
+                try:
+                    plugin_view = plugin_views[self.synthesis_model]
+                    query_params = self.synthesize_query_params(request, plugin_view)  # type: Dict[str, Any]
+                    paged = offset or limit is not None
+                    if paged and getattr(plugin_view, "supports_paging", False) and \
+                            not self.filters_objects(request, plugin_view):
+                        # The plugin resumes from the upstream offset
+                        query_params = dict(query_params, offset=offset, limit=limit)
+                        paged = False
+                    logger.debug("Synthesized query params for %s: %s", datasource.name, query_params)
+
+                    def synthesize():
+                        with phase("synthesize", datasource.name):
+                            objects = self.synthesize_objects(request, plugin_view, query_params)
+                            if paged:
+                                objects = islice(objects, offset, offset + limit if limit is not None else None)
+                            if transform is not None:
+                                objects = map(transform, objects)
+                            return list(objects)
+
+                    shared_work = get_shared_work(request)
+                    if shared_work is None:
+                        items.extend(synthesize())
+                    else:
+                        # Queries of a batch with the same parameters for the data source share the results.
+                        # The cache key leaves out the parameters of the stages applied after the cache.
+                        key = (request.path_info, cache_key(self.synthesis_model, datasource, query_params),
+                               query_params.get(QUERY_PARAM_START_DATE), query_params.get(QUERY_PARAM_END_DATE),
+                               tuple(query_params.get(name) for name in POST_CACHE_QUERY_PARAMS),
+                               offset, limit, transform)
+                        items.extend(shared_work.run(key, synthesize))
+                except InvalidOrMissingCredentials as e:
+                    logger.error(e)
+        return items
 
     def retrieve(self, request: Request, pk: str) -> Response:
         """
@@ -173,12 +377,221 @@ class MonitoringFeatureViewSet(DataSourcePluginViewSet):
     **Filter** by the following attributes (/?attribute=parameter&attribute=parameter&...)
 
     * *datasource (optional):* a single data source id prefix (e.g ?datasource=`datasource.id_prefix`)
+    * *bbox (optional):* bounding box in decimal degrees (e.g ?bbox=min_lon,min_lat,max_lon,max_lat)
+    * *near (optional):* circle around a position in decimal degrees with a radius in kilometers
+      (e.g ?near=lat,lon,radius)
+    * *ancestor (optional):* comma separated list of monitoring feature ids. Lists the features under
+      them in the related sampling feature (PARENT) hierarchy
+    * *descendants_of (optional):* same as ancestor
+    * *feature_type (optional):* feature type of the ancestor or descendants_of results (e.g ?feature_type=POINT)
+    * *q (optional):* search the feature ids, names and descriptions for words starting with the
+      query words. Matches are ranked, best first (e.g ?q=east riv)
 
     **Restrict fields**  with query parameter ‘fields’. (e.g. ?fields=id,name)
+
+    **Paginate** with query parameters ‘limit’ and ‘cursor’. (e.g. ?limit=100). The response has the
+    ‘results’ and the ‘next’ page URL.
+
+    Unfiltered listings are served from the monitoring feature catalog
+    (:mod:`basin3d.synthesis.catalog`) when it is enabled.
     """
     serializer_class = MonitoringFeatureSerializer
     synthesis_model = MonitoringFeature
 
+    ID_QUERY_PARAMS = (QUERY_PARAM_MONITORING_FEATURES, QUERY_PARAM_REGIONS, QUERY_PARAM_SUBBASINS,
+                       QUERY_PARAM_ANCESTOR, QUERY_PARAM_DESCENDANTS_OF)
+
+    #: Query parameters that may be answered from the monitoring feature catalog
+    CATALOG_QUERY_PARAMS = {'format', 'fields', 'datasource', QUERY_PARAM_LIMIT, QUERY_PARAM_CURSOR,
+                            QUERY_PARAM_BBOX, QUERY_PARAM_NEAR, QUERY_PARAM_ANCESTOR, QUERY_PARAM_DESCENDANTS_OF,
+                            QUERY_PARAM_SEARCH}
+
+    def is_catalog_request(self, request: Request) -> bool:
+        """
+        Can the request be answered from the monitoring feature catalog?
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        """
+        catalog_query_params = self.CATALOG_QUERY_PARAMS
+        if hierarchy_filter_ids(get_query_plan(request)) is not None:
+            catalog_query_params = catalog_query_params | {QUERY_PARAM_FEATURE_TYPE}
+        return is_catalog_enabled() and set(request.query_params.keys()).issubset(catalog_query_params)
+
+    def list(self, request: Request, format: str = None) -> Response:
+        """
+        Return the synthesized monitoring features. Catalog responses carry an ETag made
+        from the snapshot versions and are `304 Not Modified` while the snapshots are unchanged.
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param format: The format to present the data (default is json)
+        :return: The HTTP Response
+        :rtype: :class:`rest_framework.request.Response`
+        """
+        plan = get_query_plan(request)
+        try:
+            spatial_filter = SpatialFilter.from_query_plan(plan)
+            hierarchy_feature_type(plan)
+        except ValueError as e:
+            return Response({'success': False, 'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not self.is_catalog_request(request):
+            return super().list(request, format=format)
+
+        datasources = [datasource for datasource in self.get_datasources(request) if datasource.enabled]
+        if spatial_filter and any(self.supports_spatial_filter(datasource) for datasource in datasources):
+            # Some of the results are not from the catalog
+            return super().list(request, format=format)
+
+        feature_type, _ = self.extract_type(request)
+        if hierarchy_filter_ids(plan) is not None:
+            # The hierarchy is indexed over all the feature types
+            feature_type = None
+        snapshots = [catalog.get(datasource, feature_type) for datasource in datasources]
+        return conditional_response(
+            request, lambda: super(MonitoringFeatureViewSet, self).list(request, format=format),
+            etag=make_etag(request_variant(request), catalog_version(),
+                           *[snapshot.version for snapshot in snapshots]),
+            last_modified=max([snapshot.modified_at for snapshot in snapshots], default=None))
+
+    def list_datasource(self, request: Request, datasource: DataSource, offset: int = 0, limit: int = None,
+                        transform=None) -> List[Any]:
+        """
+        Return the synthesized monitoring features for a single data source. Requests
+        without plugin filters read the catalog snapshot and do not wait on the data source.
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param datasource: The data source to synthesize
+        :type datasource: :class:`basin3d.models.DataSource`
+        :param offset: The number of objects to skip
+        :param limit: The maximum number of objects to return (default: all)
+        :param transform: function applied to each synthesized object (default: none).
+            The results of the function are returned.
+        :return: The synthesized objects
+        :rtype: list
+        """
+        plan = get_query_plan(request)
+        spatial_filter = SpatialFilter.from_query_plan(plan)
+        if not self.is_catalog_request(request) or (spatial_filter and self.supports_spatial_filter(datasource)):
+            return super().list_datasource(request, datasource, offset=offset, limit=limit, transform=transform)
+
+        if not datasource.enabled:
+            return []
+        feature_type, _ = self.extract_type(request)
+        ancestor_ids = hierarchy_filter_ids(plan)
+        search_words = search_query(plan)
+        if ancestor_ids is not None:
+            features = catalog.get(datasource, None).hierarchy_index.descendants_of(
+                ancestor_ids, hierarchy_feature_type(plan, feature_type))
+            if spatial_filter:
+                features = [feature for feature in features if spatial_filter.matches(feature)]
+            if search_words:
+                features = rank(features, search_words)
+        else:
+            snapshot = catalog.get(datasource, feature_type)
+            if spatial_filter:
+                features = snapshot.spatial_index.query(spatial_filter)
+                if search_words:
+                    features = rank(features, search_words)
+            elif search_words:
+                features = snapshot.search_index.search(search_words)
+            else:
+                features = snapshot.features
+        features = features[offset:offset + limit if limit is not None else None]
+        if transform is not None:
+            return [transform(feature) for feature in features]
+        return features
+
+    def order_items(self, request: Request, items: List[Any]) -> List[Any]:
+        """
+        Rank the monitoring features of all the data sources by the search query, if any
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param items: The synthesized objects in data source order
+        :return: The ordered objects
+        :rtype: list
+        """
+        search_words = search_query(get_query_plan(request))
+        if search_words:
+            return rank(items, search_words)
+        return items
+
+    def get_hierarchy_index(self, datasource: DataSource) -> HierarchyIndex:
+        """
+        The hierarchy index of all the monitoring features of the data source. It is
+        read from the catalog, if it is enabled.
+
+        :param datasource: The data source
+        :type datasource: :class:`basin3d.models.DataSource`
+        :rtype: :class:`basin3d.synthesis.hierarchy.HierarchyIndex`
+        """
+        if is_catalog_enabled():
+            return catalog.get(datasource, None).hierarchy_index
+        return HierarchyIndex(list_features(datasource, None))
+
+    def supports_spatial_filter(self, datasource: DataSource) -> bool:
+        """
+        Does the plugin view of the data source do the spatial filtering?
+
+        :param datasource: The data source
+        :type datasource: :class:`basin3d.models.DataSource`
+        """
+        plugin_view = datasource.get_plugin().get_plugin_views().get(self.synthesis_model)
+        return getattr(plugin_view, "supports_spatial_filter", False)
+
+    def synthesize_objects(self, request: Request, plugin_view: DataSourcePluginViewSet,
+                           query_params: Dict[str, str]):
+        """
+        Get the synthesized monitoring features from the plugin view. If the plugin
+        view does not support spatial filters, the features are filtered here. Hierarchy
+        filters are applied with the hierarchy index and search queries are matched here.
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param plugin_view: The plugin view to list the objects from
+        :param query_params: The synthesized query parameters for the plugin view
+        :return: iterable of synthesized objects
+        """
+        plan = get_query_plan(request)
+        features = super().synthesize_objects(request, plugin_view, query_params)
+
+        ancestor_ids = hierarchy_filter_ids(plan)
+        if ancestor_ids is not None:
+            descendants = self.get_hierarchy_index(plugin_view.datasource).descendants
+            descendant_ids = set()  # type: Set[str]
+            for ancestor_id in ancestor_ids:
+                descendant_ids.update(descendants.get(ancestor_id, ()))
+            feature_type = hierarchy_feature_type(plan, self.extract_type(request)[0])
+            features = (feature for feature in features if feature.id in descendant_ids and
+                        (feature_type is None or feature.feature_type == feature_type))
+
+        search_words = search_query(plan)
+        if search_words:
+            features = (feature for feature in features if search_score(feature, search_words))
+
+        spatial_filter = SpatialFilter.from_query_plan(plan)
+        if spatial_filter is None or getattr(plugin_view, "supports_spatial_filter", False):
+            return features
+        return (feature for feature in features if spatial_filter.matches(feature))
+
+    def filters_objects(self, request: Request, plugin_view: DataSourcePluginViewSet) -> bool:
+        """
+        Are the monitoring features of the plugin view filtered here? Hierarchy filters, search
+        queries and the spatial filters of plugin views that do not support them are.
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param plugin_view: The plugin view to list the objects from
+        """
+        plan = get_query_plan(request)
+        if hierarchy_filter_ids(plan) is not None or search_query(plan):
+            return True
+        return SpatialFilter.from_query_plan(plan) is not None and \
+            not getattr(plugin_view, "supports_spatial_filter", False)
+
     def synthesize_query_params(self, request: Request, plugin_view: DataSourcePluginViewSet) -> Dict[str, str]:
         """
         Synthesizes query parameters, if necessary
@@ -190,23 +603,20 @@ class MonitoringFeatureViewSet(DataSourcePluginViewSet):
         :param plugin_view: The plugin view to synthesize query params for
         :return: The query parameters
         """
-        query_params = {}
+        query_params = get_query_plan(request).datasource_query_params(plugin_view.datasource.id_prefix)
 
         # Look in Request to find URL and get type out if there
         # ToDo: potentially remove -- need to figure out how to handle in plugin
         k, _ = self.extract_type(request)
         if k is not None:
-            query_params["feature_type"] = k
-
-        for key, value in request.query_params.items():
-            query_params[key] = value
+            query_params.setdefault("feature_type", k)
+        if hierarchy_filter_ids(get_query_plan(request)) is not None:
+            query_params["feature_type"] = hierarchy_feature_type(get_query_plan(request), k)
 
-        id_prefix = plugin_view.datasource.id_prefix
-        for param_name in [QUERY_PARAM_MONITORING_FEATURES, QUERY_PARAM_REGIONS, QUERY_PARAM_SUBBASINS]:
-            extract_query_param_ids(request=request,
-                                    param_name=param_name,
-                                    id_prefix=id_prefix,
-                                    query_params=query_params)
+        spatial_filter = SpatialFilter.from_query_plan(get_query_plan(request))
+        if spatial_filter and getattr(plugin_view, "supports_spatial_filter", False):
+            query_params[QUERY_PARAM_BBOX] = spatial_filter.bbox
+            query_params[QUERY_PARAM_NEAR] = spatial_filter.near
 
         return query_params
 
@@ -220,7 +630,7 @@ class MonitoringFeatureViewSet(DataSourcePluginViewSet):
 
         """
         k = get_request_feature_type(request)
-        if k:
+        if k is not None:
             return k, FeatureTypes.TYPES[k]
         return None, None
 
@@ -296,15 +706,364 @@ class MeasurementTimeseriesTVPObservationViewSet(DataSourcePluginViewSet):
     * *observed_property_variables (required):* comma separated list of observed property variable ids
     * *start_date (required):* date YYYY-MM-DD
     * *end_date (optional):* date YYYY-MM-DD
-    * *aggregation_duration (default: DAY):* enum (YEAR|MONTH|DAY|HOUR|MINUTE|SECOND)
+    * *aggregation_duration (default: DAY):* enum (YEAR|MONTH|DAY|HOUR|MINUTE|SECOND). Finer grained
+      timeseries are resampled to the aggregation duration.
+    * *statistic (default: MEAN):* enum (MEAN|MIN|MAX|TOTAL), statistic of the resampled values
+    * *time_reference_position (default: START):* enum (START|MIDDLE|END), position of the timestamp
+      in the resampled aggregation duration
     * *datasource (optional):* a single data source id prefix (e.g ?datasource=`datasource.id_prefix`)
+    * *max_points (optional):* downsample the timeseries to at most this many points for plotting
+      (See :mod:`basin3d.synthesis.downsample`)
+    * *downsample (default: LTTB):* enum (LTTB|MINMAX), the downsampling method for ‘max_points’
+    * *units (optional):* canonical to convert the timeseries to the canonical units of their
+      observed property variables (See :mod:`basin3d.synthesis.units`)
+    * *tz (optional):* UTC or an offset in hours (e.g. -8) to convert the timestamps from the local
+      time of the data source (See :mod:`basin3d.synthesis.timezones`)
+    * *merge (optional):* true to merge the timeseries of the same observed property of one site into a
+      single series ordered by timestamp (See :mod:`basin3d.synthesis.merge`). Not available with ‘limit’
+      or jobs.
+    * *align (optional):* enum (NULL|LINEAR), align the timeseries onto a shared time grid as a wide
+      table, filling the gaps with nulls or linear interpolation (See :mod:`basin3d.synthesis.align`).
+      The table is columnar JSON or CSV (?format=csv). Not available with ‘limit’ or jobs.
 
     **Restrict fields** with query parameter ‘fields’. (e.g. ?fields=id,name)
 
+    **Paginate** with query parameters ‘limit’ and ‘cursor’. (e.g. ?limit=100). The response has the
+    ‘results’ and the ‘next’ page URL.
+
+    **Summarize** the timeseries with ‘summary/’: the count, min, max and mean of the values and the first
+    and last timestamps for each monitoring feature and observed property (See :mod:`basin3d.synthesis.summary`).
+    Not available with ‘max_points’ or ‘downsample’.
+
+    **Extract** large queries asynchronously with `POST jobs/` (See :mod:`basin3d.synthesis.jobs`).
+    Poll the job status at ‘jobs/<job_id>/’ and download the results from ‘jobs/<job_id>/result/’.
+
+    Synthesized timeseries are stored in the disk-backed timeseries cache
+    (:mod:`basin3d.synthesis.cache`) when it is enabled.
 
     """
     serializer_class = MeasurementTimeseriesTVPObservationSerializer
     synthesis_model = MeasurementTimeseriesTVPObservation
+    renderer_classes = tuple(api_settings.DEFAULT_RENDERER_CLASSES) + (WideTableCSVRenderer,)
+
+    ID_QUERY_PARAMS = (QUERY_PARAM_MONITORING_FEATURES,)
+
+    def can_contribute(self, plan: QueryPlan, datasource: DataSource) -> bool:
+        """
+        Can the data source contribute to the results of the query? Data sources
+        without a mapping for any of the requested observed property variables are
+        also skipped.
+
+        :param plan: The query plan of the request
+        :type plan: :class:`basin3d.synthesis.query.QueryPlan`
+        :param datasource: The data source
+        :type datasource: :class:`basin3d.models.DataSource`
+        """
+        return super().can_contribute(plan, datasource) and plan.datasource_variables(datasource) != []
+
+    def list(self, request: Request, format: str = None) -> Response:
+        """
+        Return the synthesized timeseries. When the timeseries of every data source are
+        in the timeseries cache, the response carries an ETag made from the cache entries
+        and is `304 Not Modified` while they are unchanged.
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param format: The format to present the data (default is json)
+        :return: The HTTP Response
+        :rtype: :class:`rest_framework.request.Response`
+        """
+        plan = get_query_plan(request)
+        try:
+            Resampling.from_query_plan(plan)
+            Downsampling.from_query_plan(plan)
+            UnitHarmonization.from_query_plan(plan)
+            TimezoneNormalization.from_query_plan(plan)
+            alignment = Alignment.from_query_plan(plan)
+            if merge_requested(plan) and plan.limit is not None:
+                raise ValueError("merge cannot be used with limit")
+            if alignment is not None and plan.limit is not None:
+                raise ValueError("align cannot be used with limit")
+            if alignment is None and request.accepted_renderer.format == WideTableCSVRenderer.format:
+                raise ValueError("The csv format requires align")
+        except ValueError as e:
+            return Response({'success': False, 'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def synthesize_list():
+            if alignment is not None:
+                return self.list_aligned(request, alignment)
+            return super(MeasurementTimeseriesTVPObservationViewSet, self).list(request, format=format)
+
+        versions = self.cache_versions(request)
+        if versions is None:
+            return synthesize_list()
+
+        return conditional_response(
+            request, synthesize_list,
+            etag=make_etag(request_variant(request), catalog_version(), *versions),
+            last_modified=max([created for _, created in versions], default=None))
+
+    def list_aligned(self, request: Request, alignment: Alignment) -> Response:
+        """
+        Return the synthesized timeseries aligned onto a shared time grid as a wide table
+        (See :mod:`basin3d.synthesis.align`)
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param alignment: The requested alignment
+        :type alignment: :class:`basin3d.synthesis.align.Alignment`
+        :return: The HTTP Response with the table
+        :rtype: :class:`rest_framework.request.Response`
+        """
+        items = []  # type: List[Any]
+        for datasource in self.get_datasources(request):
+            items.extend(self.list_datasource(request, datasource))
+        items = self.order_items(request, items)
+        profiling.mark(profiling.PHASE_COLLECT)
+        with phase("serialize"):
+            table = wide_table(items, alignment)
+        profiling.mark(profiling.PHASE_SERIALIZE)
+        return profiling.mark_rendered(Response(table))
+
+    def order_items(self, request: Request, items: List[Any]) -> List[Any]:
+        """
+        Merge the timeseries into a single series for each observed property, if requested
+        (See :mod:`basin3d.synthesis.merge`)
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param items: The synthesized timeseries in data source order
+        :return: The timeseries
+        :rtype: list
+        """
+        plan = get_query_plan(request)
+        if merge_requested(plan):
+            items = merge_observations(items)
+            downsampling = Downsampling.from_query_plan(plan)
+            if downsampling is not None:
+                items = [downsample_observation(observation, downsampling) for observation in items]
+        return items
+
+    @action(detail=False)
+    def summary(self, request: Request) -> Response:
+        """
+        Return the summary statistics of the synthesized timeseries for each monitoring feature
+        and observed property (See :mod:`basin3d.synthesis.summary`). The timeseries are
+        summarized as they are synthesized and are not returned. They are resampled to the
+        requested aggregation duration and are never downsampled, so `max_points` and
+        `downsample` are rejected.
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :return: The HTTP Response with the summaries
+        :rtype: :class:`rest_framework.request.Response`
+        """
+        plan = get_query_plan(request)
+        try:
+            Resampling.from_query_plan(plan)
+            UnitHarmonization.from_query_plan(plan)
+            TimezoneNormalization.from_query_plan(plan)
+            for name in (QUERY_PARAM_MAX_POINTS, QUERY_PARAM_DOWNSAMPLE):
+                if name in plan.query_params:
+                    raise ValueError("{} cannot be used with summary".format(name))
+        except ValueError as e:
+            return Response({'success': False, 'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        summaries = []  # type: List[TimeseriesSummary]
+        for datasource in self.get_datasources(request):
+            summaries.extend(self.list_datasource(request, datasource, transform=TimeseriesSummary.from_observation))
+        return Response([summary.to_dict() for summary in combine_summaries(summaries)])
+
+    @action(detail=False, methods=['post'])
+    def jobs(self, request: Request) -> Response:
+        """
+        Submit an extraction job (See :mod:`basin3d.synthesis.jobs`). The query parameters are
+        given in the query string or as a JSON object in the body
+        (e.g. `{"monitoring_features": ["A-1", "A-2"], "start_date": "2000-01-01"}`).
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :return: The HTTP Response (`202 Accepted`) with the job status
+        :rtype: :class:`rest_framework.request.Response`
+        """
+        query_params = OrderedDict(request.query_params.items())
+        try:
+            if request.data and not isinstance(request.data, dict):
+                raise ValueError("The job query parameters must be an object")
+            for name, value in (request.data or {}).items():
+                query_params[name] = param_value(name, value)
+            for name in (QUERY_PARAM_LIMIT, QUERY_PARAM_CURSOR):
+                query_params.pop(name, None)
+            job_request = synthesis_request("{}?{}".format(
+                reverse('measurementtvptimeseries-list', request=request), urlencode(query_params)), request)
+            Resampling.from_query_plan(get_query_plan(job_request))
+            Downsampling.from_query_plan(get_query_plan(job_request))
+            UnitHarmonization.from_query_plan(get_query_plan(job_request))
+            TimezoneNormalization.from_query_plan(get_query_plan(job_request))
+            if merge_requested(get_query_plan(job_request)):
+                raise ValueError("merge cannot be used with jobs")
+            if Alignment.from_query_plan(get_query_plan(job_request)) is not None:
+                raise ValueError("align cannot be used with jobs")
+        except ValueError as e:
+            return Response({'success': False, 'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = jobs.submit(self, job_request)
+        return Response(self.job_status(request, job), status=status.HTTP_202_ACCEPTED,
+                        headers={'Location': reverse('measurementtvptimeseries-job', kwargs={'job_id': job['id']},
+                                                     request=request)})
+
+    @action(detail=False, methods=['get', 'delete'], url_path=r'jobs/(?P<job_id>[0-9a-f]{32})')
+    def job(self, request: Request, job_id: str) -> Response:
+        """
+        Get the status and progress of an extraction job. `DELETE` cancels a running job
+        or removes a finished job.
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param job_id: The job id
+        :return: The HTTP Response with the job status
+        :rtype: :class:`rest_framework.request.Response`
+        """
+        job = jobs.cancel(job_id) if request.method == 'DELETE' else jobs.get(job_id)
+        if job is None:
+            return Response({'success': False, 'detail': "There is no job {}".format(job_id)},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response(self.job_status(request, job))
+
+    @action(detail=False, url_path=r'jobs/(?P<job_id>[0-9a-f]{32})/result')
+    def job_result(self, request: Request, job_id: str):
+        """
+        Download the results of an extraction job as a JSON file
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param job_id: The job id
+        :return: The file response
+        """
+        path = jobs.result_path(job_id)
+        try:
+            response = FileResponse(open(path, 'rb'), content_type='application/json') if path else None
+        except OSError:
+            response = None
+        if response is None:
+            return Response({'success': False, 'detail': "Job {} has no results".format(job_id)},
+                            status=status.HTTP_404_NOT_FOUND)
+        response['Content-Disposition'] = 'attachment; filename="measurement_tvp_timeseries-{}.json"'.format(job_id)
+        return response
+
+    def job_status(self, request: Request, job: dict) -> dict:
+        """
+        The job status with the URLs of the job and its results
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param job: The job status
+        :return: The job status for the response
+        """
+        job = OrderedDict(job)
+        job['url'] = reverse('measurementtvptimeseries-job', kwargs={'job_id': job['id']}, request=request)
+        job['result'] = None
+        if job['status'] == STATUS_DONE:
+            job['result'] = reverse('measurementtvptimeseries-job-result', kwargs={'job_id': job['id']},
+                                    request=request)
+        return job
+
+    def cache_versions(self, request: Request):
+        """
+        The versions of the cached timeseries for each data source of the request
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :return: list of cache entry versions, or `None` if any data source is not cached
+        """
+        timeseries_cache = get_cache()
+        if not timeseries_cache:
+            return None
+
+        versions = []
+        try:
+            for datasource in self.get_datasources(request):
+                if not datasource.enabled:
+                    continue
+                plugin_views = datasource.get_plugin().get_plugin_views()
+                if self.synthesis_model not in plugin_views or \
+                        not hasattr(plugin_views[self.synthesis_model], "list"):
+                    continue
+                query_params = self.synthesize_query_params(request, plugin_views[self.synthesis_model])
+                version = timeseries_cache.version(cache_key(self.synthesis_model, datasource, query_params),
+                                                   query_params.get(QUERY_PARAM_START_DATE) or None,
+                                                   query_params.get(QUERY_PARAM_END_DATE) or None)
+                if version is None:
+                    return None
+                versions.append(version)
+        except Exception as e:
+            logger.error("Timeseries cache error: {}".format(e))
+            return None
+        return versions
+
+    def synthesize_objects(self, request: Request, plugin_view: DataSourcePluginViewSet,
+                           query_params: Dict[str, str]):
+        """
+        Get the synthesized timeseries, resample them to the requested aggregation
+        duration (See :mod:`basin3d.synthesis.resample`), downsample them to the
+        requested number of points (See :mod:`basin3d.synthesis.downsample`), convert
+        them to the requested units (See :mod:`basin3d.synthesis.units`) and convert their
+        timestamps to the requested time zone (See :mod:`basin3d.synthesis.timezones`).
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param plugin_view: The plugin view to list the objects from
+        :param query_params: The synthesized query parameters for the plugin view
+        :return: iterable of synthesized objects
+        """
+        plan = get_query_plan(request)
+        observations = self.synthesize_cached_objects(request, plugin_view, query_params)
+        resampling = Resampling.from_query_plan(plan)
+        if resampling is not None:
+            observations = (resample_observation(observation, resampling) for observation in observations)
+        downsampling = Downsampling.from_query_plan(plan)
+        if downsampling is not None and not merge_requested(plan):
+            # Merged timeseries are downsampled once they are merged (See :meth:`order_items`)
+            observations = (downsample_observation(observation, downsampling) for observation in observations)
+        harmonization = UnitHarmonization.from_query_plan(plan)
+        if harmonization is not None:
+            observations = (harmonization.harmonize(observation) for observation in observations)
+        normalization = TimezoneNormalization.from_query_plan(plan)
+        if normalization is not None:
+            observations = (normalize_observation(observation, normalization) for observation in observations)
+        return observations
+
+    def synthesize_cached_objects(self, request: Request, plugin_view: DataSourcePluginViewSet,
+                                  query_params: Dict[str, str]):
+        """
+        Get the synthesized timeseries from the timeseries cache or, on a miss, from the plugin view.
+
+        :param request: The incoming request object
+        :type request: :class:`rest_framework.request.Request`
+        :param plugin_view: The plugin view to list the objects from
+        :param query_params: The synthesized query parameters for the plugin view
+        :return: iterable of synthesized objects
+        """
+        timeseries_cache = get_cache()
+        if not timeseries_cache:
+            return plugin_view.list(request, **query_params)
+
+        key = cache_key(self.synthesis_model, plugin_view.datasource, query_params)
+        start = query_params.get(QUERY_PARAM_START_DATE) or None
+        end = query_params.get(QUERY_PARAM_END_DATE) or None
+        try:
+            observations = timeseries_cache.get(key, start, end)
+            if observations is not None:
+                return observations
+        except Exception as e:
+            logger.error("Timeseries cache error: {}".format(e))
+
+        observations = list(plugin_view.list(request, **query_params))
+        try:
+            timeseries_cache.put(key, plugin_view.datasource, observations, start, end)
+        except Exception as e:
+            logger.error("Timeseries cache error: {}".format(e))
+        return observations
 
     def synthesize_query_params(self, request: Request, plugin_view: DataSourcePluginViewSet) -> Dict[str, str]:
         """
@@ -322,29 +1081,23 @@ class MeasurementTimeseriesTVPObservationViewSet(DataSourcePluginViewSet):
         :return: The query parameters
         """
 
-        id_prefix = plugin_view.datasource.id_prefix
-        query_params = {}
-        for key, value in request.query_params.items():
-            query_params[key] = value
+        plan = get_query_plan(request)
+        query_params = dict(plan.query_params)
 
         # ToDo: Change to monitoring feature
-        extract_query_param_ids(request=request,
-                                param_name=QUERY_PARAM_MONITORING_FEATURES,
-                                id_prefix=id_prefix,
-                                query_params=query_params)
+        monitoring_features = plan.datasource_ids(QUERY_PARAM_MONITORING_FEATURES, plugin_view.datasource.id_prefix)
+        if monitoring_features is not None:
+            query_params[QUERY_PARAM_MONITORING_FEATURES] = monitoring_features
 
         # Synthesize ObservedPropertyVariable (from BASIN-3D to DataSource variable name)
-        if QUERY_PARAM_OBSERVED_PROPERTY_VARIABLES in request.query_params:
-            observed_property_variables = request.query_params.get(QUERY_PARAM_OBSERVED_PROPERTY_VARIABLES, '').split(",")
-            query_params[QUERY_PARAM_OBSERVED_PROPERTY_VARIABLES] = plugin_view.get_observed_property_variables(
-                observed_property_variables, from_basin3d=True)
+        if plan.observed_property_variables is not None:
+            query_params[QUERY_PARAM_OBSERVED_PROPERTY_VARIABLES] = plan.datasource_variables(plugin_view.datasource)
         # Set the default Aggregation Duration
-        if QUERY_PARAM_AGGREGATION_DURATION not in request.query_params:
+        if QUERY_PARAM_AGGREGATION_DURATION not in query_params:
             query_params[
                 QUERY_PARAM_AGGREGATION_DURATION] = TimeMetadataMixin.AGGREGATION_DURATION_DAY
 
-        if QUERY_PARAM_RESULT_QUALITY in request.query_params:
-            query_params[
-                QUERY_PARAM_RESULT_QUALITY] = request.query_params[QUERY_PARAM_RESULT_QUALITY] in ["true", "True"]
+        if plan.result_quality is not None:
+            query_params[QUERY_PARAM_RESULT_QUALITY] = plan.result_quality
 
         return query_params
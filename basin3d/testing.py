@@ -0,0 +1,328 @@
+"""
+`basin3d.testing`
+*****************
+
+.. currentmodule:: basin3d.testing
+
+:platform: Unix, Mac
+:synopsis: BASIN-3D test support, a local stand-in for a data source API
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+.. contents:: Contents
+    :local:
+    :backlinks: top
+
+:class:`StubDataSourceServer` is a local HTTP server that stands in for a data source API,
+so that plugins and benchmarks run offline.  It has:
+
+    - *OAuth2 endpoints:* ``o/token/`` and ``o/revoke_token/`` as expected by
+      :class:`basin3d.plugins.HTTPOAuth2DataSource` (client credentials in the basic
+      authentication header)
+    - *JSON resources:* ``<resource>/`` lists the records of a resource in pages
+      (``?page=<n>&page_size=<n>``) as ``{"count": ..., "next": ..., "previous": ..., "results": [...]}``.
+      The other query parameters filter the records by field (e.g. ``?id=1,2``).
+
+The latency, jitter, error rate and rate limit of the server are attributes that may be
+changed while it runs::
+
+    with StubDataSourceServer(resources={"sites": sites}, latency=0.1, jitter=0.05) as server:
+        datasource.location = server.url
+        ...
+        server.error_rate = 0.5
+
+Run it standalone with ``manage.py stubserver``.
+
+"""
+import base64
+import json
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+#: The token path of :class:`basin3d.plugins.HTTPOAuth2DataSource`
+TOKEN_PATH = "o/token/"
+
+#: The revoke token path of :class:`basin3d.plugins.HTTPOAuth2DataSource`
+REVOKE_TOKEN_PATH = "o/revoke_token/"
+
+#: The pagination query parameters of the resources
+PAGE_PARAM = "page"
+PAGE_SIZE_PARAM = "page_size"
+
+
+class StubDataSourceServer(object):
+    """
+    A local HTTP server that stands in for a data source API
+
+    :param resources: the records of each resource, `{name: [dict, ...]}`
+    :param client_id: the OAuth2 client id
+    :param client_secret: the OAuth2 client secret
+    :param require_token: do the resources require an OAuth2 access token?
+    :param page_size: the default number of records of a page
+    :param latency: the seconds to wait before each response
+    :param jitter: the maximum seconds to add to or remove from the latency
+    :param error_rate: the fraction of the requests that fail
+    :param error_status: the HTTP status of the failed requests
+    :param rate_limit: the maximum number of requests a second (`None` for no limit).
+        The requests over the limit get `429 Too Many Requests`.
+    :param token_expires_in: the lifetime of the access tokens in seconds
+    :param host: the address to listen on
+    :param port: the port to listen on (`0` for any free port)
+    :param seed: the seed of the random jitter and errors
+    """
+
+    def __init__(self, resources=None, client_id="client", client_secret="secret", require_token=True,
+                 page_size=100, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, rate_limit=None,
+                 token_expires_in=36000, host="127.0.0.1", port=0, seed=None):
+        self.resources = dict(resources or {})
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.require_token = require_token
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.token_expires_in = token_expires_in
+        self.host = host
+        self.port = port
+
+        #: Counts of the requests (requests, tokens, revoked, errors, rate_limited, unauthorized)
+        self.stats = Counter()
+        self.tokens = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = (0, 0)  # (second, requests)
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        The base URL of the server, for :attr:`basin3d.models.DataSource.location`
+        """
+        return "http://{}:{}/".format(self.host, self.port)
+
+    def start(self):
+        """
+        Start the server in a daemon thread
+
+        :return: the server
+        """
+        handler = type("StubDataSourceHandler", (_StubDataSourceHandler,), {"stub": self})
+        self._server = _ThreadingHTTPServer((self.host, self.port), handler)
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-datasource", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the server
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def count(self, name):
+        """
+        Count a request in the :attr:`stats`
+        """
+        with self._lock:
+            self.stats[name] += 1
+
+    def issue_token(self):
+        """
+        Issue an access token
+
+        :return: the token response
+        :rtype: dict
+        """
+        access_token = secrets.token_hex(16)
+        with self._lock:
+            self.tokens[access_token] = time.time() + self.token_expires_in
+        self.count("tokens")
+        return {"access_token": access_token, "token_type": "Bearer", "expires_in": self.token_expires_in,
+                "refresh_token": secrets.token_hex(16), "scope": "read"}
+
+    def revoke_token(self, access_token):
+        """
+        Revoke an access token
+
+        :return: was the token revoked?
+        """
+        with self._lock:
+            revoked = self.tokens.pop(access_token, None) is not None
+        if revoked:
+            self.count("revoked")
+        return revoked
+
+    def is_valid_token(self, access_token):
+        """
+        Is the access token issued, not revoked and not expired?
+        """
+        with self._lock:
+            expires_at = self.tokens.get(access_token)
+        return expires_at is not None and expires_at > time.time()
+
+    def is_rate_limited(self):
+        """
+        Count a request, is it over the rate limit?
+        """
+        if not self.rate_limit:
+            return False
+        second = int(time.time())
+        with self._lock:
+            window_second, count = self._window
+            count = count + 1 if window_second == second else 1
+            self._window = (second, count)
+        return count > self.rate_limit
+
+    def delay(self):
+        """
+        The seconds to wait before a response
+        """
+        jitter = self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, self.latency + jitter)
+
+    def is_error(self):
+        """
+        Does the request fail?
+        """
+        return bool(self.error_rate) and self._random.random() < self.error_rate
+
+    def page(self, resource, query, base_url):
+        """
+        A page of the records of a resource
+
+        :param resource: the resource name
+        :param query: the query parameters, `{name: [value, ...]}`
+        :param base_url: the URL of the resource, for the next and previous links
+        :return: the page or `None` if there is no such resource
+        :raises ValueError: if the pagination parameters are invalid
+        """
+        records = self.resources.get(resource)
+        if records is None:
+            return None
+
+        page = int(query.get(PAGE_PARAM, ["1"])[0])
+        page_size = int(query.get(PAGE_SIZE_PARAM, [self.page_size])[0])
+        if page < 1 or page_size < 1:
+            raise ValueError("{} and {} must be at least 1".format(PAGE_PARAM, PAGE_SIZE_PARAM))
+
+        filters = {name: set(",".join(values).split(",")) for name, values in query.items()
+                   if name not in (PAGE_PARAM, PAGE_SIZE_PARAM)}
+        if filters:
+            records = [record for record in records
+                       if all(str(record.get(name)) in values for name, values in filters.items())]
+
+        def link(number):
+            params = [(name, ",".join(values)) for name, values in sorted(query.items()) if name != PAGE_PARAM]
+            return "{}?{}".format(base_url, urlencode(params + [(PAGE_PARAM, number)]))
+
+        start = (page - 1) * page_size
+        return {"count": len(records),
+                "next": link(page + 1) if start + page_size < len(records) else None,
+                "previous": link(page - 1) if page > 1 else None,
+                "results": records[start:start + page_size]}
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _StubDataSourceHandler(BaseHTTPRequestHandler):
+    """
+    Handles the requests of a :class:`StubDataSourceServer`
+    """
+    stub = None
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        stub = self.stub
+        stub.count("requests")
+        if stub.is_rate_limited():
+            stub.count("rate_limited")
+            return self._respond(429, {"error": "rate_limited"}, headers={"Retry-After": "1"})
+
+        delay = stub.delay()
+        if delay:
+            time.sleep(delay)
+        if stub.is_error():
+            stub.count("errors")
+            return self._respond(stub.error_status, {"error": "injected"})
+
+        parts = urlsplit(self.path)
+        path = parts.path.lstrip("/")
+        query = parse_qs(parts.query)
+        if path == TOKEN_PATH and self.command == "POST":
+            if not self._is_client():
+                stub.count("unauthorized")
+                return self._respond(401, {"error": "invalid_client"})
+            return self._respond(200, stub.issue_token())
+        if path == REVOKE_TOKEN_PATH and self.command == "POST":
+            if not self._is_client():
+                stub.count("unauthorized")
+                return self._respond(401, {"error": "invalid_client"})
+            stub.revoke_token(query.get("token", [""])[0])
+            return self._respond(200, {})
+
+        if stub.require_token and not self._has_token():
+            stub.count("unauthorized")
+            return self._respond(401, {"detail": "Authentication credentials were not provided."})
+        try:
+            page = stub.page(path.strip("/"), query, "{}{}".format(stub.url, parts.path.lstrip("/")))
+        except ValueError as e:
+            return self._respond(400, {"detail": str(e)})
+        if page is None:
+            return self._respond(404, {"detail": "Not found."})
+        return self._respond(200, page)
+
+    def _is_client(self):
+        authorization = self.headers.get("Authorization", "")
+        if not authorization.startswith("Basic "):
+            return False
+        try:
+            credentials = base64.b64decode(authorization[len("Basic "):]).decode("utf-8")
+        except ValueError:
+            return False
+        return credentials == "{}:{}".format(self.stub.client_id, self.stub.client_secret)
+
+    def _has_token(self):
+        authorization = self.headers.get("Authorization", "")
+        return authorization.startswith("Bearer ") and self.stub.is_valid_token(authorization[len("Bearer "):])
+
+    def _respond(self, status, data, headers=None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the test and benchmark output clean
+        pass
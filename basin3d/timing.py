@@ -0,0 +1,188 @@
+"""
+`basin3d.timing`
+****************
+
+.. currentmodule:: basin3d.timing
+
+:platform: Unix, Mac
+:synopsis: BASIN-3D per phase request timing (Server-Timing)
+:module author: Val Hendrix <vhendrix@lbl.gov>
+:module author: Danielle Svehla Christianson <dschristianson@lbl.gov>
+
+.. contents:: Contents
+    :local:
+    :backlinks: top
+
+:class:`ServerTimingMiddleware` times the phases of each request and sends them in a
+`Server-Timing <https://www.w3.org/TR/server-timing/>`_ response header, so that browser
+developer tools show where the time of a slow request goes:
+
+    - *plan:* parsing the query (See :class:`basin3d.synthesis.query.QueryPlan`)
+    - *synthesize.<data source>:* synthesizing the objects of a data source, from the plugin
+      call to the end of the synthesis pipeline (cache, resampling, ...)
+    - *fetch.<data source>:* the HTTP requests to the data source API
+    - *construct.<data source>:* the rest of the plugin view time, building the synthesis models
+    - *serialize:* serializing the synthesized objects
+    - *render:* rendering the response body
+    - *total:* the whole request
+
+Enable it in the ``MIDDLEWARE`` setting::
+
+    MIDDLEWARE = [
+        'basin3d.timing.ServerTimingMiddleware',
+        ...
+    ]
+
+When ``SERVER_TIMING_FOOTER`` is set in ``settings.BASIN3D``, requests with the
+``X-Debug-Timing`` header get their JSON responses wrapped with the timings:
+``{"data": <response>, "timing": [{"name": ..., "duration": ..., "description": ...}]}``.
+
+Timings are recorded for the thread of the request, so the work done in other threads
+(e.g. the queries of a batch) is only in the total.
+
+"""
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+#: Request header that asks for the debug JSON footer
+DEBUG_HEADER = "HTTP_X_DEBUG_TIMING"
+
+_context = threading.local()
+
+_NOT_TOKEN = re.compile(r"[^A-Za-z0-9!#$%&'*+\-.^_`|~]")
+
+
+class RequestTimings(object):
+    """
+    The phase timings of a request
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = OrderedDict()
+
+    def add(self, name, datasource, duration):
+        """
+        Add time to a phase
+
+        :param name: the phase name
+        :param datasource: the data source label (`None` for the phases of the whole request)
+        :param duration: the duration in seconds
+        """
+        key = (name, datasource)
+        self.phases[key] = self.phases.get(key, 0.0) + duration
+
+    def entries(self):
+        """
+        The timings of the phases. The plugin view time of each data source is split
+        into the fetch time and the construct time.
+
+        :return: list of `(name, duration in milliseconds, description)`
+        """
+        fetch = {datasource: duration for (name, datasource), duration in self.phases.items() if name == "fetch"}
+        entries = []
+        for (name, datasource), duration in self.phases.items():
+            if name == "plugin":
+                name, duration = "construct", max(0.0, duration - fetch.get(datasource, 0.0))
+            if datasource is None:
+                entries.append((name, duration * 1000, name))
+            else:
+                entries.append(("{}.{}".format(name, _NOT_TOKEN.sub("_", str(datasource))), duration * 1000,
+                                "{} {}".format(name, datasource)))
+        entries.append(("total", (time.perf_counter() - self.start) * 1000, "total"))
+        return entries
+
+    def header(self):
+        """
+        The `Server-Timing` header value
+
+        :rtype: str
+        """
+        return ", ".join('{};dur={:.1f};desc="{}"'.format(name, duration, description.replace('"', "'"))
+                         for name, duration, description in self.entries())
+
+
+def current():
+    """
+    The timings of the request of this thread
+
+    :return: the timings or `None` if the request is not timed
+    :rtype: :class:`RequestTimings`
+    """
+    return getattr(_context, "timings", None)
+
+
+def add(name, datasource, duration):
+    """
+    Add time to a phase of the request of this thread, if it is timed
+
+    :param name: the phase name
+    :param datasource: the data source label (`None` for the phases of the whole request)
+    :param duration: the duration in seconds
+    """
+    timings = getattr(_context, "timings", None)
+    if timings is not None:
+        timings.add(name, datasource, duration)
+
+
+@contextmanager
+def phase(name, datasource=None):
+    """
+    Time the block as a phase of the request of this thread
+
+    :param name: the phase name
+    :param datasource: the data source label (`None` for the phases of the whole request)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, datasource, time.perf_counter() - start)
+
+
+class ServerTimingMiddleware(object):
+    """
+    Times the phases of the requests and sends them in the `Server-Timing` header
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = _context.timings = RequestTimings()
+        try:
+            response = self.get_response(request)
+        finally:
+            _context.timings = None
+
+        response["Server-Timing"] = timings.header()
+        if DEBUG_HEADER in request.META and _footer_enabled() and not response.streaming and \
+                response.get("Content-Type", "").startswith("application/json"):
+            response.content = json.dumps(OrderedDict([
+                ("data", json.loads(response.content.decode(response.charset))),
+                ("timing", [OrderedDict([("name", name), ("duration", round(duration, 3)),
+                                         ("description", description)])
+                            for name, duration, description in timings.entries()])]))
+            if response.has_header("Content-Length"):
+                # The inner middleware measured the body before it was wrapped
+                response["Content-Length"] = str(len(response.content))
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Time the rendering of the response
+        """
+        timings = current()
+        if timings is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(lambda r: timings.add("render", None, time.perf_counter() - start))
+        return response
+
+
+def _footer_enabled():
+    from django.conf import settings
+    return settings.BASIN3D.get("SERVER_TIMING_FOOTER", False)
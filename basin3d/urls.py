@@ -17,7 +17,8 @@ Including another URLconf
 from basin3d.models import DataSource, get_feature_types
 from basin3d.synthesis.viewsets import MonitoringFeatureViewSet, \
     MeasurementTimeseriesTVPObservationViewSet
-from basin3d.views import broker_api_root, monitoring_features_lists
+from basin3d.views import broker_api_root, metrics, monitoring_features_catalog, monitoring_features_lists, \
+    synthesis_batch
 from basin3d.viewsets import DataSourceViewSet, DirectAPIViewSet, \
     ObservedPropertyViewSet, ObservedPropertyVariableViewSet
 from django.conf import settings
@@ -116,7 +117,9 @@ def get_monitoring_feature_urls():
 # Additionally, we include login URLs for the browsable API.
 urlpatterns = [
     url(r'^$', broker_api_root, name='broker-api-root'),
-    url(r'^synthesis/monitoringfeatures/$', monitoring_features_lists, name='monitoring-features-list')
+    url(r'^synthesis/monitoringfeatures/$', monitoring_features_lists, name='monitoring-features-list'),
+    url(r'^synthesis/monitoringfeatures/catalog/$', monitoring_features_catalog, name='monitoring-features-catalog'),
+    url(r'^synthesis/batch/$', synthesis_batch, name='synthesis-batch')
 ]
 
 urlpatterns.extend(get_monitoring_feature_urls())
@@ -125,6 +128,9 @@ router = get_synthesis_router()
 if settings.BASIN3D["SYNTHESIS"]:
     urlpatterns.append(url(r'^synthesis/', include(router.urls)))
 
+if settings.BASIN3D.get("METRICS_ENABLED", False):
+    urlpatterns.append(url(r'^metrics/?$', metrics, name='metrics'))
+
 if settings.BASIN3D["DIRECT_API"]:
     urlpatterns.append(url(r'^direct/$', DirectAPIViewSet.as_view({'get': 'list'}), name='direct-api-list'))
     urlpatterns.append(url(r'^direct/(?P<id_prefix>[a-zA-Z0-9]+)/(?P<direct_path>[a-zA-Z/_\-?&0-9]*)$',
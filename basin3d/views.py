@@ -17,8 +17,16 @@ from collections import OrderedDict
 import logging
 import sys
 
-from basin3d.models import DataSource, get_feature_types
+from basin3d.metrics import metrics as datasource_metrics
+from basin3d.models import DataSource, FeatureTypes, get_feature_types
+from basin3d.synthesis.batch import parse_batch, run_batch
+from basin3d.synthesis.catalog import catalog, get_refresh_interval
+from basin3d.synthesis.query import QUERY_PARAM_ANCESTOR, QUERY_PARAM_DESCENDANTS_OF
+from basin3d.synthesis.viewsets import MonitoringFeatureViewSet
 from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.reverse import reverse, NoReverseMatch
@@ -67,8 +75,13 @@ def broker_api_root(request, format=None):
 @api_view(['GET'])
 def monitoring_features_lists(request, format=format):
     """
-    Generate list of URLs to views for monitoring features based on availability in datasource
+    Generate list of URLs to views for monitoring features based on availability in datasource.
+    Requests with a hierarchy filter (e.g. `?descendants_of=A-1&feature_type=POINT`) list the
+    monitoring features of all types.
     """
+    if QUERY_PARAM_ANCESTOR in request.query_params or QUERY_PARAM_DESCENDANTS_OF in request.query_params:
+        return MonitoringFeatureViewSet.as_view({'get': 'list'})(request._request)
+
     monitoring_features_list = {}
     supported_feature_types = get_feature_types()
     for datasource in DataSource.objects.all():
@@ -97,3 +110,46 @@ def monitoring_features_lists(request, format=format):
                 logger.warning("{} are not supported FeatureTypes in {}.".format(", ".join(unsupported_feature_types), datasource.name))
 
     return Response(monitoring_features_list)
+
+
+@api_view(['GET'])
+def monitoring_features_catalog(request, format=None):
+    """
+    List the monitoring feature catalog snapshots with their age and refresh duration (seconds)
+    """
+    refresh_interval = get_refresh_interval()
+    snapshots = []
+    for snapshot in sorted(catalog.snapshots(), key=lambda s: (s.datasource.id_prefix, str(s.feature_type))):
+        snapshots.append(OrderedDict([
+            ('datasource', snapshot.datasource.id_prefix),
+            ('feature_type', FeatureTypes.TYPES.get(snapshot.feature_type)),
+            ('count', len(snapshot.features)),
+            ('age', snapshot.age),
+            ('refresh_duration', snapshot.refresh_duration),
+            ('stale', snapshot.is_stale(refresh_interval))
+        ]))
+
+    return Response(snapshots)
+
+
+@api_view(['POST'])
+def synthesis_batch(request, format=None):
+    """
+    Run a batch of synthesis queries and return their results keyed by query id
+    (See :mod:`basin3d.synthesis.batch`)
+    """
+    try:
+        queries = parse_batch(request.data)
+    except ValueError as e:
+        return Response({'success': False, 'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(run_batch(queries, request))
+
+
+@require_GET
+def metrics(request):
+    """
+    The data source latency and throughput metrics in the Prometheus text format
+    (See :mod:`basin3d.metrics`)
+    """
+    return HttpResponse(datasource_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
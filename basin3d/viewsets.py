@@ -26,6 +26,7 @@ import logging
 
 import django_filters
 from basin3d import get_url
+from basin3d.conditional import catalog_version, conditional_response, make_etag, request_variant
 from basin3d.models import DataSource, ObservedProperty, ObservedPropertyVariable, \
     DataSourceObservedPropertyVariable
 from basin3d.serializers import DataSourceSerializer, \
@@ -96,7 +97,24 @@ class DirectAPIViewSet(viewsets.GenericViewSet):
         return Response(status=status.HTTP_404_NOT_FOUND)
 
 
-class DataSourceViewSet(viewsets.ReadOnlyModelViewSet):
+class CatalogConditionalMixin(object):
+    """
+    Adds strong ETags, computed from the catalog version, to the list and detail
+    responses.  Clients with a current ETag receive `304 Not Modified`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(request,
+                                    lambda: super(CatalogConditionalMixin, self).list(request, *args, **kwargs),
+                                    etag=make_etag(request_variant(request), catalog_version()))
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(request,
+                                    lambda: super(CatalogConditionalMixin, self).retrieve(request, *args, **kwargs),
+                                    etag=make_etag(request_variant(request), catalog_version()))
+
+
+class DataSourceViewSet(CatalogConditionalMixin, viewsets.ReadOnlyModelViewSet):
     """
         Returns a list of all Data Sources available to the BASIN-3D service
 
@@ -188,7 +206,7 @@ class DataSourceViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class ObservedPropertyVariableViewSet(viewsets.ReadOnlyModelViewSet):
+class ObservedPropertyVariableViewSet(CatalogConditionalMixin, viewsets.ReadOnlyModelViewSet):
     """
         Returns a list of available Observed Property Variables. A observed property variable defines what is
         being measured. See http://vocabulary.odm2.org/variablename/ for controlled vocabulary.
@@ -198,6 +216,7 @@ class ObservedPropertyVariableViewSet(viewsets.ReadOnlyModelViewSet):
         * *id:* string, Unique observed property variable identifier
         * *full_name:* string, Descriptive name
         * *categories:* list of strings, Categories of which the variable is a member, listed in hierarchical order
+        * *units:* string, Canonical unit of measurement of the variable
         * *datasources:* url, Retrieves the datasources that define the current variable
         * *url:* url, Endpoint for the observed property variable
 
@@ -232,7 +251,7 @@ class ObservedPropertyVariableViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class ObservedPropertyViewSet(viewsets.ReadOnlyModelViewSet):
+class ObservedPropertyViewSet(CatalogConditionalMixin, viewsets.ReadOnlyModelViewSet):
     """
         Returns a list of available Observation Properties
 
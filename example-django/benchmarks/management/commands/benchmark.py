@@ -0,0 +1,102 @@
+from collections import OrderedDict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from basin3d.management.benchmark import Scenario, environment, get_client, run_scenario, write_report
+from basin3d.models import DataSource
+from basin3d.synthesis.query import QUERY_PARAM_MONITORING_FEATURES, QUERY_PARAM_OBSERVED_PROPERTY_VARIABLES, \
+    QUERY_PARAM_START_DATE
+from benchmarks import plugins
+
+SCENARIOS = ("list_monitoring_features", "retrieve_monitoring_feature", "list_timeseries", "retrieve_timeseries")
+
+
+def get_scenarios(id_prefix, sizes, requests):
+    """
+    The benchmark scenarios for the synthetic data source
+
+    :param id_prefix: the id prefix of the synthetic data source
+    :param sizes: the sizes of the synthetic data source
+    :param requests: the number of requests of each scenario
+    :return: the scenarios by name
+    """
+    features = range(1, min(sizes["features"], requests) + 1)
+    series = range(1, min(sizes["series"], requests) + 1)
+    series_features = range(1, min(sizes["features"], sizes["series"]) + 1)
+    return OrderedDict([
+        ("list_monitoring_features", Scenario(
+            "list_monitoring_features", ["/synthesis/monitoringfeatures/points/?datasource={}".format(id_prefix)])),
+        ("retrieve_monitoring_feature", Scenario(
+            "retrieve_monitoring_feature",
+            ["/synthesis/monitoringfeatures/points/{}-{}/".format(id_prefix, n) for n in features])),
+        ("list_timeseries", Scenario(
+            "list_timeseries",
+            ["/synthesis/measurement_tvp_timeseries/?{}={}&{}={}&{}={:%Y-%m-%d}".format(
+                QUERY_PARAM_MONITORING_FEATURES, ",".join("{}-{}".format(id_prefix, n) for n in series_features),
+                QUERY_PARAM_OBSERVED_PROPERTY_VARIABLES,
+                plugins.VARIABLE, QUERY_PARAM_START_DATE, plugins.START)])),
+        ("retrieve_timeseries", Scenario(
+            "retrieve_timeseries",
+            ["/synthesis/measurement_tvp_timeseries/{}-{}/".format(id_prefix, n) for n in series])),
+    ])
+
+
+class Command(BaseCommand):
+    help = """Benchmark the REST API with the synthetic data source of the benchmarks app."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--features', type=int, default=100,
+                            help="Number of synthetic monitoring features (default: 100)")
+        parser.add_argument('--series', type=int, default=10,
+                            help="Number of synthetic timeseries (default: 10)")
+        parser.add_argument('--points', type=int, default=1000,
+                            help="Number of time value pairs of each timeseries (default: 1000)")
+        parser.add_argument('--requests', type=int, default=20,
+                            help="Number of requests of each scenario (default: 20)")
+        parser.add_argument('--warmup', type=int, default=1,
+                            help="Number of requests to send before measuring each scenario (default: 1)")
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                            help="Scenario to run, may be repeated (default: all)")
+        parser.add_argument('--no-memory', action='store_true',
+                            help="Do not measure the peak memory of the scenarios")
+        parser.add_argument('--output', help="File to write the JSON report to")
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError("--requests must be at least 1")
+        try:
+            plugins.configure(features=options['features'], series=options['series'], points=options['points'])
+        except ValueError as e:
+            raise CommandError("--{}".format(e))
+
+        try:
+            datasource = DataSource.objects.get(name=plugins.SyntheticSourcePlugin.get_meta().id)
+        except DataSource.DoesNotExist:
+            raise CommandError("The synthetic data source is not registered. "
+                               "Run migrate with the benchmarks.settings settings module.")
+
+        scenarios = get_scenarios(datasource.id_prefix, plugins.sizes, options['requests'])
+        client = get_client()
+        results = []
+        self.stdout.write("{:<28} {:>8} {:>8} {:>10} {:>10} {:>10} {:>10} {:>10} {:>12}".format(
+            "scenario", "requests", "errors", "req/s", "objects/s", "p50(ms)", "p90(ms)", "p99(ms)", "peak(KiB)"))
+        for name in options['scenario'] or SCENARIOS:
+            result = run_scenario(client, scenarios[name], requests=options['requests'], warmup=options['warmup'],
+                                  memory=not options['no_memory'])
+            results.append(result)
+            latency = result["latency_ms"]
+            peak = result["peak_memory_bytes"]
+            self.stdout.write("{:<28} {:>8} {:>8} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f} {:>12}".format(
+                name, result["requests"], result["errors"], result["requests_per_second"],
+                result["objects_per_second"], latency["p50"], latency["p90"], latency["p99"],
+                "-" if peak is None else "{:.1f}".format(peak / 1024)))
+
+        if options['output']:
+            write_report(OrderedDict([
+                ("environment", environment()),
+                ("sizes", OrderedDict((key, plugins.sizes[key]) for key in ("features", "series", "points"))),
+                ("requests", options['requests']),
+                ("warmup", options['warmup']),
+                ("scenarios", results),
+            ]), options['output'])
+            self.stdout.write(self.style.SUCCESS("Wrote the report to {}".format(options['output'])))
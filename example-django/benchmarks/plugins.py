@@ -0,0 +1,172 @@
+"""
+A synthetic data source for the benchmarks. It generates its monitoring features and
+timeseries instead of requesting them from a data source API, so the benchmarks measure
+BASIN-3D and not the network.
+
+The sizes are set with :func:`configure`:
+
+    - *features:* the number of monitoring features (points)
+    - *series:* the number of timeseries, spread over the monitoring features
+    - *points:* the number of hourly time value pairs of each timeseries
+"""
+import logging
+from datetime import datetime, timedelta
+
+from basin3d.models import FeatureTypes, SpatialSamplingShapes
+from basin3d.plugins import DataSourcePluginPoint, DataSourcePluginViewMeta
+from basin3d.synthesis.models.field import MonitoringFeature, RelatedSamplingFeature, \
+    GeographicCoordinate, AltitudeCoordinate, Coordinate, AbsoluteCoordinate, VerticalCoordinate
+from basin3d.synthesis.models.measurement import MeasurementTimeseriesTVPObservation
+from django.utils.six import with_metaclass
+
+logger = logging.getLogger(__name__)
+
+#: The start of the timeseries
+START = datetime(2000, 1, 1)
+
+#: The observed property variable of the timeseries
+VARIABLE = "ACT"
+
+sizes = {"features": 100, "series": 10, "points": 1000}
+
+
+def configure(features=None, series=None, points=None):
+    """
+    Set the sizes of the synthetic data source
+
+    :param features: the number of monitoring features
+    :param series: the number of timeseries
+    :param points: the number of time value pairs of each timeseries
+    """
+    for name, value in (("features", features), ("series", series), ("points", points)):
+        if value is not None:
+            if value < 1:
+                raise ValueError("{} must be at least 1".format(name))
+            sizes[name] = value
+
+
+def _requested_ids(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    return set(str(v) for v in value)
+
+
+class SyntheticMonitoringFeatureView(with_metaclass(DataSourcePluginViewMeta)):
+    synthesis_model_class = MonitoringFeature
+
+    def feature(self, number):
+        """
+        The synthetic monitoring feature with the number
+        """
+        return self.synthesis_model_class(
+            datasource=self.datasource,
+            id=str(number),
+            name="Synthetic Point {}".format(number),
+            description="A synthetic point.",
+            feature_type=FeatureTypes.POINT,
+            shape=SpatialSamplingShapes.SHAPE_POINT,
+            coordinates=Coordinate(
+                absolute=AbsoluteCoordinate(
+                    horizontal_position=GeographicCoordinate(
+                        units=GeographicCoordinate.UNITS_DEC_DEGREES,
+                        latitude=38.0 + (number % 1000) * 0.001, longitude=-107.0 - (number // 1000) * 0.001),
+                    vertical_extent=AltitudeCoordinate(
+                        datum=AltitudeCoordinate.DATUM_NAVD88,
+                        value=2900 + number % 100,
+                        distance_units=VerticalCoordinate.DISTANCE_UNITS_METERS))),
+            observed_property_variables=[VARIABLE],
+            related_sampling_feature_complex=[
+                RelatedSamplingFeature(datasource=self.datasource,
+                                       related_sampling_feature="Region1",
+                                       related_sampling_feature_type=FeatureTypes.REGION,
+                                       role=RelatedSamplingFeature.ROLE_PARENT)]
+        )
+
+    def list(self, request, **kwargs):
+        """
+        Generate the monitoring features
+        """
+        for number in range(1, sizes["features"] + 1):
+            yield self.feature(number)
+
+    def get(self, request, pk=None):
+        """
+        Get a monitoring feature
+        :param pk: primary key
+        """
+        try:
+            number = int(pk)
+        except (TypeError, ValueError):
+            return None
+        if 1 <= number <= sizes["features"]:
+            return self.feature(number)
+        return None
+
+
+class SyntheticDataMeasurementTimeseriesTVPObservationView(with_metaclass(DataSourcePluginViewMeta)):
+    synthesis_model_class = MeasurementTimeseriesTVPObservation
+
+    def series(self, number, observed_property):
+        """
+        The synthetic timeseries with the number
+        """
+        feature = (number - 1) % sizes["features"] + 1
+        return MeasurementTimeseriesTVPObservation(
+            self.datasource,
+            id=str(number),
+            observed_property=observed_property,
+            utc_offset=-7,
+            feature_of_interest=SyntheticMonitoringFeatureView(self.datasource).feature(feature),
+            feature_of_interest_type=FeatureTypes.POINT,
+            unit_of_measurement="mg/L",
+            aggregation_duration="HOUR",
+            result_quality="CHECKED",
+            time_reference_position=None,
+            statistic="MEAN",
+            result_points=[(START + timedelta(hours=hour), (number + hour) % 100 * 0.25)
+                           for hour in range(sizes["points"])]
+        )
+
+    def observed_property(self):
+        observed_property = self.get_observed_property(VARIABLE)
+        return observed_property.id if observed_property else None
+
+    def list(self, request, **kwargs):
+        """
+        Generate the timeseries of the requested monitoring features
+        """
+        monitoring_features = _requested_ids(kwargs.get("monitoring_features"))
+        observed_property = self.observed_property()
+        for number in range(1, sizes["series"] + 1):
+            feature = (number - 1) % sizes["features"] + 1
+            if monitoring_features is None or str(feature) in monitoring_features:
+                yield self.series(number, observed_property)
+
+    def get(self, request, pk=None):
+        """
+        Get a timeseries
+        :param pk: primary key
+        """
+        try:
+            number = int(pk)
+        except (TypeError, ValueError):
+            return None
+        if 1 <= number <= sizes["series"]:
+            return self.series(number, self.observed_property())
+        return None
+
+
+class SyntheticSourcePlugin(DataSourcePluginPoint):
+    name = 'synthetic-source-plugin'
+    title = 'Synthetic Source Plugin'
+    plugin_view_classes = (SyntheticDataMeasurementTimeseriesTVPObservationView, SyntheticMonitoringFeatureView)
+    feature_types = ['POINT']
+
+    class DataSourceMeta:
+        # Data Source attributes
+        location = 'https://synthetic.invalid/'
+        id = 'Synthetic'  # unique id for the datasource
+        id_prefix = 'S'
+        name = id  # Human Friendly Data Source Name
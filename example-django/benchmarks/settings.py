@@ -0,0 +1,26 @@
+"""
+Django settings for the BASIN-3D benchmarks.
+
+The benchmarks add the synthetic data source (See :mod:`benchmarks.plugins`) to the
+mybroker example and use their own database::
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings python manage.py migrate
+    DJANGO_SETTINGS_MODULE=benchmarks.settings python manage.py benchmark --output report.json
+"""
+from mybroker.settings import *  # noqa: F401,F403
+from mybroker.settings import BASE_DIR, INSTALLED_APPS
+
+import os
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['localhost']
+
+INSTALLED_APPS = INSTALLED_APPS + ['benchmarks']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'benchmark.sqlite3'),
+    }
+}
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'basin3d.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -147,4 +148,5 @@ REST_FRAMEWORK = {
 BASIN3D = {
     'SYNTHESIS': True,  # Turn on/off synthesis API
     'DIRECT_API': True,  # Turn on/off direct API
+    'METRICS_ENABLED': True,  # Expose the data source metrics at /metrics
 }
\ No newline at end of file
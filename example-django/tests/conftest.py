@@ -2,6 +2,7 @@ import os
 import sys
 
 import django
+import pytest
 
 configured = False
 
@@ -16,3 +17,13 @@ def configure():
 
 
 configure()
+
+
+@pytest.fixture
+def memory_profile():
+    """
+    Profile the memory of the requests of the test (See :mod:`basin3d.profiling`)
+    """
+    from basin3d.profiling import MemoryProfile
+    with MemoryProfile() as profile:
+        yield profile
@@ -0,0 +1,97 @@
+import json
+from datetime import date, datetime
+from unittest import mock
+
+from basin3d.synthesis.align import Alignment, align_points, column_names, interpolate
+from basin3d.synthesis.query import QueryPlan, synthesis_request
+from django.test import TestCase
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class AlignTest(TestCase):
+    """
+    Test the timeseries alignment
+    """
+
+    def test_alignment(self):
+        plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/?align=linear"))
+        self.assertEqual(Alignment.from_query_plan(plan), Alignment("LINEAR"))
+        plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/"))
+        self.assertIsNone(Alignment.from_query_plan(plan))
+        plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/?align=nearest"))
+        self.assertRaises(ValueError, Alignment.from_query_plan, plan)
+
+    def test_align_points(self):
+        timestamps, moments, columns = align_points([
+            [(date(2016, 2, 1), 1.0), (date(2016, 2, 3), 3.0), (date(2016, 2, 3), 30.0)],
+            [(date(2016, 2, 4), 4.0), (date(2016, 2, 2), 2.0)],
+            []])
+        self.assertEqual(timestamps, [date(2016, 2, n) for n in range(1, 5)])
+        self.assertEqual(moments, [datetime(2016, 2, n) for n in range(1, 5)])
+        self.assertEqual(columns, [[1.0, None, 3.0, None], [None, 2.0, None, 4.0], [None] * 4])
+
+    def test_interpolate(self):
+        moments = [datetime(2016, 2, 1), datetime(2016, 2, 2), datetime(2016, 2, 4), datetime(2016, 2, 5),
+                   datetime(2016, 2, 6)]
+        self.assertEqual(interpolate(moments, [None, 1.0, None, 4.0, None]), [None, 1.0, 3.0, 4.0, None])
+
+    def test_column_names(self):
+        observations = [mock.Mock(id="A-1"), mock.Mock(id=None), mock.Mock(id="A-1"), mock.Mock(id="timestamp")]
+        self.assertEqual(column_names(observations), ["A-1", "series2", "A-1_2", "timestamp_2"])
+
+
+class TestAlignAPI(TestCase):
+    """
+    Test /synthesis/measurement_tvp_timeseries api alignment
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        plugin_list = AlphaDataMeasurementTimeseriesTVPObservationView.list
+
+        def shifted(view, request, **kwargs):
+            for observation in plugin_list(view, request, **kwargs):
+                if observation.id == "A-2":
+                    observation.result_points = [(date(2016, 2, n), n) for n in range(5, 12, 2)]
+                yield observation
+
+        patcher = mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list", shifted)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1,A-2'
+                                   '&start_date=2016-02-01&align=null', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        table = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(table["columns"], ["timestamp", "A-1", "A-2"])
+        self.assertEqual([s["column"] for s in table["series"]], ["A-1", "A-2"])
+        self.assertEqual(table["series"][0]["unit_of_measurement"], "nm")
+        self.assertEqual(len(table["data"]["timestamp"]), 10)
+        self.assertEqual(table["data"]["timestamp"][0], "2016-02-01")
+        self.assertEqual(table["data"]["A-2"][:7], [None, None, None, None, 5, None, 7])
+        self.assertEqual(table["data"]["A-1"][8:], [9 * 0.3454, None])
+
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1,A-2'
+                                   '&start_date=2016-02-01&align=linear', format='json')
+        table = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(table["data"]["A-2"][:7], [None, None, None, None, 5, 6, 7])
+        self.assertEqual(table["data"]["A-2"][-1], 11)
+
+    def test_csv(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1,A-2'
+                                   '&start_date=2016-02-01&align=null&format=csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        lines = response.content.decode('utf-8').splitlines()
+        self.assertEqual(lines[0], "timestamp,A-1,A-2")
+        self.assertEqual(lines[1], "2016-02-01,0.3454,")
+        self.assertEqual(len(lines), 11)
+
+    def test_invalid(self):
+        for query in ["align=nearest", "align=null&limit=10", "format=csv"]:
+            response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                       '&start_date=2016-02-01&{}'.format(query))
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,81 @@
+import json
+from unittest import mock
+
+from basin3d.synthesis.batch import BatchQuery, SharedWork, parse_batch
+from django.test import TestCase
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class ParseBatchTest(TestCase):
+    """
+    Test the batch query specifications
+    """
+
+    def test_parse(self):
+        queries = parse_batch([{"id": 1, "path": "/synthesis/measurement_tvp_timeseries/?start_date=2016-02-01",
+                                "params": {"monitoring_features": ["A-1", "A-2"], "result_quality": True}},
+                               {"id": "points", "path": "/synthesis/monitoringfeatures/points/"}])
+        self.assertEqual(queries, [
+            BatchQuery("1", "/synthesis/measurement_tvp_timeseries/",
+                       "monitoring_features=A-1%2CA-2&result_quality=true&start_date=2016-02-01"),
+            BatchQuery("points", "/synthesis/monitoringfeatures/points/", "")])
+        self.assertEqual(queries[1].url, "/synthesis/monitoringfeatures/points/")
+
+    def test_invalid(self):
+        for data in [{}, [], [{"id": "a"}], [{"path": "/synthesis/datasources/"}],
+                     [{"id": "a", "path": "/admin/"}],
+                     [{"id": "a", "path": "/synthesis/datasources/", "params": {"x": {"y": 1}}}],
+                     [{"id": "a", "path": "/synthesis/datasources/"}, {"id": "a", "path": "/synthesis/datasources/"}]]:
+            self.assertRaises(ValueError, parse_batch, data)
+
+    def test_shared_work(self):
+        shared_work = SharedWork()
+        self.assertEqual(shared_work.run("key", lambda: [1]), [1])
+        self.assertEqual(shared_work.run("key", lambda: [2]), [1])
+
+
+class TestBatchAPI(TestCase):
+    """
+    Test /synthesis/batch
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_post(self):
+        plugin_list = AlphaDataMeasurementTimeseriesTVPObservationView.list
+        calls = []
+
+        def counted(view, request, **kwargs):
+            calls.append(kwargs)
+            return plugin_list(view, request, **kwargs)
+
+        timeseries = "/synthesis/measurement_tvp_timeseries/"
+        batch = [{"id": "a", "path": timeseries, "params": {"monitoring_features": "A-1",
+                                                            "start_date": "2016-02-01"}},
+                 {"id": "b", "path": timeseries + "?start_date=2016-02-01&monitoring_features=A-1"},
+                 {"id": "c", "path": timeseries, "params": {"monitoring_features": ["A-1", "B-9"],
+                                                            "start_date": "2016-02-01"}},
+                 {"id": "points", "path": "/synthesis/monitoringfeatures/points/"},
+                 {"id": "missing", "path": "/synthesis/missing/"}]
+        with mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list", counted):
+            response = self.client.post('/synthesis/batch/', batch, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(list(results.keys()), ["a", "b", "c", "points", "missing"])
+        self.assertEqual([r["status"] for r in results.values()], [200, 200, 200, 200, 404])
+        self.assertEqual([o["id"] for o in results["a"]["data"]], ["A-1", "A-2"])
+        self.assertEqual(results["a"], results["c"])
+        self.assertEqual(len(results["points"]["data"]), 2)
+
+        # The three timeseries queries have the same parameters for data source A
+        self.assertEqual(len(calls), 1)
+
+    def test_invalid(self):
+        response = self.client.post('/synthesis/batch/', {"id": "a"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/synthesis/batch/', [{"id": "a", "path": "/synthesis/batch/"}], format='json')
+        self.assertEqual(json.loads(response.content.decode('utf-8'))["a"]["status"], 404)
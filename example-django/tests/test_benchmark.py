@@ -0,0 +1,43 @@
+from basin3d.management.benchmark import Scenario, count_objects, percentile, run_scenario
+from basin3d.synthesis.query import QUERY_PARAM_MONITORING_FEATURES
+from django.test import Client, TestCase
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView  # noqa: F401
+
+
+class BenchmarkTest(TestCase):
+    """
+    Test the benchmark measurements
+    """
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile(values, 1.0), 100)
+        self.assertEqual(percentile([3], 0.9), 3)
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_count_objects(self):
+        self.assertEqual(count_objects([{}, {}]), 2)
+        self.assertEqual(count_objects({"next": None, "results": [{}, {}, {}]}), 3)
+        self.assertEqual(count_objects({"columns": [], "series": [{}], "data": {}}), 1)
+        self.assertEqual(count_objects({"id": "A-1"}), 1)
+
+    def test_run_scenario(self):
+        scenario = Scenario("timeseries", ['/synthesis/measurement_tvp_timeseries/?{}=A-1&start_date=2016-02-01'
+                                           .format(QUERY_PARAM_MONITORING_FEATURES),
+                                           '/synthesis/measurement_tvp_timeseries/A-1/'])
+        result = run_scenario(Client(), scenario, requests=5, warmup=1)
+        self.assertEqual(result["name"], "timeseries")
+        self.assertEqual(result["requests"], 5)
+        self.assertEqual(result["errors"], 0)
+        self.assertEqual(result["objects"], 2 * 3 + 2)
+        latency = result["latency_ms"]
+        self.assertTrue(latency["min"] <= latency["p50"] <= latency["p90"] <= latency["max"])
+        self.assertGreater(result["peak_memory_bytes"], 0)
+
+        result = run_scenario(Client(), Scenario("missing", ['/synthesis/measurement_tvp_timeseries/A-9/']),
+                              memory=False)
+        self.assertEqual(result["requests"], 1)
+        self.assertEqual(result["errors"], 1)
+        self.assertIsNone(result["peak_memory_bytes"])
@@ -0,0 +1,144 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
+
+from basin3d.models import DataSource
+from basin3d.synthesis.cache import TimeseriesCache, cache_key, in_range
+from basin3d.synthesis.models.measurement import MeasurementTimeseriesTVPObservation
+from django.test import TestCase, override_settings
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class TimeseriesCacheTest(TestCase):
+    """
+    Test the disk-backed timeseries cache
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = TimeseriesCache(os.path.join(self.cache_dir, "timeseries.sqlite3"))
+        self.datasource = DataSource.objects.get(name="Alpha")
+        self.plugin_view = AlphaDataMeasurementTimeseriesTVPObservationView(self.datasource)
+        self.key = cache_key(MeasurementTimeseriesTVPObservation, self.datasource,
+                             {"monitoring_features": ["1", "2"], "aggregation_duration": "DAY"})
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_cache_key(self):
+        """The date range and output parameters are not part of the key"""
+        self.assertEqual(self.key, cache_key(MeasurementTimeseriesTVPObservation, self.datasource,
+                                             {"monitoring_features": ["2", "1"], "aggregation_duration": "DAY",
+                                              "start_date": "2016-01-01", "format": "json", "units": "canonical",
+                                              "tz": "UTC", "max_points": "10", "merge": "true"}))
+        self.assertNotEqual(self.key, cache_key(MeasurementTimeseriesTVPObservation, self.datasource,
+                                                {"monitoring_features": ["1"], "aggregation_duration": "DAY"}))
+
+    def test_in_range(self):
+        self.assertTrue(in_range("2016-02-09T12:00:00", "2016-02-01", "2016-02-09"))
+        self.assertFalse(in_range("2016-02-10", "2016-02-01", "2016-02-09"))
+        self.assertFalse(in_range("2016-01-31", "2016-02-01", None))
+
+    def test_get_put(self):
+        self.assertIsNone(self.cache.get(self.key, "2016-01-01", "2016-12-31"))
+
+        self.cache.put(self.key, self.datasource, list(self.plugin_view.list(None)), "2016-01-01", "2016-12-31")
+        observations = self.cache.get(self.key, "2016-01-01", "2016-12-31")
+        self.assertEqual([o.id for o in observations], ["A-1", "A-2"])
+        self.assertEqual(observations[0].datasource, self.datasource)
+        self.assertEqual(observations[0].feature_of_interest.id, "A-1")
+        self.assertEqual(observations[0].result_points[0], (date(2016, 2, 1), 0.3454))
+        self.assertEqual(len(observations[0].result_points), 9)
+
+        # A range inside the cached range is read from the cache
+        observations = self.cache.get(self.key, "2016-02-03", "2016-02-04")
+        self.assertEqual(observations[1].result_points, [(date(2016, 2, 3), 1.0362), (date(2016, 2, 4), 1.3816)])
+
+        # Ranges outside of the cached range are a miss
+        self.assertIsNone(self.cache.get(self.key, "2015-01-01", "2016-02-04"))
+        self.assertIsNone(self.cache.get(self.key, "2016-01-01", None))
+
+    def test_max_age(self):
+        """The entries of ranges that reach the current date expire"""
+        today = date.today().isoformat()
+        observations = list(self.plugin_view.list(None))
+        self.cache.put(self.key, self.datasource, observations, "2016-01-01", "2016-12-31")
+        self.cache.put(self.key, self.datasource, observations, "2016-01-01", None)
+        self.cache.put(self.key, self.datasource, observations, "2016-01-01", "2999-12-31")
+        self.assertIsNotNone(self.cache.get(self.key, "2016-01-01", None))
+        self.assertIsNotNone(self.cache.version(self.key, "2016-01-01", today))
+
+        self.cache._connection().execute("UPDATE entries SET created = created - ?", (self.cache.max_age + 1,))
+        self.assertIsNone(self.cache.get(self.key, "2016-01-01", None))
+        self.assertIsNone(self.cache.version(self.key, "2016-01-01", today))
+        self.assertIsNotNone(self.cache.get(self.key, "2016-01-01", "2016-12-31"))
+
+        # Synthesizing the range again refreshes the entry
+        self.cache.put(self.key, self.datasource, observations, "2016-01-01", None)
+        self.assertIsNotNone(self.cache.get(self.key, "2016-01-01", None))
+
+        self.cache.max_age = None
+        self.assertIsNotNone(self.cache.get(self.key, "2016-01-01", today))
+
+    def test_evict(self):
+        self.cache.put(self.key, self.datasource, list(self.plugin_view.list(None)), "2016-01-01", "2016-12-31")
+        other_key = cache_key(MeasurementTimeseriesTVPObservation, self.datasource, {"monitoring_features": ["1"]})
+        self.cache.put(other_key, self.datasource, list(self.plugin_view.list(None)), "2016-01-01", "2016-12-31")
+
+        # The least recently used entry is evicted
+        self.cache.get(self.key, "2016-01-01", "2016-12-31")
+        self.cache.max_bytes = self.cache.size() - 1
+        self.cache.evict()
+        self.assertIsNotNone(self.cache.get(self.key, "2016-01-01", "2016-12-31"))
+        self.assertIsNone(self.cache.get(other_key, "2016-01-01", "2016-12-31"))
+
+    def test_persistent(self):
+        """A new cache on the same file (e.g. after a restart) has the entries"""
+        self.cache.put(self.key, self.datasource, list(self.plugin_view.list(None)), None, None)
+        cache = TimeseriesCache(self.cache.path)
+        self.assertEqual(len(cache.get(self.key)), 2)
+
+
+class TestTimeseriesCacheAPI(TestCase):
+    """
+    Test /synthesis/measurement_tvp_timeseries api with the timeseries cache
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_get(self):
+        with override_settings(BASIN3D={'SYNTHESIS': True, 'DIRECT_API': True,
+                                        'TIMESERIES_CACHE_DIR': self.cache_dir}):
+            url = '/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1&start_date=2016-02-01'
+            response = self.client.get(url, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            expected = json.loads(response.content.decode('utf-8'))
+
+            with mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list") as mock_list:
+                response = self.client.get(url, format='json')
+                mock_list.assert_not_called()
+            self.assertEqual(json.loads(response.content.decode('utf-8')), expected)
+
+    def test_post_cache_params(self):
+        """The units, time zone and downsampling are applied to the cached timeseries"""
+        with override_settings(BASIN3D={'SYNTHESIS': True, 'DIRECT_API': True,
+                                        'TIMESERIES_CACHE_DIR': self.cache_dir}):
+            url = '/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1&start_date=2016-02-01'
+            response = self.client.get(url, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            with mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list") as mock_list:
+                response = self.client.get(url + '&units=canonical&tz=UTC&max_points=3', format='json')
+                mock_list.assert_not_called()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(json.loads(response.content.decode('utf-8')))
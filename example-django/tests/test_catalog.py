@@ -0,0 +1,102 @@
+import json
+from unittest import mock
+
+from basin3d.models import DataSource, FeatureTypes
+from basin3d.synthesis.catalog import catalog, MonitoringFeatureCatalog
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class MonitoringFeatureCatalogTest(TestCase):
+    """
+    Test the monitoring feature catalog snapshots
+    """
+
+    def setUp(self):
+        self.datasource = DataSource.objects.get(name="Alpha")
+        self.catalog = MonitoringFeatureCatalog()
+
+    def test_get(self):
+        snapshot = self.catalog.get(self.datasource, FeatureTypes.POINT)
+        self.assertEqual([f.id for f in snapshot.features], ["A-Region1", "A-1"])
+        self.assertEqual(snapshot.feature_type, FeatureTypes.POINT)
+        self.assertGreaterEqual(snapshot.refresh_duration, 0)
+        self.assertFalse(snapshot.is_stale(300))
+
+        # The second read is served from the snapshot
+        with mock.patch.object(self.catalog, "refresh") as mock_refresh:
+            self.assertIs(self.catalog.get(self.datasource, FeatureTypes.POINT), snapshot)
+            mock_refresh.assert_not_called()
+
+    def test_get_stale(self):
+        snapshot = self.catalog.get(self.datasource, FeatureTypes.POINT)
+        snapshot.refreshed_at -= 600
+
+        # Stale snapshots are returned while they are revalidated
+        with mock.patch.object(self.catalog, "refresh_async") as mock_refresh_async:
+            self.assertIs(self.catalog.get(self.datasource, FeatureTypes.POINT), snapshot)
+            mock_refresh_async.assert_called_once_with(self.datasource, FeatureTypes.POINT)
+
+    def test_refresh_version(self):
+        """The version only changes when the features change"""
+        snapshot = self.catalog.get(self.datasource, FeatureTypes.POINT)
+        snapshot.refreshed_at -= 600
+        snapshot.modified_at -= 600
+
+        refreshed = self.catalog.refresh(self.datasource, FeatureTypes.POINT)
+        self.assertIsNot(refreshed, snapshot)
+        self.assertEqual(refreshed.version, snapshot.version)
+        self.assertEqual(refreshed.modified_at, snapshot.modified_at)
+
+        with mock.patch("basin3d.synthesis.catalog.list_features", return_value=snapshot.features[:1]):
+            changed = self.catalog.refresh(self.datasource, FeatureTypes.POINT)
+        self.assertNotEqual(changed.version, snapshot.version)
+        self.assertGreater(changed.modified_at, snapshot.modified_at)
+
+    def test_refresh_error(self):
+        snapshot = self.catalog.get(self.datasource, FeatureTypes.POINT)
+
+        # A failing data source keeps the previous snapshot
+        with mock.patch.object(DataSource, "get_plugin", side_effect=Exception("upstream is down")):
+            self.assertIs(self.catalog.refresh(self.datasource, FeatureTypes.POINT), snapshot)
+
+
+class TestMonitoringFeatureCatalogAPI(TestCase):
+    """
+    Test /synthesis/monitoringfeatures/ api with the catalog
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        catalog.clear()
+
+    def test_get(self):
+        response = self.client.get('/synthesis/monitoringfeatures/points/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([f["id"] for f in json.loads(response.content.decode('utf-8'))], ["A-Region1", "A-1"])
+
+        response = self.client.get('/synthesis/monitoringfeatures/catalog/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        snapshots = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(len(snapshots), 1)
+        self.assertEqual(snapshots[0]["datasource"], "A")
+        self.assertEqual(snapshots[0]["feature_type"], "POINT")
+        self.assertEqual(snapshots[0]["count"], 2)
+        self.assertFalse(snapshots[0]["stale"])
+        self.assertIn("age", snapshots[0])
+        self.assertIn("refresh_duration", snapshots[0])
+
+    def test_get_filtered(self):
+        """Filtered listings go to the data sources"""
+        response = self.client.get('/synthesis/monitoringfeatures/points/?monitoring_features=A-1',
+                                   format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(catalog.snapshots(), [])
+
+    @override_settings(BASIN3D={'SYNTHESIS': True, 'DIRECT_API': True, 'CATALOG_ENABLED': False})
+    def test_get_disabled(self):
+        response = self.client.get('/synthesis/monitoringfeatures/points/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json.loads(response.content.decode('utf-8'))), 2)
+        self.assertEqual(catalog.snapshots(), [])
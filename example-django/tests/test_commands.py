@@ -1,10 +1,18 @@
 
 
+import json
+import os
+import shutil
 import sys
+import tempfile
 
+from basin3d.management.commands.loadtest import get_endpoint
+from basin3d.management.requestlog import read_access_log
+from basin3d.synthesis.catalog import catalog
+from basin3d.testing import StubDataSourceServer
 from django.core.management import CommandError
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.six import StringIO
 
 
@@ -53,3 +61,125 @@ class UploadcredentialsTest(TestCase):
         out = StringIO()
         with self.assertRaisesMessage(CommandError, 'DataSource "Foo" does not exist'):
             call_command('uploadcredentials', 'Foo', stderr=out)
+
+
+class WarmcacheTest(TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        catalog.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_command_file(self):
+        """Test warmcache command with a query file"""
+        query_file = os.path.join(self.tempdir, "queries.txt")
+        with open(query_file, "w") as f:
+            f.write("# popular queries\n"
+                    "/synthesis/monitoringfeatures/points/\n"
+                    "http://localhost:8000/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1\n"
+                    "/synthesis/datasources/\n")
+        out = StringIO()
+        err = StringIO()
+        with override_settings(BASIN3D={'SYNTHESIS': True, 'DIRECT_API': True,
+                                        'TIMESERIES_CACHE_DIR': self.tempdir}):
+            call_command('warmcache', '--file', query_file, '--concurrency', '1', stdout=out, stderr=err)
+        self.assertIn("Alpha", out.getvalue())
+        self.assertIn("Warmed 2 queries across 1 data sources", out.getvalue())
+        self.assertIn("Skipping '/synthesis/datasources/'", err.getvalue())
+        self.assertEqual(len(catalog.snapshots()), 1)
+
+    def test_command_access_log(self):
+        """Test warmcache command with an access log"""
+        access_log = os.path.join(self.tempdir, "access.log")
+        with open(access_log, "w") as f:
+            f.write('[18/Oct/2026 10:00:00] "GET /synthesis/monitoringfeatures/points/ HTTP/1.1" 200 1234\n'
+                    '[18/Oct/2026 10:00:01] "GET /synthesis/monitoringfeatures/points/ HTTP/1.1" 200 1234\n'
+                    '[18/Oct/2026 10:00:02] "GET /synthesis/monitoringfeatures/regions/ HTTP/1.1" 500 12\n'
+                    '[18/Oct/2026 10:00:03] "GET /direct/ HTTP/1.1" 200 12\n')
+        out = StringIO()
+        call_command('warmcache', '--access-log', access_log, '--concurrency', '1', stdout=out)
+        self.assertIn("TIMESERIES_CACHE_DIR is not set", out.getvalue())
+        self.assertIn("Warmed 1 queries across 1 data sources", out.getvalue())
+
+    def test_read_access_log_recent(self):
+        """Test reading the most recent lines of an access log"""
+        access_log = os.path.join(self.tempdir, "access.log")
+        with open(access_log, "w") as f:
+            for n in range(10):
+                f.write('[18/Oct/2026 10:00:0{0}] "GET /synthesis/monitoringfeatures/points/A-{0}/ HTTP/1.1" 200 12\n'
+                        .format(n))
+        self.assertEqual([r.path for r in read_access_log(access_log, recent=2)],
+                         ["/synthesis/monitoringfeatures/points/A-8/", "/synthesis/monitoringfeatures/points/A-9/"])
+        self.assertEqual(len(read_access_log(access_log)), 10)
+
+    def test_command_missing_file(self):
+        """Test warmcache with a missing query file"""
+        with self.assertRaises(CommandError):
+            call_command('warmcache', '--file', os.path.join(self.tempdir, "missing.txt"))
+
+
+class LoadtestTest(TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.server = StubDataSourceServer(resources={"sites": [{"id": n} for n in range(1, 6)]},
+                                           require_token=False, page_size=2).start()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.tempdir)
+
+    def test_get_endpoint(self):
+        """Test the endpoints of the request paths"""
+        self.assertEqual(get_endpoint("/synthesis/monitoringfeatures/points/A-1/?format=json"),
+                         "/synthesis/monitoringfeatures/points/{pk}/")
+        self.assertEqual(get_endpoint("/synthesis/monitoringfeatures/points/"), "/synthesis/monitoringfeatures/points/")
+        self.assertEqual(get_endpoint("/sites/?page=2"), "/sites/")
+
+    def test_command_file(self):
+        """Test loadtest command against a stand-in data source"""
+        query_file = os.path.join(self.tempdir, "queries.txt")
+        with open(query_file, "w") as f:
+            f.write("/sites/\n/sites/?page=2\n/plots/\n")
+        report_file = os.path.join(self.tempdir, "report.json")
+        out = StringIO()
+        call_command('loadtest', '--file', query_file, '--url', self.server.url, '--concurrency', '2',
+                     '--repeat', '2', '--rate', '100', '--output', report_file, stdout=out)
+        self.assertIn("Replayed 6 requests", out.getvalue())
+        self.assertEqual(self.server.stats["requests"], 6)
+
+        with open(report_file) as f:
+            report = json.load(f)
+        endpoints = {endpoint["endpoint"]: endpoint for endpoint in report["endpoints"]}
+        self.assertEqual(endpoints["/sites/"]["requests"], 4)
+        self.assertEqual(endpoints["/sites/"]["errors"], 0)
+        self.assertEqual(endpoints["/plots/"]["statuses"], {"404": 2})
+        self.assertEqual(endpoints["/plots/"]["error_rate"], 1.0)
+        self.assertEqual(report["total"]["errors"], 2)
+        self.assertIsNotNone(report["total"]["latency_ms"]["p99"])
+
+    def test_command_access_log(self):
+        """Test loadtest command with an access log and failing requests"""
+        access_log = os.path.join(self.tempdir, "access.log")
+        with open(access_log, "w") as f:
+            f.write('[18/Oct/2026 10:00:00] "GET /sites/ HTTP/1.1" 200 1234\n'
+                    '[18/Oct/2026 10:00:01] "POST /sites/ HTTP/1.1" 200 1234\n'
+                    '[18/Oct/2026 10:00:02] "GET /other/ HTTP/1.1" 200 12\n')
+        self.server.error_rate = 1
+        out = StringIO()
+        err = StringIO()
+        call_command('loadtest', '--access-log', access_log, '--prefix', '/sites/', '--url', self.server.url,
+                     stdout=out, stderr=err)
+        self.assertIn("Skipping 1 requests that are not GET requests", err.getvalue())
+        self.assertIn("Replayed 1 requests", out.getvalue())
+        self.assertIn("100.0", out.getvalue())
+
+    def test_command_invalid(self):
+        """Test loadtest with invalid options"""
+        query_file = os.path.join(self.tempdir, "queries.txt")
+        with open(query_file, "w") as f:
+            f.write("# nothing\n")
+        with self.assertRaisesMessage(CommandError, "There are no requests to replay"):
+            call_command('loadtest', '--file', query_file)
+        with self.assertRaises(CommandError):
+            call_command('loadtest', '--file', query_file, '--rate', '0')
@@ -0,0 +1,98 @@
+import shutil
+import tempfile
+
+from basin3d.conditional import catalog_version, reset_catalog_version
+from basin3d.models import ObservedProperty
+from basin3d.synthesis.catalog import catalog
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class TestConditionalAPI(TestCase):
+    """
+    Test the ETag / Last-Modified conditional responses
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        catalog.clear()
+        # The test transactions are rolled back without signals
+        reset_catalog_version()
+
+    def tearDown(self):
+        catalog.clear()
+
+    def test_catalog(self):
+        response = self.client.get('/synthesis/observedproperty/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        response = self.client.get('/synthesis/observedproperty/', format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+        # A catalog change is a new representation
+        observed_property = ObservedProperty.objects.first()
+        observed_property.description = "changed"
+        observed_property.save()
+        response = self.client.get('/synthesis/observedproperty/', format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_catalog_version(self):
+        """The catalog version is cached until a catalog record changes"""
+        version = catalog_version()
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog_version(), version)
+
+        observed_property = ObservedProperty.objects.first()
+        observed_property.description = "changed"
+        observed_property.save()
+        self.assertNotEqual(catalog_version(), version)
+
+    def test_monitoring_features(self):
+        response = self.client.get('/synthesis/monitoringfeatures/regions/', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get('/synthesis/monitoringfeatures/regions/', format='json',
+                                   HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get('/synthesis/monitoringfeatures/regions/', format='json',
+                                   HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A refresh without changes keeps the ETag
+        etag = response["ETag"]
+        for snapshot in catalog.snapshots():
+            catalog.refresh(snapshot.datasource, snapshot.feature_type)
+        response = self.client.get('/synthesis/monitoringfeatures/regions/', format='json',
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Filtered listings are not served from the catalog
+        response = self.client.get('/synthesis/monitoringfeatures/regions/?monitoring_features=A-1', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", response)
+
+    def test_timeseries(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with override_settings(BASIN3D={'SYNTHESIS': True, 'DIRECT_API': True,
+                                            'TIMESERIES_CACHE_DIR': cache_dir}):
+                url = '/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1&start_date=2016-02-01'
+
+                # Only cached timeseries have an ETag
+                response = self.client.get(url, format='json')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotIn("ETag", response)
+
+                response = self.client.get(url, format='json')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        finally:
+            shutil.rmtree(cache_dir)
@@ -0,0 +1,104 @@
+import json
+import math
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from basin3d.synthesis.downsample import Downsampling, downsample_observation, downsample_points
+from basin3d.synthesis.query import QueryPlan, synthesis_request
+from django.test import TestCase
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class DownsampleTest(TestCase):
+    """
+    Test the timeseries downsampling
+    """
+
+    def setUp(self):
+        start = datetime(2016, 2, 1)
+        self.points = [(start + timedelta(minutes=n), math.sin(n / 50.0)) for n in range(1000)]
+        # A spike that must survive the downsampling
+        self.points[500] = (self.points[500][0], 10.0)
+
+    def test_downsampling(self):
+        plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/?max_points=100"))
+        self.assertEqual(Downsampling.from_query_plan(plan), Downsampling(100, "LTTB"))
+        plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/"))
+        self.assertIsNone(Downsampling.from_query_plan(plan))
+        for query in ["max_points=2", "max_points=x", "max_points=10&downsample=AVERAGE"]:
+            plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/?{}".format(query)))
+            self.assertRaises(ValueError, Downsampling.from_query_plan, plan)
+
+    def test_lttb(self):
+        points = downsample_points(self.points, 100)
+        self.assertEqual(len(points), 100)
+        self.assertEqual(points[0], self.points[0])
+        self.assertEqual(points[-1], self.points[-1])
+        self.assertIn(self.points[500], points)
+        self.assertEqual(points, sorted(points))
+
+    def test_min_max(self):
+        points = downsample_points(self.points, 100, "MINMAX")
+        self.assertLessEqual(len(points), 100)
+        self.assertIn(self.points[500], points)
+        self.assertEqual(points, sorted(points))
+        self.assertEqual(min(p[1] for p in points), min(p[1] for p in self.points))
+
+    def test_unordered(self):
+        """Points out of time order are sorted before they are bucketed"""
+        shuffled = self.points[500:] + self.points[:500]
+        self.assertEqual(downsample_points(shuffled, 100), downsample_points(self.points, 100))
+        self.assertEqual(downsample_points(shuffled, 100, "MINMAX"), downsample_points(self.points, 100, "MINMAX"))
+
+    def test_short(self):
+        self.assertIs(downsample_points(self.points, 1000), self.points)
+        self.assertEqual(downsample_points([(date(2016, 2, n), None) for n in range(1, 6)], 3), [])
+
+
+class TestDownsampleAPI(TestCase):
+    """
+    Test /synthesis/measurement_tvp_timeseries api downsampling
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_get(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&max_points=3', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for observation in json.loads(response.content.decode('utf-8')):
+            self.assertEqual([p[0] for p in observation["result_points"]][::2], ["2016-02-01", "2016-02-09"])
+            self.assertEqual(len(observation["result_points"]), 3)
+
+    def test_merge(self):
+        plugin_list = AlphaDataMeasurementTimeseriesTVPObservationView.list
+
+        def shifted(view, request, **kwargs):
+            feature_of_interest = None
+            for observation in plugin_list(view, request, **kwargs):
+                if observation.id == "A-2":
+                    # A second timeseries of the first monitoring feature
+                    observation.feature_of_interest = feature_of_interest
+                    observation.result_points = [(date(2016, 3, n), n) for n in range(1, 10)]
+                feature_of_interest = observation.feature_of_interest
+                yield observation
+
+        with mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list", shifted), \
+                mock.patch("basin3d.synthesis.viewsets.downsample_observation",
+                           wraps=downsample_observation) as mock_downsample:
+            response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1,A-2'
+                                       '&start_date=2016-02-01&max_points=4&downsample=minmax&merge=true',
+                                       format='json')
+        observations = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(len(observations), 1)
+        self.assertEqual(len(observations[0]["result_points"]), 4)
+        # The merged timeseries is downsampled once
+        self.assertEqual(mock_downsample.call_count, 1)
+
+    def test_invalid(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&max_points=1', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
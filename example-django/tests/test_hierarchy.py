@@ -0,0 +1,86 @@
+import json
+
+from basin3d.models import DataSource, FeatureTypes
+from basin3d.synthesis.catalog import catalog
+from basin3d.synthesis.hierarchy import HierarchyIndex, parse_feature_type
+from basin3d.synthesis.models.field import MonitoringFeature, RelatedSamplingFeature
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class HierarchyIndexTest(TestCase):
+    """
+    Test the monitoring feature hierarchy index
+    """
+
+    def setUp(self):
+        datasource = DataSource.objects.get(name="Alpha")
+
+        def feature(feature_id, feature_type, *parents):
+            return MonitoringFeature(datasource=datasource, id=feature_id, feature_type=feature_type,
+                                     related_sampling_feature_complex=[
+                                         RelatedSamplingFeature(datasource=datasource,
+                                                                related_sampling_feature=parent,
+                                                                role=RelatedSamplingFeature.ROLE_PARENT)
+                                         for parent in parents])
+
+        self.index = HierarchyIndex([feature("R", FeatureTypes.REGION),
+                                     feature("S1", FeatureTypes.SITE, "R"),
+                                     feature("S2", FeatureTypes.SITE, "R"),
+                                     feature("P1", FeatureTypes.POINT, "S1"),
+                                     feature("P2", FeatureTypes.POINT, "S2", "S1"),
+                                     feature("X", FeatureTypes.POINT, "Y"),
+                                     feature("Y", FeatureTypes.POINT, "X")])
+
+    def test_closures(self):
+        self.assertEqual(self.index.children["A-R"], ["A-S1", "A-S2"])
+        self.assertEqual(self.index.ancestors["A-P2"], {"A-S1", "A-S2", "A-R"})
+        self.assertEqual(self.index.descendants["A-R"], {"A-S1", "A-S2", "A-P1", "A-P2"})
+        # Cycles are broken
+        self.assertIn("A-Y", self.index.ancestors["A-X"])
+
+    def test_descendants_of(self):
+        self.assertEqual([f.id for f in self.index.descendants_of(["A-R"], FeatureTypes.POINT)], ["A-P1", "A-P2"])
+        self.assertEqual([f.id for f in self.index.descendants_of(["A-S2"])], ["A-P2"])
+        self.assertEqual(self.index.descendants_of(["A-P1"]), [])
+
+    def test_parse_feature_type(self):
+        self.assertEqual(parse_feature_type("point"), FeatureTypes.POINT)
+        self.assertEqual(parse_feature_type("horizontalpaths"), FeatureTypes.HORIZONTAL_PATH)
+        self.assertRaises(ValueError, parse_feature_type, "planet")
+
+
+class TestHierarchyAPI(TestCase):
+    """
+    Test /synthesis/monitoringfeatures hierarchy filters
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        catalog.clear()
+
+    def tearDown(self):
+        catalog.clear()
+
+    def get_ids(self, url):
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [obj["id"] for obj in json.loads(response.content.decode('utf-8'))]
+
+    def test_get(self):
+        self.assertEqual(self.get_ids('/synthesis/monitoringfeatures/?descendants_of=A-Region1&feature_type=POINT'),
+                         ["A-1"])
+        self.assertEqual(self.get_ids('/synthesis/monitoringfeatures/points/?ancestor=A-Region1'), ["A-1"])
+        self.assertEqual(self.get_ids('/synthesis/monitoringfeatures/regions/?ancestor=A-Region1'), [])
+        self.assertEqual(self.get_ids('/synthesis/monitoringfeatures/?ancestor=A-1'), [])
+
+    def test_plugin(self):
+        """Listings that are not served from the catalog are filtered with the hierarchy index"""
+        self.assertEqual(self.get_ids('/synthesis/monitoringfeatures/points/?ancestor=A-Region1'
+                                      '&monitoring_features=A-1,A-Region1'), ["A-1"])
+
+    def test_invalid(self):
+        response = self.client.get('/synthesis/monitoringfeatures/?ancestor=A-Region1&feature_type=planet',
+                                   format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,112 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from basin3d.synthesis.jobs import STATUS_DONE, STATUS_FAILED, jobs
+from django.test import TestCase, override_settings
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class TestJobsAPI(TestCase):
+    """
+    Test /synthesis/measurement_tvp_timeseries/jobs
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.jobs_dir = tempfile.mkdtemp()
+        self.settings = override_settings(BASIN3D={'SYNTHESIS': True, 'DIRECT_API': True,
+                                                   'JOBS_DIR': self.jobs_dir, 'JOBS_CHUNK_SIZE': 2})
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.jobs_dir)
+
+    def wait(self, url):
+        deadline = time.time() + 10
+        while True:
+            job = json.loads(self.client.get(url, format='json').content.decode('utf-8'))
+            if job["status"] not in ("QUEUED", "RUNNING") or time.time() > deadline:
+                return job
+            time.sleep(0.05)
+
+    def test_job(self):
+        plugin_list = AlphaDataMeasurementTimeseriesTVPObservationView.list
+        chunks = []
+
+        def chunked(view, request, **kwargs):
+            chunks.append(kwargs["monitoring_features"])
+            return plugin_list(view, request, **kwargs)
+
+        with mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list", chunked):
+            response = self.client.post('/synthesis/measurement_tvp_timeseries/jobs/?start_date=2016-02-01',
+                                        {"monitoring_features": ["A-1", "A-2", "A-3"]}, format='json')
+            job = self.wait(json.loads(response.content.decode('utf-8'))["url"])
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response["Location"], job["url"])
+        self.assertEqual(job["query"], "/synthesis/measurement_tvp_timeseries/"
+                                       "?start_date=2016-02-01&monitoring_features=A-1%2CA-2%2CA-3")
+        self.assertEqual(job["status"], STATUS_DONE)
+        self.assertEqual(chunks, [["1", "2"], ["3"]])
+        self.assertEqual(job["chunks"], 2)
+        self.assertEqual(job["chunks_done"], 2)
+        self.assertEqual(job["progress"], 1.0)
+        # The example plugin returns two timeseries for each chunk
+        self.assertEqual(job["objects"], 4)
+
+        response = self.client.get(job["result"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("attachment", response["Content-Disposition"])
+        observations = json.loads(b"".join(response.streaming_content).decode('utf-8'))
+        response.close()
+        self.assertEqual(len(observations), job["objects"])
+        self.assertEqual([o["id"] for o in observations], ["A-1", "A-2", "A-1", "A-2"])
+
+        # Remove the finished job
+        self.assertEqual(self.client.delete(job["url"]).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(job["url"]).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(job["result"]).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(jobs.get(job["id"]))
+
+    def test_abandoned(self):
+        """Jobs left running by a stopped process are failed after JOBS_MAX_AGE"""
+        job_dir = os.path.join(self.jobs_dir, "0" * 32)
+        os.makedirs(job_dir)
+        with open(os.path.join(job_dir, "status.json"), "w") as status_file:
+            json.dump({"id": "0" * 32, "status": "RUNNING", "finished": None}, status_file)
+        open(os.path.join(job_dir, "result.json.part"), "w").close()
+        self.assertEqual(jobs.get("0" * 32)["status"], "RUNNING")
+
+        updated = time.time() - 86401
+        os.utime(os.path.join(job_dir, "status.json"), (updated, updated))
+        job = jobs.get("0" * 32)
+        self.assertEqual(job["status"], STATUS_FAILED)
+        self.assertEqual(job["error"], "The job was abandoned while running")
+        self.assertFalse(os.path.exists(os.path.join(job_dir, "result.json.part")))
+        self.assertEqual(jobs.get("0" * 32)["status"], STATUS_FAILED)
+
+        # The failed job is removed once it is expired
+        with override_settings(BASIN3D={'JOBS_DIR': self.jobs_dir, 'JOBS_MAX_AGE': -1}):
+            jobs.remove_expired()
+        self.assertFalse(os.path.exists(job_dir))
+
+    def test_invalid(self):
+        response = self.client.post('/synthesis/measurement_tvp_timeseries/jobs/',
+                                    {"monitoring_features": "A-1", "statistic": "MEDIAN"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/synthesis/measurement_tvp_timeseries/jobs/', ["A-1"], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/synthesis/measurement_tvp_timeseries/jobs/',
+                                    {"monitoring_features": "A-1", "merge": True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/synthesis/measurement_tvp_timeseries/jobs/?align=null',
+                                    {"monitoring_features": "A-1"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/jobs/{}/'.format("0" * 32))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
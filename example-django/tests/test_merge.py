@@ -0,0 +1,105 @@
+import json
+from datetime import date, datetime
+from unittest import mock
+
+from basin3d.models import DataSource
+from basin3d.synthesis.merge import merge_observations, merge_points
+from django.test import TestCase
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class Timeseries(object):
+
+    def __init__(self, id, observed_property, unit_of_measurement, result_points, feature_of_interest=None):
+        self.id = id
+        self.datasource = DataSource(id_prefix=id.split("-")[0])
+        self.feature_of_interest = feature_of_interest or id
+        self.observed_property = observed_property
+        self.aggregation_duration = "DAY"
+        self.statistic = "MEAN"
+        self.unit_of_measurement = unit_of_measurement
+        self.result_points = result_points
+
+
+class MergeTest(TestCase):
+    """
+    Test the k-way timestamp merge
+    """
+
+    def test_merge_points(self):
+        first = [(date(2016, 2, 1), 1), (date(2016, 2, 3), 3), (date(2016, 2, 5), 5)]
+        second = [("2016-02-02", 20), ("2016-02-03", 30), ("2016-02-06T00:00:00", 60)]
+        third = [(datetime(2016, 2, 7), 7), (datetime(2016, 2, 4), 4), ("not a date", 0)]
+        self.assertEqual([value for _, value in merge_points([first, second, third])], [1, 20, 3, 4, 5, 60, 7])
+        self.assertEqual(list(merge_points([[], None, first])), first)
+
+    def test_merge_points_offsets(self):
+        """Timestamps with and without an offset are merged in UTC"""
+        naive = [("2016-02-01T10:00:00", 1), (datetime(2016, 2, 1, 12), 3)]
+        aware = [("2016-02-01T11:00:00Z", 2), ("2016-02-01T13:30:00+02:00", 0), ("2016-02-01T14:00:00+01:00", 4)]
+        self.assertEqual([value for _, value in merge_points([naive, aware])], [1, 2, 0, 3, 4])
+
+    def test_merge_observations(self):
+        observations = [Timeseries("A-1", 1, "mm", [(date(2016, 2, 1), 1)]),
+                        Timeseries("A-2", 2, "mm", [(date(2016, 2, 1), 2)]),
+                        Timeseries("B-1", 1, "mm", [(date(2016, 2, 2), 3)]),
+                        Timeseries("C-1", 1, "cm", [(date(2016, 2, 2), 4)])]
+        merged = merge_observations(observations)
+        self.assertEqual([o.id for o in merged], ["A-1+B-1", "A-2", "C-1"])
+        self.assertEqual(list(merged[0].result_points), [(date(2016, 2, 1), 1), (date(2016, 2, 2), 3)])
+        # The merged timeseries are copies
+        self.assertEqual(observations[0].id, "A-1")
+        self.assertIs(merged[1], observations[1])
+
+    def test_merge_observations_sites(self):
+        """Different monitoring features of the same data source are not merged"""
+        observations = [Timeseries("A-1", 1, "mm", [(date(2016, 2, 1), 1)]),
+                        Timeseries("A-2", 1, "mm", [(date(2016, 2, 1), 2)]),
+                        Timeseries("B-1", 1, "mm", [(date(2016, 2, 2), 3)]),
+                        Timeseries("A-3", 2, "mm", [(date(2016, 2, 1), 4)], feature_of_interest="A-1"),
+                        Timeseries("A-4", 2, "mm", [(date(2016, 2, 2), 5)], feature_of_interest="A-1")]
+        self.assertEqual([o.id for o in merge_observations(observations)], ["A-1", "A-2", "B-1", "A-3+A-4"])
+
+
+class TestMergeAPI(TestCase):
+    """
+    Test /synthesis/measurement_tvp_timeseries merge
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_get(self):
+        plugin_list = AlphaDataMeasurementTimeseriesTVPObservationView.list
+
+        def overlapping(view, request, **kwargs):
+            feature_of_interest = None
+            for observation in plugin_list(view, request, **kwargs):
+                if observation.id == "A-2":
+                    # A second timeseries of the first monitoring feature
+                    observation.feature_of_interest = feature_of_interest
+                    observation.result_points = [(date(2016, 2, 5), -1.0), (date(2016, 2, 12), 4.0)]
+                feature_of_interest = observation.feature_of_interest
+                yield observation
+
+        with mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list", overlapping):
+            response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1,A-2'
+                                       '&start_date=2016-02-01&merge=true', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        observations = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([o["id"] for o in observations], ["A-1+A-2"])
+        points = observations[0]["result_points"]
+        self.assertEqual([p[0] for p in points], ["2016-02-0{}".format(n) for n in range(1, 10)] + ["2016-02-12"])
+        self.assertNotIn(-1.0, [p[1] for p in points])
+
+        # The monitoring features of a data source are different sites
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1,A-2'
+                                   '&start_date=2016-02-01&merge=true', format='json')
+        self.assertEqual([o["id"] for o in json.loads(response.content.decode('utf-8'))], ["A-1", "A-2"])
+
+    def test_invalid(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&merge=true&limit=10', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,105 @@
+import importlib
+from unittest import mock
+
+from basin3d.metrics import MetricsRegistry, instrument_list, metrics, observe_http
+from django.test import TestCase, override_settings
+from django.urls import clear_url_caches
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView  # noqa: F401
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class MetricsTest(TestCase):
+    """
+    Test the data source metrics
+    """
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_render(self):
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        registry.record("Alpha", "list", 0.05, objects=3)
+        registry.record("Alpha", "list", 0.5, error=True, objects=0)
+        registry.record('Be"ta', "get_url", 5.0)
+        text = registry.render()
+        self.assertIn('basin3d_datasource_requests_total{datasource="Alpha",operation="list"} 2', text)
+        self.assertIn('basin3d_datasource_errors_total{datasource="Alpha",operation="list"} 1', text)
+        self.assertIn('basin3d_datasource_objects_total{datasource="Alpha",operation="list"} 3', text)
+        self.assertIn('basin3d_datasource_request_duration_seconds_bucket{datasource="Alpha",operation="list",'
+                      'le="0.1"} 1', text)
+        self.assertIn('basin3d_datasource_request_duration_seconds_bucket{datasource="Alpha",operation="list",'
+                      'le="1.0"} 2', text)
+        self.assertIn('basin3d_datasource_request_duration_seconds_bucket{datasource="Be\\"ta",operation="get_url",'
+                      'le="+Inf"} 1', text)
+        self.assertIn('basin3d_datasource_request_duration_seconds_count{datasource="Alpha",operation="list"} 2', text)
+        self.assertIn("# TYPE basin3d_datasource_request_duration_seconds histogram", text)
+
+    def test_instrument_list(self):
+        class View(object):
+            datasource = mock.Mock()
+            datasource.name = "Alpha"
+
+            def list(self, request):
+                for n in range(3):
+                    # HTTP requests are attributed to the data source of the plugin view
+                    observe_http("get_url", lambda: mock.Mock(status_code=500 if n == 2 else 200))
+                    yield n
+
+            def broken(self, request):
+                yield 1
+                raise ValueError("upstream")
+
+        view = View()
+        self.assertEqual(list(instrument_list(View.list)(view, None)), [0, 1, 2])
+        self.assertEqual(next(instrument_list(View.list)(view, None)), 0)
+        with self.assertRaises(ValueError):
+            list(instrument_list(View.broken)(view, None))
+
+        text = metrics.render()
+        self.assertIn('basin3d_datasource_requests_total{datasource="Alpha",operation="list"} 3', text)
+        self.assertIn('basin3d_datasource_errors_total{datasource="Alpha",operation="list"} 1', text)
+        self.assertIn('basin3d_datasource_objects_total{datasource="Alpha",operation="list"} 5', text)
+        self.assertIn('basin3d_datasource_requests_total{datasource="Alpha",operation="get_url"} 4', text)
+        self.assertIn('basin3d_datasource_errors_total{datasource="Alpha",operation="get_url"} 1', text)
+
+        observe_http("post_url", lambda: mock.Mock(status_code=200))
+        self.assertIn('basin3d_datasource_requests_total{datasource="unknown",operation="post_url"} 1',
+                      metrics.render())
+
+
+class TestMetricsAPI(TestCase):
+    """
+    Test /metrics
+    """
+
+    def setUp(self):
+        metrics.reset()
+        self.client = APIClient()
+
+    @staticmethod
+    def load_urls(**basin3d_settings):
+        """/metrics is added when the url configuration is loaded"""
+        with override_settings(BASIN3D=dict({'SYNTHESIS': True, 'DIRECT_API': True}, **basin3d_settings)):
+            for name in ("basin3d.urls", "mybroker.urls"):
+                importlib.reload(importlib.import_module(name))
+        clear_url_caches()
+
+    def test_disabled(self):
+        self.addCleanup(self.load_urls, METRICS_ENABLED=True)
+        self.load_urls()
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get(self):
+        self.load_urls(METRICS_ENABLED=True)
+
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        text = response.content.decode("utf-8")
+        self.assertIn('basin3d_datasource_requests_total{datasource="Alpha",operation="list"} 1', text)
+        self.assertIn('basin3d_datasource_objects_total{datasource="Alpha",operation="list"} 2', text)
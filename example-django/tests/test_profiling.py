@@ -0,0 +1,64 @@
+import tracemalloc
+
+import pytest
+from basin3d import profiling
+from basin3d.profiling import MemoryProfile
+from basin3d.synthesis.query import QUERY_PARAM_MONITORING_FEATURES
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.utils.six import StringIO
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView  # noqa: F401
+
+TIMESERIES_URL = "/synthesis/measurement_tvp_timeseries/?{}=A-1,A-2&start_date=2016-02-01".format(
+    QUERY_PARAM_MONITORING_FEATURES)
+
+
+class MemoryProfileTest(TestCase):
+    """
+    Test the memory profiling
+    """
+
+    def test_mark(self):
+        with MemoryProfile(top=3) as profile:
+            data = [str(n) * 10 for n in range(10000)]
+            profile.mark("build")
+            profiling.mark("noop")
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual([phase["name"] for phase in profile.phases], ["build", "noop"])
+        build = profile.phases[0]
+        self.assertGreater(build["current_bytes"], 10000 * 10)
+        self.assertGreaterEqual(build["peak_bytes"], build["current_bytes"])
+        self.assertTrue(1 <= len(build["top"]) <= 3)
+        self.assertIn("test_profiling.py", build["top"][0]["site"])
+        self.assertEqual(profile.peak(), max(phase["peak_bytes"] for phase in profile.phases))
+        self.assertEqual(profile.peak("missing"), 0)
+        self.assertEqual(len(data), 10000)
+
+        # Not profiled
+        profiling.mark("build")
+        self.assertEqual(len(profile.phases), 2)
+
+    def test_phases(self):
+        with MemoryProfile() as profile:
+            response = Client().get(TIMESERIES_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([phase["name"] for phase in profile.phases],
+                         [profiling.PHASE_COLLECT, profiling.PHASE_SERIALIZE, profiling.PHASE_RENDER])
+
+    def test_command(self):
+        out = StringIO()
+        call_command('profilememory', TIMESERIES_URL, '--top', '2', stdout=out)
+        output = out.getvalue()
+        for name in [profiling.PHASE_COLLECT, profiling.PHASE_SERIALIZE, profiling.PHASE_RENDER]:
+            self.assertIn("  {} ".format(name), output)
+
+
+@pytest.mark.django_db
+def test_timeseries_memory(memory_profile):
+    """
+    The memory budget of a small timeseries request
+    """
+    response = Client().get(TIMESERIES_URL)
+    assert response.status_code == 200
+    assert memory_profile.peak(profiling.PHASE_RENDER) > 0
+    assert memory_profile.peak() < 20 * 1024 * 1024
@@ -0,0 +1,137 @@
+import json
+from datetime import date
+from unittest import mock
+
+from basin3d.models import DataSource
+from basin3d.synthesis.catalog import catalog
+from basin3d.synthesis.query import QueryPlan, get_query_plan, synthesis_request
+from basin3d.synthesis.viewsets import MeasurementTimeseriesTVPObservationViewSet
+from django.test import TestCase
+from mybroker.plugins import AlphaMonitoringFeatureView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class QueryPlanTest(TestCase):
+    """
+    Test the synthesis query plan
+    """
+
+    def setUp(self):
+        self.request = synthesis_request("/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1,B-2,A-3,X"
+                                         "&observed_property_variables=ACT,Ag&start_date=2016-02-01"
+                                         "&result_quality=true")
+
+    def test_plan(self):
+        plan = QueryPlan(self.request)
+        self.assertEqual(plan.ids["monitoring_features"], {"A": ["1", "3"], "B": ["2"]})
+        self.assertEqual(plan.datasource_ids("monitoring_features", "A"), ["1", "3"])
+        self.assertEqual(plan.datasource_ids("monitoring_features", "C"), [])
+        self.assertIsNone(plan.datasource_ids("regions", "A"))
+        self.assertEqual(plan.observed_property_variables, ["ACT", "Ag"])
+        self.assertEqual(plan.start_date, date(2016, 2, 1))
+        self.assertIsNone(plan.end_date)
+        self.assertTrue(plan.result_quality)
+
+        query_params = plan.datasource_query_params("B")
+        self.assertEqual(query_params["monitoring_features"], ["2"])
+        self.assertEqual(query_params["start_date"], "2016-02-01")
+
+    def test_datasource_variables(self):
+        plan = QueryPlan(self.request)
+        datasource = DataSource.objects.get(name="Alpha")
+        with self.assertNumQueries(1):
+            self.assertEqual(sorted(m.name for m in plan.datasource_variables(datasource)), ["Acetate", "Ag"])
+            plan.datasource_variables(datasource)
+
+    def test_get_query_plan(self):
+        """The plan is built once per request"""
+        self.assertIs(get_query_plan(self.request), get_query_plan(self.request))
+
+
+class DataSourcePruningTest(TestCase):
+    """
+    Test that the data sources that cannot contribute to a query are skipped
+    """
+
+    def setUp(self):
+        DataSource.objects.create(name="Beta", plugin_module="foo.plugins", plugin_class="Beta", id_prefix="B")
+        self.viewset = MeasurementTimeseriesTVPObservationViewSet()
+
+    def get_datasources(self, query):
+        request = synthesis_request("/synthesis/measurement_tvp_timeseries/?{}".format(query))
+        return [datasource.id_prefix for datasource in self.viewset.get_datasources(request)]
+
+    def test_id_prefix(self):
+        self.assertEqual(self.get_datasources("monitoring_features=A-1,A-2"), ["A"])
+        self.assertEqual(self.get_datasources("monitoring_features=B-1"), ["B"])
+        self.assertEqual(self.get_datasources("monitoring_features=C-1"), [])
+        self.assertEqual(sorted(self.get_datasources("start_date=2016-01-01")), ["A", "B"])
+
+    def test_observed_property_variables(self):
+        """Beta has no variable mappings"""
+        self.assertEqual(self.get_datasources("monitoring_features=A-1,B-1&observed_property_variables=ACT"), ["A"])
+        self.assertEqual(self.get_datasources("monitoring_features=A-1&observed_property_variables=XYZ"), [])
+
+
+class TestPaginationAPI(TestCase):
+    """
+    Test the cursor pagination of the synthesis listings
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        catalog.clear()
+
+    def tearDown(self):
+        catalog.clear()
+
+    def get_pages(self, url):
+        ids = []
+        pages = 0
+        while url:
+            response = self.client.get(url, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            content = json.loads(response.content.decode('utf-8'))
+            ids.extend(obj["id"] for obj in content["results"])
+            url = content["next"]
+            pages += 1
+        return ids, pages
+
+    def test_monitoring_features(self):
+        self.assertEqual(self.get_pages('/synthesis/monitoringfeatures/points/?limit=1'), (["A-Region1", "A-1"], 2))
+        self.assertEqual(self.get_pages('/synthesis/monitoringfeatures/points/?limit=5'), (["A-Region1", "A-1"], 1))
+
+    def test_timeseries(self):
+        ids, pages = self.get_pages('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1,A-2'
+                                    '&start_date=2016-02-01&limit=1')
+        self.assertEqual((ids, pages), (["A-1", "A-2"], 2))
+
+    def test_paging_plugin(self):
+        """Plugin views that support paging get the offset and limit"""
+        with mock.patch.object(AlphaMonitoringFeatureView, "supports_paging", True, create=True), \
+                mock.patch.object(AlphaMonitoringFeatureView, "list", return_value=[]) as mock_list:
+            self.client.get('/synthesis/monitoringfeatures/points/?limit=10&monitoring_features=A-1', format='json')
+            self.assertEqual(mock_list.call_args[1]["offset"], 0)
+            self.assertEqual(mock_list.call_args[1]["limit"], 11)
+
+    def test_paging_plugin_filtered(self):
+        """Plugin views that support paging do not page the objects that are filtered by the broker"""
+        features = list(AlphaMonitoringFeatureView(DataSource.objects.get(name="Alpha")).list(None))
+        upstream = [features[0]] * 3 + [features[1]]
+
+        def list_page(view, request, offset=0, limit=None, **kwargs):
+            return upstream[offset:offset + limit if limit is not None else None]
+
+        with mock.patch.object(AlphaMonitoringFeatureView, "supports_paging", True, create=True), \
+                mock.patch.object(AlphaMonitoringFeatureView, "list", autospec=True,
+                                  side_effect=list_page) as mock_list:
+            self.assertEqual(self.get_pages('/synthesis/monitoringfeatures/points/'
+                                            '?limit=1&monitoring_features=A-Region1,A-1&q=first'), (["A-1"], 1))
+            self.assertNotIn("offset", mock_list.call_args[1])
+            self.assertNotIn("limit", mock_list.call_args[1])
+
+    def test_invalid(self):
+        for query in ['limit=0', 'limit=a', 'limit=1&cursor=bad']:
+            response = self.client.get('/synthesis/monitoringfeatures/points/?{}'.format(query), format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,75 @@
+import json
+from datetime import date, datetime
+from unittest import mock
+
+from basin3d.synthesis.query import QueryPlan, synthesis_request
+from basin3d.synthesis.resample import Resampling, resample_points
+from django.test import TestCase
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class ResampleTest(TestCase):
+    """
+    Test the timeseries resampling
+    """
+
+    def setUp(self):
+        self.points = [(datetime(2016, 2, 1, hour, minute), hour + minute / 60.0)
+                       for hour in range(0, 24) for minute in (0, 30)]
+
+    def test_resampling(self):
+        self.assertIsNone(Resampling.from_query_plan(QueryPlan(synthesis_request("/?start_date=2016-01-01"))))
+        self.assertEqual(Resampling.from_query_plan(QueryPlan(synthesis_request("/?aggregation_duration=hour"))),
+                         ("HOUR", "MEAN", "START"))
+        self.assertRaises(ValueError, Resampling.from_query_plan,
+                          QueryPlan(synthesis_request("/?aggregation_duration=WEEK")))
+
+    def test_statistics(self):
+        self.assertEqual(resample_points(self.points, "DAY", "MIN", "START"), [(datetime(2016, 2, 1), 0)])
+        self.assertEqual(resample_points(self.points, "DAY", "MAX", "START"), [(datetime(2016, 2, 1), 23.5)])
+        self.assertEqual(resample_points(self.points, "DAY", "MEAN", "MIDDLE"), [(datetime(2016, 2, 1, 12), 11.75)])
+        hourly = resample_points(self.points, "HOUR", "TOTAL", "END")
+        self.assertEqual(len(hourly), 24)
+        self.assertEqual(hourly[1], (datetime(2016, 2, 1, 2), 2.5))
+
+    def test_dates(self):
+        points = [(date(2016, month, day), 1.0) for month in (1, 2, 12) for day in (1, 2)]
+        self.assertEqual(resample_points(points, "MONTH", "TOTAL", "START"),
+                         [(date(2016, 1, 1), 2.0), (date(2016, 2, 1), 2.0), (date(2016, 12, 1), 2.0)])
+        self.assertEqual(resample_points(points, "YEAR", "TOTAL", "END"), [(date(2017, 1, 1), 6.0)])
+        self.assertEqual(resample_points([("2016-02-01T10:00:00", 1), ("2016-02-01T11:00:00", None)],
+                                         "DAY", "MEAN", "START"), [(datetime(2016, 2, 1), 1.0)])
+
+
+class TestResampleAPI(TestCase):
+    """
+    Test /synthesis/measurement_tvp_timeseries api resampling
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_get(self):
+        plugin_list = AlphaDataMeasurementTimeseriesTVPObservationView.list
+
+        def daily(view, request, **kwargs):
+            for observation in plugin_list(view, request, **kwargs):
+                observation.aggregation_duration = "DAY"
+                yield observation
+
+        with mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list", daily):
+            response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                       '&start_date=2016-02-01&aggregation_duration=MONTH&statistic=MAX',
+                                       format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        observation = json.loads(response.content.decode('utf-8'))[0]
+        self.assertEqual(observation["result_points"], [["2016-02-01", 3.1086]])
+        self.assertEqual(observation["aggregation_duration"], "MONTH")
+        self.assertEqual(observation["statistic"], "MAX")
+
+    def test_invalid(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&statistic=MEDIAN', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
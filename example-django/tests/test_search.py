@@ -0,0 +1,69 @@
+import json
+from collections import namedtuple
+
+from basin3d.models import DataSource
+from basin3d.synthesis.catalog import catalog
+from basin3d.synthesis.search import SearchIndex, rank, tokenize
+from django.test import TestCase
+from mybroker.plugins import AlphaMonitoringFeatureView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+Feature = namedtuple("Feature", ["id", "name", "description"])
+
+
+class SearchIndexTest(TestCase):
+    """
+    Test the monitoring feature search index
+    """
+
+    def setUp(self):
+        self.features = list(AlphaMonitoringFeatureView(DataSource.objects.get(name="Alpha")).list(None))
+        self.index = SearchIndex(self.features)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Point Location-1"), ["point", "location", "1"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_search(self):
+        self.assertEqual([f.id for f in self.index.search(["awe"])], ["A-Region1"])
+        self.assertEqual([f.id for f in self.index.search(["point", "loc"])], ["A-1"])
+        self.assertEqual(self.index.search(["point", "awesome"]), [])
+        self.assertEqual(len(self.index.search([])), 2)
+
+    def test_rank(self):
+        features = [Feature("A-3", "Lake", "East River outlet"),
+                    Feature("A-2", "River Bend", "Upstream"),
+                    Feature("A-East", "Gauge", "Rivers")]
+        # Names starting with the query first, then the id and whole word matches
+        self.assertEqual([f.id for f in rank(features, ["river"])], ["A-2", "A-3", "A-East"])
+        self.assertEqual([f.id for f in rank(features, ["east", "riv"])], ["A-East", "A-3"])
+        self.assertEqual([f.id for f in SearchIndex(features).search(["east", "riv"])], ["A-East", "A-3"])
+
+
+class TestSearchAPI(TestCase):
+    """
+    Test /synthesis/monitoringfeatures search
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        catalog.clear()
+
+    def tearDown(self):
+        catalog.clear()
+
+    def get_ids(self, query):
+        response = self.client.get('/synthesis/monitoringfeatures/points/?{}'.format(query), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [obj["id"] for obj in json.loads(response.content.decode('utf-8'))]
+
+    def test_get(self):
+        self.assertEqual(self.get_ids("q=awesome"), ["A-Region1"])
+        self.assertEqual(self.get_ids("q=Point%20Lo"), ["A-1"])
+        self.assertEqual(self.get_ids("q=nothing"), [])
+        self.assertEqual(self.get_ids("q="), ["A-Region1", "A-1"])
+
+    def test_plugin(self):
+        """Listings that are not served from the catalog are searched after synthesis"""
+        self.assertEqual(self.get_ids("q=first&monitoring_features=A-1,A-Region1"), ["A-1"])
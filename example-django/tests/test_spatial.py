@@ -0,0 +1,81 @@
+import json
+from unittest import mock
+
+from basin3d.models import DataSource
+from basin3d.synthesis.catalog import catalog
+from basin3d.synthesis.spatial import BoundingBox, Near, SpatialFilter, SpatialIndex, distance
+from django.test import TestCase
+from mybroker.plugins import AlphaMonitoringFeatureView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class SpatialTest(TestCase):
+    """
+    Test the spatial filters and index
+    """
+
+    def setUp(self):
+        self.features = list(AlphaMonitoringFeatureView(DataSource.objects.get(name="Alpha")).list(None))
+
+    def test_parse(self):
+        self.assertEqual(BoundingBox.parse("-21,70,-20,71"), (-21, 70, -20, 71))
+        self.assertEqual(Near.parse("70.5,-20.5,10"), (70.5, -20.5, 10))
+        for value in ["1,2,3", "a,b,c,d", "0,80,1,70", "0,0,200,1"]:
+            self.assertRaises(ValueError, BoundingBox.parse, value)
+        self.assertRaises(ValueError, Near.parse, "0,0,-1")
+
+    def test_contains(self):
+        self.assertTrue(BoundingBox(170, -10, -170, 10).contains(0, 179))
+        self.assertFalse(BoundingBox(170, -10, -170, 10).contains(0, 0))
+        self.assertAlmostEqual(distance(0, 0, 0, 1), 111.195, places=2)
+        self.assertTrue(Near(0, 179.9, 50).bounding_box().contains(0, -179.9))
+
+    def test_index(self):
+        index = SpatialIndex(self.features)
+        self.assertEqual([f.id for f in index.query(SpatialFilter(BoundingBox(-21, 70, -20, 71), None))],
+                         ["A-Region1", "A-1"])
+        self.assertEqual(index.query(SpatialFilter(BoundingBox(-20, 70, -19, 71), None)), [])
+        self.assertEqual(len(index.query(SpatialFilter(None, Near(70.4, -20.4, 10)))), 2)
+        self.assertEqual(index.query(SpatialFilter(None, Near(70.4, -20.4, 1))), [])
+        self.assertEqual(len(index.query(SpatialFilter(BoundingBox(-180, -90, 180, 90), Near(70.4, -20.4, 10)))), 2)
+
+
+class TestSpatialAPI(TestCase):
+    """
+    Test /synthesis/monitoringfeatures spatial filters
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        catalog.clear()
+
+    def tearDown(self):
+        catalog.clear()
+
+    def get_ids(self, query):
+        response = self.client.get('/synthesis/monitoringfeatures/points/?{}'.format(query), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [obj["id"] for obj in json.loads(response.content.decode('utf-8'))]
+
+    def test_catalog(self):
+        self.assertEqual(self.get_ids("bbox=-21,70,-20,71"), ["A-Region1", "A-1"])
+        self.assertEqual(self.get_ids("near=70.4657,-20.4567,1"), ["A-Region1", "A-1"])
+        self.assertEqual(self.get_ids("bbox=0,0,1,1"), [])
+
+    def test_plugin(self):
+        """Listings that are not served from the catalog are filtered after synthesis"""
+        self.assertEqual(self.get_ids("monitoring_features=A-1&bbox=0,0,1,1"), [])
+        self.assertEqual(len(self.get_ids("monitoring_features=A-1&bbox=-21,70,-20,71")), 2)
+
+    def test_push_down(self):
+        """Plugin views that support spatial filters get the parsed filters"""
+        with mock.patch.object(AlphaMonitoringFeatureView, "supports_spatial_filter", True, create=True), \
+                mock.patch.object(AlphaMonitoringFeatureView, "list", return_value=[]) as mock_list:
+            self.assertEqual(self.get_ids("bbox=0,0,1,1"), [])
+            self.assertEqual(mock_list.call_args[1]["bbox"], BoundingBox(0, 0, 1, 1))
+            self.assertIsNone(mock_list.call_args[1]["near"])
+
+    def test_invalid(self):
+        response = self.client.get('/synthesis/monitoringfeatures/points/?bbox=1,2', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
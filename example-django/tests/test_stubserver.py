@@ -0,0 +1,83 @@
+import time
+
+import requests
+from basin3d.models import DataSource
+from basin3d.synthesis.models import Base  # noqa: F401
+from basin3d.plugins import HTTPOAuth2DataSource
+from basin3d.testing import StubDataSourceServer
+from django.test import TestCase
+
+
+class StubDataSourceServerTest(TestCase):
+    """
+    Test the local stand-in data source API
+    """
+
+    def setUp(self):
+        self.server = StubDataSourceServer(resources={"sites": [{"id": n, "name": "Site {}".format(n)}
+                                                                for n in range(1, 26)]},
+                                           page_size=10, seed=1).start()
+        self.addCleanup(self.server.stop)
+
+    def datasource(self):
+        datasource = DataSource.objects.get(name="Alpha")
+        datasource.location = self.server.url
+        datasource.credentials = "client_id: client\nclient_secret: secret\n"
+        return datasource
+
+    def test_oauth2(self):
+        connection = HTTPOAuth2DataSource(self.datasource())
+        response = connection.get("{}sites/".format(self.server.url))
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertEqual(page["count"], 25)
+        self.assertEqual([site["id"] for site in page["results"]], list(range(1, 11)))
+        self.assertIsNone(page["previous"])
+
+        page = connection.get(page["next"]).json()
+        self.assertEqual(page["results"][0]["id"], 11)
+        page = connection.get(page["next"]).json()
+        self.assertEqual(len(page["results"]), 5)
+        self.assertIsNone(page["next"])
+
+        token = connection.token["access_token"]
+        connection.logout()
+        self.assertFalse(self.server.is_valid_token(token))
+        self.assertEqual(self.server.stats["tokens"], 1)
+        self.assertEqual(self.server.stats["revoked"], 1)
+
+    def test_unauthorized(self):
+        self.assertEqual(requests.get("{}sites/".format(self.server.url)).status_code, 401)
+        self.assertEqual(requests.post("{}o/token/".format(self.server.url), auth=("client", "wrong")).status_code,
+                         401)
+        self.server.require_token = False
+        self.assertEqual(requests.get("{}sites/".format(self.server.url)).status_code, 200)
+        self.assertEqual(requests.get("{}plots/".format(self.server.url)).status_code, 404)
+
+    def test_filter(self):
+        self.server.require_token = False
+        page = requests.get("{}sites/?id=2,4&page_size=1".format(self.server.url)).json()
+        self.assertEqual(page["count"], 2)
+        self.assertEqual(page["results"], [{"id": 2, "name": "Site 2"}])
+        self.assertIn("id=2%2C4", page["next"])
+        self.assertEqual(requests.get("{}sites/?page=0".format(self.server.url)).status_code, 400)
+
+    def test_faults(self):
+        self.server.require_token = False
+        url = "{}sites/".format(self.server.url)
+
+        self.server.error_rate = 1
+        self.assertEqual(requests.get(url).status_code, 503)
+        self.server.error_rate = 0
+
+        self.server.latency = 0.2
+        start = time.time()
+        requests.get(url)
+        self.assertGreaterEqual(time.time() - start, 0.2)
+        self.server.latency = 0
+
+        self.server.rate_limit = 2
+        statuses = [requests.get(url).status_code for _ in range(4)]
+        self.assertIn(429, statuses)
+        self.assertEqual(self.server.stats["errors"], 1)
+        self.assertGreaterEqual(self.server.stats["rate_limited"], 1)
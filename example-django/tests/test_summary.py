@@ -0,0 +1,86 @@
+import json
+from datetime import date
+
+from basin3d.synthesis.summary import TimeseriesSummary, combine_summaries
+from django.test import TestCase
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView  # noqa: F401
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class SummaryTest(TestCase):
+    """
+    Test the timeseries summary statistics
+    """
+
+    def test_summary(self):
+        summary = TimeseriesSummary(("A-1", 1, "nm"))
+        summary.add_points(iter([(date(2016, 2, 3), 3.0), (date(2016, 2, 1), 1.0), (date(2016, 2, 2), None),
+                                 ("2016-02-05", 5.0)]))
+        self.assertEqual((summary.count, summary.minimum, summary.maximum, summary.mean), (3, 1.0, 5.0, 3.0))
+        self.assertEqual((summary.first, summary.last), (date(2016, 2, 1), "2016-02-05"))
+
+        empty = TimeseriesSummary(("A-1", 1, "nm"))
+        empty.add_points([])
+        self.assertEqual(empty.to_dict()["mean"], None)
+
+    def test_combine(self):
+        first = TimeseriesSummary(("A-1", 1, "nm"))
+        first.add_points([(date(2016, 2, 1), 1.0), (date(2016, 2, 2), 2.0)])
+        second = TimeseriesSummary(("A-1", 1, "nm"))
+        second.add_points([(date(2016, 1, 1), 6.0)])
+        other = TimeseriesSummary(("A-2", 1, "nm"))
+        combined = combine_summaries([first, other, TimeseriesSummary(("A-1", 1, "nm")), second])
+        self.assertEqual([summary.key for summary in combined], [("A-1", 1, "nm"), ("A-2", 1, "nm")])
+        self.assertEqual(combined[0].to_dict(), {"feature_of_interest": "A-1", "observed_property": 1,
+                                                 "unit_of_measurement": "nm", "count": 3, "min": 1.0, "max": 6.0,
+                                                 "mean": 3.0, "first": date(2016, 1, 1), "last": date(2016, 2, 2)})
+
+    def test_combine_offsets(self):
+        """Timestamps with and without an offset are compared in UTC"""
+        first = TimeseriesSummary(("A-1", 1, "nm"))
+        first.add_points([("2016-02-01T10:00:00", 1.0), ("2016-02-01T12:00:00", 2.0)])
+        second = TimeseriesSummary(("A-1", 1, "nm"))
+        second.add_points([("2016-02-01T11:00:00+02:00", 3.0), ("2016-02-01T11:00:00Z", 4.0)])
+        combined = combine_summaries([first, second])
+        self.assertEqual((combined[0].first, combined[0].last), ("2016-02-01T11:00:00+02:00", "2016-02-01T12:00:00"))
+
+
+class TestSummaryAPI(TestCase):
+    """
+    Test /synthesis/measurement_tvp_timeseries/summary api
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_get(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/summary/?monitoring_features=A-1,A-2'
+                                   '&start_date=2016-02-01', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summaries = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([s["feature_of_interest"] for s in summaries], ["A-1", "A-2"])
+        self.assertEqual(summaries[0]["count"], 9)
+        self.assertAlmostEqual(summaries[0]["min"], 0.3454)
+        self.assertAlmostEqual(summaries[0]["max"], 9 * 0.3454)
+        self.assertAlmostEqual(summaries[0]["mean"], 5 * 0.3454)
+        self.assertEqual((summaries[0]["first"], summaries[0]["last"]), ("2016-02-01", "2016-02-09"))
+        self.assertNotIn("result_points", summaries[0])
+
+    def test_csv(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/summary/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&format=csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = response.content.decode('utf-8').splitlines()
+        self.assertEqual(lines[0], "feature_of_interest,observed_property,unit_of_measurement,count,min,max,mean,"
+                                   "first,last")
+
+    def test_invalid(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/summary/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&units=SI', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Downsampling would change the statistics
+        for query in ['max_points=3', 'downsample=minmax']:
+            response = self.client.get('/synthesis/measurement_tvp_timeseries/summary/?monitoring_features=A-1'
+                                       '&start_date=2016-02-01&{}'.format(query), format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
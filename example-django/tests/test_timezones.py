@@ -0,0 +1,120 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+
+from basin3d.synthesis.query import QueryPlan, synthesis_request
+from basin3d.synthesis.timezones import TimezoneNormalization, normalize_points
+from django.test import TestCase
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class TimezonesTest(TestCase):
+    """
+    Test the time zone normalization
+    """
+
+    def test_normalization(self):
+        for value, utc_offset in [("UTC", 0), ("utc", 0), ("-8", -8), ("+9", 9), ("5.5", 5.5), ("9.5", 9.5),
+                                  ("5.75", 5.75), ("-8.0", -8)]:
+            plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/?tz={}".format(value)))
+            self.assertEqual(TimezoneNormalization.from_query_plan(plan), TimezoneNormalization(utc_offset))
+        plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/"))
+        self.assertIsNone(TimezoneNormalization.from_query_plan(plan))
+        for value in ["PST", "15", "14.5", "nan"]:
+            plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/?tz={}".format(value)))
+            self.assertRaises(ValueError, TimezoneNormalization.from_query_plan, plan)
+
+    def test_normalize_points(self):
+        points = [(datetime(2016, 2, 1, 20), 1.0), ("2016-02-01T21:00:00", 2.0),
+                  (datetime(2016, 2, 1, 12, tzinfo=timezone.utc), 3.0), (date(2016, 2, 1), 4.0), ("2016-02-01", 5.0),
+                  ("unreadable", 6.0)]
+        normalized = normalize_points(points, -8, timezone.utc)
+        self.assertEqual([p[0] for p in normalized],
+                         [datetime(2016, 2, 2, 4, tzinfo=timezone.utc), datetime(2016, 2, 2, 5, tzinfo=timezone.utc),
+                          datetime(2016, 2, 1, 12, tzinfo=timezone.utc), date(2016, 2, 1), "2016-02-01",
+                          "unreadable"])
+        self.assertEqual([p[1] for p in normalized], [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        self.assertEqual(normalized[0][0].utcoffset(), timedelta(0))
+
+        # Without a utc offset, only the timestamps with an offset are converted
+        normalized = normalize_points(points[:3], None, timezone(timedelta(hours=9)))
+        self.assertEqual([p[0] for p in normalized][:2], [datetime(2016, 2, 1, 20), "2016-02-01T21:00:00"])
+        self.assertEqual(normalized[2][0].hour, 21)
+
+
+class TestTimezonesAPI(TestCase):
+    """
+    Test /synthesis/measurement_tvp_timeseries api time zone normalization
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        plugin_list = AlphaDataMeasurementTimeseriesTVPObservationView.list
+
+        def hourly(view, request, **kwargs):
+            for observation in plugin_list(view, request, **kwargs):
+                observation.result_points = [(datetime(2016, 2, 1, n), n) for n in range(3)]
+                yield observation
+
+        patcher = mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list", hourly)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&tz=UTC', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        observations = json.loads(response.content.decode('utf-8'))
+        # The plugin utc offsets are -9 and -10
+        self.assertEqual([o["utc_offset"] for o in observations], [0, 0])
+        self.assertEqual(observations[0]["result_points"][0], ["2016-02-01T09:00:00Z", 0])
+        self.assertEqual(observations[1]["result_points"][0], ["2016-02-01T10:00:00Z", 0])
+
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&tz=-8', format='json')
+        observations = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(observations[0]["utc_offset"], -8)
+        self.assertEqual(observations[0]["result_points"][0], ["2016-02-01T01:00:00-08:00", 0])
+
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&tz=5.5', format='json')
+        observations = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(observations[0]["utc_offset"], 5.5)
+        self.assertEqual(observations[0]["result_points"][0], ["2016-02-01T14:30:00+05:30", 0])
+
+    def test_unknown_offset(self):
+        """Timeseries with and without a utc offset are merged, aligned and summarized"""
+        plugin_list = AlphaDataMeasurementTimeseriesTVPObservationView.list
+
+        def unknown_offset(view, request, **kwargs):
+            feature_of_interest = None
+            for observation in plugin_list(view, request, **kwargs):
+                if observation.id == "A-2":
+                    # A second timeseries of the first monitoring feature without a utc offset
+                    observation.feature_of_interest = feature_of_interest
+                    observation.utc_offset = None
+                    observation.result_points = [(datetime(2016, 2, 1, 9, 30), 5), (date(2016, 2, 2), 6)]
+                feature_of_interest = observation.feature_of_interest
+                yield observation
+
+        url = '/synthesis/measurement_tvp_timeseries/{}?monitoring_features=A-1,A-2&start_date=2016-02-01&tz=UTC&{}'
+        with mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list", unknown_offset):
+            response = self.client.get(url.format("", "merge=true"), format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            points = json.loads(response.content.decode('utf-8'))[0]["result_points"]
+            self.assertEqual([p[1] for p in points], [0, 5, 1, 2, 6])
+
+            response = self.client.get(url.format("", "align=null"), format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            response = self.client.get(url.format("summary/", ""), format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            summaries = json.loads(response.content.decode('utf-8'))
+            self.assertEqual((summaries[0]["first"], summaries[0]["last"]), ("2016-02-01T09:00:00Z", "2016-02-02"))
+
+    def test_invalid(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&tz=PST', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,92 @@
+import json
+from unittest import mock
+
+from basin3d import timing
+from basin3d.metrics import instrument_list
+from basin3d.synthesis.query import get_query_plan, synthesis_request
+from basin3d.timing import RequestTimings
+from django.test import TestCase
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class RequestTimingsTest(TestCase):
+    """
+    Test the request phase timings
+    """
+
+    def test_entries(self):
+        timings = RequestTimings()
+        timings.add("plan", None, 0.001)
+        timings.add("plugin", "Alpha Source", 0.010)
+        timings.add("fetch", "Alpha Source", 0.004)
+        timings.add("fetch", "Alpha Source", 0.002)
+        entries = timings.entries()
+        self.assertEqual([name for name, _, _ in entries],
+                         ["plan", "construct.Alpha_Source", "fetch.Alpha_Source", "total"])
+        self.assertAlmostEqual(entries[1][1], 4.0)
+        self.assertAlmostEqual(entries[2][1], 6.0)
+        self.assertEqual(entries[1][2], "construct Alpha Source")
+
+    def test_header(self):
+        timings = RequestTimings()
+        timings.add("serialize", None, 0.0125)
+        header = timings.header()
+        self.assertTrue(header.startswith('serialize;dur=12.5;desc="serialize", total;dur='))
+
+    def test_plan(self):
+        timings = timing._context.timings = RequestTimings()
+        try:
+            get_query_plan(synthesis_request("/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1"))
+        finally:
+            timing._context.timings = None
+        self.assertIn(("plan", None), timings.phases)
+
+    def test_not_timed(self):
+        with timing.phase("plan"):
+            pass
+        self.assertIsNone(timing.current())
+
+
+class TestServerTimingAPI(TestCase):
+    """
+    Test the Server-Timing header of the api responses
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        plugin_list = AlphaDataMeasurementTimeseriesTVPObservationView.list
+
+        def plugin(view, request, **kwargs):
+            yield from plugin_list(view, request, **kwargs)
+
+        patcher = mock.patch.object(AlphaDataMeasurementTimeseriesTVPObservationView, "list",
+                                    instrument_list(plugin))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_header(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [entry.split(";")[0] for entry in response["Server-Timing"].split(", ")]
+        for name in ["plan", "synthesize.Alpha", "construct.Alpha", "serialize", "render", "total"]:
+            self.assertIn(name, names)
+        self.assertIsInstance(json.loads(response.content.decode('utf-8')), list)
+
+    def test_footer(self):
+        url = '/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1&start_date=2016-02-01'
+        with mock.patch("basin3d.timing._footer_enabled", return_value=True):
+            response = self.client.get(url, format='json', HTTP_X_DEBUG_TIMING="1")
+            data = json.loads(response.content.decode('utf-8'))
+            self.assertEqual(len(data["data"]), 2)
+            self.assertEqual(data["timing"][-1]["name"], "total")
+            self.assertEqual(response["Content-Length"], str(len(response.content)))
+
+            response = self.client.get(url, format='json')
+            self.assertIsInstance(json.loads(response.content.decode('utf-8')), list)
+
+        # Disabled by default
+        response = self.client.get(url, format='json', HTTP_X_DEBUG_TIMING="1")
+        self.assertIsInstance(json.loads(response.content.decode('utf-8')), list)
@@ -0,0 +1,77 @@
+import json
+
+from basin3d.models import ObservedProperty
+from basin3d.synthesis.query import QueryPlan, synthesis_request
+from basin3d.synthesis.units import UnitHarmonization, conversion, convert_points, get_unit
+from django.test import TestCase
+from mybroker.plugins import AlphaDataMeasurementTimeseriesTVPObservationView  # noqa: F401
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class UnitsTest(TestCase):
+    """
+    Test the unit conversions
+    """
+
+    def test_get_unit(self):
+        self.assertEqual(get_unit("µg/L"), get_unit("ug/L"))
+        self.assertEqual(get_unit("°C"), get_unit("degC"))
+        self.assertEqual(get_unit("m³/s"), get_unit("m3/s"))
+        self.assertIsNone(get_unit("furlong"))
+        self.assertIsNone(get_unit(None))
+
+    def test_conversion(self):
+        scale, offset = conversion("degC", "degF")
+        self.assertAlmostEqual(100 * scale + offset, 212.0)
+        self.assertAlmostEqual(-40 * scale + offset, -40.0)
+        scale, offset = conversion("mg/L", "µg/L")
+        self.assertAlmostEqual(scale, 1000.0)
+        self.assertEqual(offset, 0.0)
+        self.assertIsNone(conversion("mg/L", "degC"))
+        self.assertIsNone(conversion("furlong", "m"))
+
+    def test_convert_points(self):
+        self.assertEqual(convert_points([("2016-02-01", 1.5), ("2016-02-02", None)], 2.0, 1.0),
+                         [("2016-02-01", 4.0), ("2016-02-02", None)])
+
+    def test_harmonization(self):
+        plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/?units=canonical"))
+        self.assertIs(UnitHarmonization.from_query_plan(plan), UnitHarmonization.from_query_plan(plan))
+        plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/"))
+        self.assertIsNone(UnitHarmonization.from_query_plan(plan))
+        plan = QueryPlan(synthesis_request("/synthesis/measurement_tvp_timeseries/?units=SI"))
+        self.assertRaises(ValueError, UnitHarmonization.from_query_plan, plan)
+
+
+class TestUnitsAPI(TestCase):
+    """
+    Test /synthesis/measurement_tvp_timeseries api unit harmonization
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        variable = ObservedProperty.objects.get(pk=1).observed_property_variable
+        variable.units = "um"
+        variable.save()
+
+    def test_get(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&units=canonical', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        observations = json.loads(response.content.decode('utf-8'))
+        self.assertTrue(observations)
+        for observation in observations:
+            self.assertEqual(observation["unit_of_measurement"], "um")
+            self.assertAlmostEqual(observation["result_points"][0][1], 0.3454 / 1000)
+
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01', format='json')
+        for observation in json.loads(response.content.decode('utf-8')):
+            self.assertEqual(observation["unit_of_measurement"], "nm")
+            self.assertAlmostEqual(observation["result_points"][0][1], 0.3454)
+
+    def test_invalid(self):
+        response = self.client.get('/synthesis/measurement_tvp_timeseries/?monitoring_features=A-1'
+                                   '&start_date=2016-02-01&units=foo', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)